@@ -0,0 +1 @@
+"""Benchmark harness for the data, cache and chart paths — see ``python -m bench --help``."""
@@ -0,0 +1,89 @@
+"""
+Command-line entry point: ``python -m bench`` (run from ``mvp/``).
+
+    python -m bench                       # all scenarios, compared to baseline.json
+    python -m bench -s period_key_1m      # one scenario (repeatable flag)
+    python -m bench --list
+    python -m bench --json out.json       # machine-readable results ("-" = stdout)
+    python -m bench --update-baseline     # record this run as the new baseline
+
+Exits with status 1 when any scenario regresses beyond ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Scenarios import the app modules (tharanis_client, samansport, …) by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.runner import (  # noqa: E402
+    BASELINE_PATH,
+    DEFAULT_TOLERANCE,
+    compare,
+    format_table,
+    load_baseline,
+    measure,
+    report,
+    write_json,
+)
+from bench.scenarios import SCENARIOS  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="SamanSport benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    parser.add_argument("--scale", type=float, default=1.0, help="input size multiplier")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown vs baseline, as a fraction (default 0.25)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for s in SCENARIOS.values():
+            print(f"{s.name:<32}{s.description}")
+        return 0
+
+    # The client logs expected failures (e.g. SOAP errors) loudly; keep output readable
+    logging.basicConfig(level=os.getenv("BENCH_LOG_LEVEL", "ERROR"))
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        print(f"running {name} …", file=sys.stderr, flush=True)
+        results[name] = measure(SCENARIOS[name], scale=args.scale, repeat=args.repeat)
+    data = report(results, args.scale)
+
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("scale") != args.scale:
+        print(f"baseline was recorded at scale {baseline.get('scale')}; not comparing",
+              file=sys.stderr)
+        baseline = None
+
+    if args.json:
+        write_json(data, None if args.json == "-" else Path(args.json))
+    if args.json != "-":
+        print(format_table(results, baseline))
+
+    if args.update_baseline:
+        write_json(data, args.baseline)
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance) if baseline else []
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
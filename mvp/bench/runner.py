@@ -0,0 +1,122 @@
+"""Timing, memory measurement and baseline comparison for bench scenarios."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from bench.scenarios import Scenario
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(scenario: Scenario, scale: float = 1.0, repeat: int = 3) -> dict[str, Any]:
+    """Run *scenario* and return its result record.
+
+    Wall time is the median of *repeat* timed calls (after one untimed
+    warm-up unless the scenario is cold); peak memory comes from one extra
+    call under ``tracemalloc``, so tracing overhead never affects timing.
+    That is Python and NumPy heap only: buffers pyarrow allocates from its
+    own memory pool do not show up.
+    A scenario whose setup fails is reported as skipped with the reason.
+    """
+    try:
+        with scenario.setup(scale) as (run, rows):
+            if scenario.warmup:
+                run()
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - t0)
+            tracemalloc.start()
+            try:
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except Exception as exc:
+        return {"skipped": f"{type(exc).__name__}: {exc}"}
+
+    wall = statistics.median(times)
+    return {
+        "wall_s": round(wall, 6),
+        "rows": rows,
+        "rows_per_s": round(rows / wall) if wall else None,
+        "peak_mem_mb": round(peak / 2**20, 2),
+    }
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+    }
+
+
+def report(results: dict[str, dict[str, Any]], scale: float) -> dict[str, Any]:
+    return {"scale": scale, "environment": environment(), "results": results}
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Regressions of *results* against *baseline*, one message per metric.
+
+    Wall time and peak memory regress when they exceed the baseline by more
+    than *tolerance* (a fraction). Scenarios missing or skipped on either
+    side are not compared.
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, result in results.items():
+        base = base_results.get(name)
+        if not base or "skipped" in base or "skipped" in result:
+            continue
+        for metric in ("wall_s", "peak_mem_mb"):
+            old, new = base.get(metric), result.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {old:g} → {new:g} (+{(new / old - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def format_table(results: dict[str, dict[str, Any]], baseline: dict[str, Any] | None) -> str:
+    base_results = (baseline or {}).get("results", {})
+    lines = [f"{'scenario':<32}{'wall ms':>10}{'base ms':>10}{'rows/s':>14}{'peak MB':>10}"]
+    for name, r in results.items():
+        if "skipped" in r:
+            lines.append(f"{name:<32}  skipped — {r['skipped']}")
+            continue
+        base = base_results.get(name, {}).get("wall_s")
+        lines.append(
+            f"{name:<32}{r['wall_s'] * 1000:>10.1f}"
+            f"{(f'{base * 1000:.1f}' if base else '—'):>10}"
+            f"{(r['rows_per_s'] or 0):>14,}{r['peak_mem_mb']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def write_json(data: dict[str, Any], path: Path | None) -> None:
+    text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    if path is None:
+        sys.stdout.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
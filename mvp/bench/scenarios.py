@@ -0,0 +1,281 @@
+"""
+Named benchmark scenarios.
+
+Each scenario is a context manager factory: given a *scale* factor it
+prepares its inputs (not timed), yields ``(run, rows)`` — the callable to
+time and how many rows one call processes — and cleans up afterwards.
+Input data comes from ``soap_standin.SyntheticTharanis``, so every run
+sees the same rows.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+Setup = Callable[[float], contextlib.AbstractContextManager]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    setup: Setup
+    # Cold scenarios measure a first call, so the runner must not warm them up
+    warmup: bool = True
+
+
+SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(name: str, description: str, warmup: bool = True):
+    def register(fn):
+        SCENARIOS[name] = Scenario(name, description, contextlib.contextmanager(fn), warmup)
+        return fn
+    return register
+
+
+# ── Synthetic inputs ─────────────────────────────────────────────────────────
+
+
+def _data(scale: float, years: float = 3, lines_per_day: int = 40):
+    from soap_standin import SyntheticTharanis
+
+    return SyntheticTharanis(skus=500, years=years, lines_per_day=max(1, int(lines_per_day * scale)))
+
+
+def _sales_frame(scale: float) -> pd.DataFrame:
+    """Legacy-column sales frame, as ``get_sales`` returns it (3 years)."""
+    data = _data(scale)
+    s = data.sales
+    keep = s["storno"] == 0
+    net_price = s["netto_ar"][keep]
+    qty = s["menny"][keep]
+    gross_price = np.round(net_price * 1.27, 4)
+    return pd.DataFrame({
+        "kelt": pd.to_datetime(s["day"][keep]),
+        "Cikkszám": data.sku_codes[s["sku"][keep]],
+        "Mennyiség": qty,
+        "Nettó ár": net_price,
+        "Bruttó ár": gross_price,
+        "Nettó érték": np.round(net_price * qty, 2),
+        "Bruttó érték": np.round(gross_price * qty, 2),
+    })
+
+
+@contextlib.contextmanager
+def _soap_config(api_url: str, cache_dir: Path):
+    """Point tharanis_client at *api_url* (SOAP only) with a private disk cache."""
+    import tharanis_client as tc
+    from disk_cache import DiskCache
+
+    cfg = tc._Config(
+        api_url=api_url, ugyfelkod="7354", cegkod="ab", apikulcs="",
+        supabase_url="", supabase_key="", bulk_read_min_rows=0,
+        cache_max_bytes=1 << 30, cache_format="parquet",
+    )
+    with patch.object(tc, "_get_config", return_value=cfg), \
+         patch.object(tc, "_disk_cache", DiskCache(cache_dir, max_bytes=1 << 30)):
+        yield
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+
+
+@scenario("soap_page_parse", "Extract and parse 10 kimeno_szamla SOAP pages (200 invoices each)")
+def _soap_page_parse(scale: float) -> Iterator:
+    import tharanis_client as tc
+
+    data = _data(scale, years=1, lines_per_day=100)
+    pages = [
+        data.respond("kimeno_szamla", tc._build_leker("2025.01.01", "2025.12.31", None, p, 200))
+        for p in range(10)
+    ]
+    rows = sum(len(tc._parse_tetelek(tc._extract_valasz(p))) for p in pages)
+
+    def run():
+        for page in pages:
+            tc._parse_tetelek(tc._extract_valasz(page))
+
+    yield run, rows
+
+
+@scenario("soap_get_sales_3y", "get_sales over 3 years through the local SOAP stand-in")
+def _soap_get_sales(scale: float) -> Iterator:
+    import tharanis_client as tc
+    from soap_standin import StandinServer
+
+    data = _data(scale)
+    rows = int((data.sales["storno"] == 0).sum())
+    with tempfile.TemporaryDirectory() as tmp, StandinServer(data) as server, \
+         _soap_config(server.url, Path(tmp)):
+        yield (lambda: tc.get_sales("2023.01.01", "2025.12.31", force_refresh=True)), rows
+
+
+@scenario("supabase_decode", "Decode 100k Supabase JSON rows into the legacy sales frame")
+def _supabase_decode(scale: float) -> Iterator:
+    import tharanis_client as tc
+
+    df = _sales_frame(scale)
+    n = int(100_000 * scale)
+    df = df.iloc[np.arange(n) % len(df)]
+    rows = pd.DataFrame({
+        "fulfillment_date": df["kelt"].dt.strftime("%Y-%m-%d").to_numpy(),
+        "sku": df["Cikkszám"].to_numpy(),
+        "quantity": df["Mennyiség"].to_numpy(),
+        "net_price": df["Nettó ár"].to_numpy(),
+        "gross_price": df["Bruttó ár"].to_numpy(),
+        "net_value": df["Nettó érték"].to_numpy(),
+        "gross_value": df["Bruttó érték"].to_numpy(),
+    }).to_dict("records")
+    yield (lambda: tc._decode_rows("sales_invoice_lines", rows)), n
+
+
+@scenario("period_key_1m", "data_helpers.period_key (Havi) over 1M dates")
+def _period_key(scale: float) -> Iterator:
+    from data_helpers import period_key
+
+    n = int(1_000_000 * scale)
+    dates = pd.Series(pd.Timestamp("2023-01-01") + pd.to_timedelta(np.arange(n) % 1096, "D"))
+    yield (lambda: period_key(dates, "Havi")), n
+
+
+@scenario("analytics_rebuild_sales_chart", "AnalyticsState._rebuild_sales_chart on 3 years of sales")
+def _rebuild_sales_chart(scale: float) -> Iterator:
+    from samansport.pages.analytics import AnalyticsState
+
+    df = _sales_frame(scale)
+    state = SimpleNamespace(
+        _get_filtered_df=lambda: df,
+        selected_metric="Bruttó forgalom",
+        selected_period="Havi",
+        chart_type="Oszlop",
+    )
+    yield (lambda: AnalyticsState._rebuild_sales_chart(state)), len(df)
+
+
+@scenario("dashboard_rebuild_charts", "DashboardState._rebuild_charts on 3 years of sales")
+def _rebuild_charts(scale: float) -> Iterator:
+    from samansport.pages import dashboard
+
+    df = _sales_frame(scale)
+    state = SimpleNamespace(period="Havi")
+    # No product catalog (a Supabase read): top-10 labels fall back to SKUs
+    yield (lambda: dashboard.DashboardState._rebuild_charts(state, df)), len(df)
+
+
+@scenario("seasonality_recommendations",
+          "SeasonalityAnalyzer.calculate_ordering_recommendations (top 100, 3-month lead)")
+def _seasonality(scale: float) -> Iterator:
+    from seasonality_analyzer import SeasonalityAnalyzer
+
+    df = _sales_frame(scale)
+    movements = pd.DataFrame({
+        "Cikkszám": df["Cikkszám"],
+        "Cikknév": "Termék " + df["Cikkszám"],
+        "Kelt": df["kelt"],
+        "Csökkenés": df["Mennyiség"],
+        "Nettó érték": -df["Nettó érték"],
+    })
+
+    def run():
+        # Whole months: relativedelta rejects the fractional 2.5 default
+        SeasonalityAnalyzer(movements).calculate_ordering_recommendations(
+            top_n=100, lead_time_months=3
+        )
+
+    yield run, len(movements)
+
+
+def _cache_format() -> str:
+    # Same switch as the client, so both formats can be compared
+    return os.getenv("THARANIS_CACHE_FORMAT", "parquet")
+
+
+def _cache_entry(scale: float, tmp: str):
+    from disk_cache import DiskCache
+
+    df = _sales_frame(scale)
+    writer = DiskCache(Path(tmp), max_bytes=1 << 30, fmt=_cache_format())
+    path = writer.path("sales")
+    if not writer.save(df, path):
+        raise RuntimeError("cache write failed (is pyarrow importable?)")
+    return df, path
+
+
+@scenario("cache_cold_load", "Fresh DiskCache: index scan + first load of a 3-year entry", warmup=False)
+def _cache_cold(scale: float) -> Iterator:
+    from disk_cache import DiskCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df, path = _cache_entry(scale, tmp)
+        yield (lambda: DiskCache(Path(tmp), max_bytes=1 << 30, fmt=_cache_format()).load(path)), len(df)
+
+
+@scenario("cache_warm_load", "Repeat load of a 3-year entry from an indexed DiskCache")
+def _cache_warm(scale: float) -> Iterator:
+    from disk_cache import DiskCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df, path = _cache_entry(scale, tmp)
+        cache = DiskCache(Path(tmp), max_bytes=1 << 30, fmt=_cache_format())
+        yield (lambda: cache.load(path)), len(df)
+
+
+@scenario("streamlit_charts_rerun", "One Streamlit rerun's charts (trend, bars, metric, movements, hbar)")
+def _streamlit_charts(scale: float) -> Iterator:
+    import charts
+
+    periods = [f"P{i:04d}" for i in range(max(1, int(12 * scale)))]
+    n = len(periods)
+    monthly = pd.DataFrame({"Periódus": periods, "Bruttó érték": range(n)})
+
+    def run():
+        charts.revenue_trend_chart(monthly)
+        charts.quantity_bar_chart(monthly.rename(columns={"Bruttó érték": "Mennyiség"}))
+        charts.metric_chart(monthly, "Bruttó érték", "Bruttó forgalom", "HUF", "HUF", "Oszlop")
+        charts.movements_chart(periods, list(range(n)), list(range(n)), "Oszlop")
+        charts.hbar_chart(["A", "B"], [1, 2], "#000")
+
+    # Rendering is Streamlit's job; only figure building is measured
+    with patch.object(charts.st, "plotly_chart"):
+        yield run, n
+
+
+# Modules the Reflex pages import (see tests/test_import_time.py)
+_REFLEX_PATH_MODULES = (
+    "data_helpers", "theme", "kpi", "product_catalog",
+    "table_pager", "csv_export", "tharanis_client", "warmup",
+)
+
+
+def _fresh_import(modules) -> Callable[[], None]:
+    """Import *modules* in a new interpreter; includes interpreter start-up."""
+    cmd = [sys.executable, "-c", f"import {', '.join(modules)}"]
+    cwd = Path(__file__).resolve().parent.parent
+
+    def run():
+        subprocess.run(cmd, cwd=cwd, check=True, capture_output=True)
+
+    return run
+
+
+@scenario("import_reflex_path", "Fresh interpreter importing the Reflex-path modules")
+def _import_reflex_path(scale: float) -> Iterator:
+    yield _fresh_import(_REFLEX_PATH_MODULES), len(_REFLEX_PATH_MODULES)
+
+
+@scenario("import_tharanis_client", "Fresh interpreter importing tharanis_client alone")
+def _import_tharanis_client(scale: float) -> Iterator:
+    yield _fresh_import(["tharanis_client"]), 1
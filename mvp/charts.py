@@ -2,21 +2,35 @@
 Plotly chart builders for SamanSport ERP Dashboard.
 """
 
-import copy
 from datetime import date
 
 import streamlit as st
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 
-from theme import C, FONT_FAMILY, PLOTLY_BASE_LAYOUT, PLOTLY_NO_MODEBAR, hu_thousands
+from theme import C, FONT_FAMILY, PLOTLY_BASE_LAYOUT, PLOTLY_NO_MODEBAR
+
+# PLOTLY_BASE_LAYOUT validated once and registered as a Plotly template.
+# Charts reference it by name; per-chart overrides merge on top of it.
+# Treat BASE_TEMPLATE as read-only — it is shared by every chart.
+BASE_TEMPLATE_NAME = "samansport_base"
+BASE_TEMPLATE = go.layout.Template(layout=go.Layout(PLOTLY_BASE_LAYOUT))
+pio.templates[BASE_TEMPLATE_NAME] = BASE_TEMPLATE
+
+# What charts actually use: Streamlit's own template (registered and made the
+# default when streamlit is imported) with the base layered on top, as the
+# inline layout dict used to be merged over it. Merged once here: a
+# "streamlit+samansport_base" name would be re-merged on every lookup.
+CHART_TEMPLATE_NAME = "samansport_streamlit"
+pio.templates[CHART_TEMPLATE_NAME] = pio.templates.merge_templates(
+    pio.templates["streamlit"], BASE_TEMPLATE
+)
 
 
 def _base_layout(**overrides) -> dict:
-    """Return a deep copy of PLOTLY_BASE_LAYOUT merged with overrides."""
-    layout = copy.deepcopy(PLOTLY_BASE_LAYOUT)
-    layout.update(overrides)
-    return layout
+    """Return layout kwargs: the shared chart template plus *overrides*."""
+    return dict(template=CHART_TEMPLATE_NAME, **overrides)
 
 
 def _smart_xaxis(n_points: int) -> dict:
@@ -117,14 +131,22 @@ def quantity_bar_chart(mq: pd.DataFrame) -> None:
 
 
 def top10_products_chart(grp: pd.DataFrame) -> None:
-    """Horizontal bar chart for top 10 products by revenue."""
+    """Horizontal bar chart for top 10 products by revenue.
+
+    *grp* has ``Forgalom``, ``Pct`` and ``Label`` columns, as built by
+    ``kpi.top_products_frame``; the first row is drawn at the bottom.
+    """
     if grp.empty:
         return _empty_chart_placeholder(go.Figure(), height=300)
     max_val = grp["Forgalom"].max()
+    text = (
+        "  " + grp["Forgalom"].map("{:,.0f}".format).str.replace(",", " ", regex=False)
+        + " Ft  (" + grp["Pct"].map("{:.1f}".format) + "%)"
+    )
     fig = go.Figure(go.Bar(
         x=grp["Forgalom"], y=grp["Label"].tolist(), orientation="h",
         marker=dict(color=C["accent"], opacity=0.85),
-        text=grp.apply(lambda r: f"  {hu_thousands(r['Forgalom'])} Ft  ({r['Pct']:.1f}%)", axis=1),
+        text=text,
         textposition="outside",
         textfont=dict(size=13, color="#374151"),
         hovertemplate="%{y}<br><b>%{x:,.0f} Ft</b><br>Arány: %{customdata:.1f}%<extra></extra>",
@@ -135,7 +157,7 @@ def top10_products_chart(grp: pd.DataFrame) -> None:
         **_base_layout(
             height=max(400, len(grp) * 42),
             margin=dict(l=0, r=20, t=0, b=30),
-            xaxis=dict(range=[0, max_val * 1.35], gridcolor="#EAECF5",
+            xaxis=dict(range=[0, max_val * 1.35], gridcolor="#EAECF5", tickangle=0,
                        tickfont=dict(color="#9ca3af", size=12),
                        tickformat=",.0f", separatethousands=True,
                        title=dict(text="Bruttó forgalom (HUF)", font=dict(size=13, color="#9ca3af"))),
@@ -18,6 +18,9 @@ ALL_PRODUCTS_CODE  = "__ALL__"
 # ── Analytics config ──────────────────────────────────────────────────────────
 PERIOD_OPTIONS = ["Havi", "Heti", "Napi"]
 
+# Period toggle on the Reflex dashboard
+DASHBOARD_PERIODS = ["Éves", "Havi", "Heti", "Napi"]
+
 METRIC_CFG = {
     "Bruttó forgalom":  ("Bruttó érték", "sum",   "HUF", "Bruttó forgalom (HUF)"),
     "Nettó forgalom":   ("Nettó érték",  "sum",   "HUF", "Nettó forgalom (HUF)"),
@@ -0,0 +1,100 @@
+"""
+On-demand CSV exports streamed from in-memory DataFrames.
+
+A Reflex handler registers the frame it wants to export and receives a
+short-lived token; the backend route ``/export/{token}`` then streams the
+CSV in row chunks. Nothing is rendered until someone actually downloads,
+and the CSV text never lives in session state.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import pandas as pd
+
+CHUNK_ROWS = 5_000
+
+_EXPORT_TTL_SECONDS = 15 * 60
+_MAX_EXPORTS = 32
+
+
+@dataclass(frozen=True)
+class Export:
+    """A registered export: the frame to stream and its download name."""
+
+    frame: pd.DataFrame
+    filename: str
+    columns: list[str] | None
+    created: float
+
+
+_exports: OrderedDict[str, Export] = OrderedDict()
+_exports_lock = threading.Lock()
+
+
+def _evict(now: float) -> None:
+    while _exports:
+        token, export = next(iter(_exports.items()))
+        if len(_exports) <= _MAX_EXPORTS and now - export.created < _EXPORT_TTL_SECONDS:
+            break
+        del _exports[token]
+
+
+def register(
+    frame: pd.DataFrame,
+    filename: str,
+    columns: list[str] | None = None,
+) -> str:
+    """Register *frame* (optionally only *columns*) for download; return its token.
+
+    The frame is held by reference, not copied. Tokens expire after 15
+    minutes; at most 32 exports are kept, oldest dropped first.
+    """
+    token = secrets.token_urlsafe(16)
+    now = time.monotonic()
+    with _exports_lock:
+        _exports[token] = Export(frame, filename, columns, now)
+        _evict(now)
+    return token
+
+
+def lookup(token: str) -> Export | None:
+    """Return the export registered under *token*, or None if unknown or expired."""
+    with _exports_lock:
+        _evict(time.monotonic())
+        return _exports.get(token)
+
+
+def iter_csv(
+    frame: pd.DataFrame,
+    columns: list[str] | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    date_format: str = "%Y.%m.%d",
+) -> Iterator[str]:
+    """Yield *frame* as CSV text, header first, then *chunk_rows* rows at a time.
+
+    Only *columns* (default: all) are written; the column selection is
+    applied per chunk so the full frame is never copied.
+    """
+    cols = [c for c in columns if c in frame.columns] if columns else list(frame.columns)
+    date_cols = [c for c in cols if pd.api.types.is_datetime64_any_dtype(frame[c])]
+    yield pd.DataFrame(columns=cols).to_csv(index=False)
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows][cols]
+        if date_cols:
+            chunk = chunk.copy()
+            for c in date_cols:
+                chunk[c] = chunk[c].dt.strftime(date_format)
+        yield chunk.to_csv(index=False, header=False)
+
+
+def clear() -> None:
+    """Drop every registered export."""
+    with _exports_lock:
+        _exports.clear()
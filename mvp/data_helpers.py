@@ -0,0 +1,109 @@
+"""
+Framework-free data helpers shared by the Reflex app and the Streamlit UI.
+
+Nothing here may import Streamlit or Reflex: the Reflex worker imports this
+module on its first request, and pulling in a UI framework's import graph
+there costs about a second of cold start.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pandas as pd
+
+from config import ALL_PRODUCTS_LABEL
+from product_catalog import LABEL_SEP, get_catalog
+
+
+def period_key(series: pd.Series, period: str) -> pd.Series:
+    if period == "Éves":
+        return series.dt.to_period("Y").astype(str)
+    if period == "Havi":
+        return series.dt.strftime("%Y-%m")
+    if period == "Heti":
+        return series.dt.to_period("W").astype(str)
+    return series.dt.strftime("%Y-%m-%d")
+
+
+# Finest to coarsest, with the pandas period frequency of each
+_PERIOD_FREQS = {"Napi": "D", "Heti": "W", "Havi": "M", "Éves": "Y"}
+
+
+def fit_period(dates: pd.Series, period: str, max_periods: int) -> str:
+    """*period*, or the first coarser one with at most *max_periods* buckets over *dates*.
+
+    Bar charts re-aggregate to the returned period instead of merging
+    neighbouring bars, so sums and averages stay exact. ``"Éves"`` is
+    returned even when it does not fit; unknown periods count as daily,
+    like in ``period_key``.
+    """
+    names = list(_PERIOD_FREQS)
+    start = names.index(period) if period in _PERIOD_FREQS else 0
+    dates = dates.dropna()
+    if dates.empty:
+        return period
+    lo, hi = dates.min(), dates.max()
+    for name in names[start:]:
+        freq = _PERIOD_FREQS[name]
+        if hi.to_period(freq).ordinal - lo.to_period(freq).ordinal + 1 <= max_periods:
+            return name
+    return names[-1]
+
+
+def preset_ranges(today: date) -> dict[str, tuple[date, date]]:
+    """Inclusive date range of each date-picker preset, relative to *today*."""
+    return {
+        "Ma": (today, today),
+        "7 nap": (today - timedelta(days=7), today),
+        "30 nap": (today - timedelta(days=30), today),
+        "Idén": (today.replace(month=1, day=1), today),
+        "Tavaly": (
+            today.replace(year=today.year - 1, month=1, day=1),
+            today.replace(year=today.year - 1, month=12, day=31),
+        ),
+    }
+
+
+def find_sku_col(df: pd.DataFrame):
+    for c in ["Cikkszám", "cikkszam", "SKU", "sku"]:
+        if c in df.columns:
+            return c
+    return None
+
+
+def find_name_col(df: pd.DataFrame):
+    for c in ["Cikknév", "cikknev", "Megnevezés"]:
+        if c in df.columns:
+            return c
+    return None
+
+
+def load_product_master() -> pd.DataFrame:
+    """Product master (Cikkszám, Cikknév) from the shared process-wide catalog."""
+    return get_catalog().frame
+
+
+def build_product_opts(products: pd.DataFrame) -> dict[str, str | None]:
+    """Build {label: sku} dict from a product DataFrame using vectorized ops."""
+    opts: dict[str, str | None] = {ALL_PRODUCTS_LABEL: None}
+    if products.empty:
+        return opts
+    sc = find_sku_col(products)
+    nc = find_name_col(products)
+    if not sc:
+        return opts
+    subset = (
+        products[[sc] + ([nc] if nc else [])]
+        .drop_duplicates(subset=[sc])
+        .dropna(subset=[sc])
+        .sort_values(nc if nc else sc)
+    )
+    if nc:
+        labels = subset[sc].astype(str) + LABEL_SEP + subset[nc].fillna("").astype(str)
+    else:
+        labels = subset[sc].astype(str)
+    skus = subset[sc].tolist()
+    for lbl, sku in zip(labels.tolist(), skus):
+        opts[lbl] = sku
+    return opts
@@ -0,0 +1,338 @@
+"""
+Size-bounded LRU cache of DataFrames on disk.
+
+Used by ``tharanis_client`` for its SOAP fallback cache. Each entry is one
+file in the cache directory — compressed Parquet by default, or
+uncompressed Arrow IPC (Feather v2) with ``fmt="arrow"``. Arrow entries
+are memory-mapped on load, so workers reading the same entry share the
+OS page cache, and a ``RowFilter`` on ``kelt`` / ``Cikkszám`` is applied
+before conversion to pandas: only the matching rows are materialized.
+An in-process index tracks size,
+write time and last access for every entry, and the last access is also
+mirrored into the file's atime so other processes (and the next start)
+see it. When the directory grows past its byte budget the least recently
+read entries are evicted.
+
+Writes go to a temporary file in the same directory and are renamed into
+place, so a concurrent reader in another Reflex worker sees either the old
+file or the new one — never a partial write. A file that fails to read is
+reported as a miss and left for the next write or sweep to replace; it is
+not deleted, since it may belong to a writer that is mid-rename.
+
+pyarrow is imported on first read or write, not at import.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Format name → file suffix. Files of every format are indexed and swept;
+# ``fmt`` only selects what new writes use.
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """Rows to keep on load: ``kelt`` within [start, end] and/or one ``Cikkszám``.
+
+    Conditions on columns the entry does not have are ignored.
+    """
+
+    start: pd.Timestamp | None = None
+    end: pd.Timestamp | None = None
+    cikkszam: str | None = None
+
+    def expression(self, columns: list[str]):
+        """The filter as a ``pyarrow.compute`` expression, or None if it selects everything."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        conditions = []
+        if "kelt" in columns:
+            if self.start is not None:
+                conditions.append(pc.field("kelt") >= pa.scalar(pd.Timestamp(self.start)))
+            if self.end is not None:
+                conditions.append(pc.field("kelt") <= pa.scalar(pd.Timestamp(self.end)))
+        if self.cikkszam is not None and "Cikkszám" in columns:
+            conditions.append(pc.field("Cikkszám") == self.cikkszam)
+        if not conditions:
+            return None
+        expr = conditions[0]
+        for cond in conditions[1:]:
+            expr = expr & cond
+        return expr
+
+
+@dataclass
+class CacheEntry:
+    """Index record for one cached file."""
+
+    size: int
+    written: float
+    last_access: float
+
+
+@dataclass
+class CacheStats:
+    """Counters since the cache object was created."""
+
+    hits: int = 0
+    misses: int = 0
+    read_errors: int = 0
+    writes: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class DiskCache:
+    """DataFrame cache in *directory* holding at most *max_bytes*.
+
+    Entries older than *max_age_days* (by write time) are dropped by
+    ``sweep``; ``load`` can additionally require a maximum age. *fmt* is
+    ``"parquet"`` or ``"arrow"`` (see the module docstring).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_age_days: float = 7,
+                 fmt: str = "parquet") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown cache format {fmt!r}; expected one of {sorted(FORMATS)}")
+        self.directory = Path(directory)
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._index: dict[str, CacheEntry] | None = None
+        self._lock = threading.RLock()
+        self._stats = CacheStats()
+        self._janitor: threading.Thread | None = None
+
+    # ── Index ────────────────────────────────────────────────────────────────
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}{FORMATS[self.fmt]}"
+
+    def _scan(self) -> dict[str, CacheEntry]:
+        index: dict[str, CacheEntry] = {}
+        if not self.directory.exists():
+            return index
+        for f in self.directory.iterdir():
+            if f.name.startswith(".") or f.suffix not in FORMATS.values():
+                continue
+            with contextlib.suppress(OSError):
+                st = f.stat()
+                index[f.name] = CacheEntry(
+                    st.st_size, st.st_mtime, max(st.st_atime, st.st_mtime)
+                )
+        return index
+
+    def _entries(self) -> dict[str, CacheEntry]:
+        # Built on first use, not at construction, so importing the owner is free
+        if self._index is None:
+            self._index = self._scan()
+        return self._index
+
+    def refresh(self) -> None:
+        """Re-scan the directory (picks up files written by other processes)."""
+        with self._lock:
+            old = self._entries()
+            index = self._scan()
+            for name, entry in index.items():
+                known = old.get(name)
+                # Same file as before: keep the newer of the two access records
+                if known is not None and known.written == entry.written:
+                    entry.last_access = max(entry.last_access, known.last_access)
+            self._index = index
+
+    def _stat_entry(self, path: Path) -> CacheEntry | None:
+        """Current index entry for *path*, re-checked against the file."""
+        try:
+            st = path.stat()
+        except OSError:
+            self._entries().pop(path.name, None)
+            return None
+        entry = self._entries().get(path.name)
+        if entry is None or entry.written != st.st_mtime:
+            entry = CacheEntry(st.st_size, st.st_mtime, max(st.st_atime, st.st_mtime))
+            self._entries()[path.name] = entry
+        return entry
+
+    # ── Reads and writes ─────────────────────────────────────────────────────
+
+    def age_seconds(self, path: Path) -> float | None:
+        """Seconds since *path* was written, or None if it is not cached."""
+        with self._lock:
+            entry = self._stat_entry(path)
+        return None if entry is None else time.time() - entry.written
+
+    def load(self, path: Path, max_age_seconds: float | None = None,
+             where: RowFilter | None = None) -> pd.DataFrame | None:
+        """Read *path* (only the rows matching *where*, if given).
+
+        None (a miss) if absent, older than *max_age_seconds* or unreadable.
+        """
+        with self._lock:
+            entry = self._stat_entry(path)
+            if entry is None or (
+                max_age_seconds is not None and time.time() - entry.written >= max_age_seconds
+            ):
+                self._stats.misses += 1
+                return None
+        try:
+            df = self._read(path, where)
+        except Exception:
+            logger.warning("Unreadable cache file %s, treating as a miss", path, exc_info=True)
+            with self._lock:
+                self._stats.read_errors += 1
+                self._stats.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            self._stats.hits += 1
+            entry.last_access = now
+        with contextlib.suppress(OSError):
+            os.utime(path, (now, entry.written))
+        return df
+
+    def save(self, df: pd.DataFrame, path: Path) -> bool:
+        """Write *df* to *path* atomically, then evict down to the budget."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                self._write(df, Path(tmp), path.suffix)
+                os.replace(tmp, path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+                raise
+        except Exception:
+            logger.warning("Failed to save cache to %s", path, exc_info=True)
+            return False
+
+        with self._lock:
+            self._stats.writes += 1
+            self._entries().pop(path.name, None)
+            self._stat_entry(path)
+            self._evict_to_budget()
+        return True
+
+    @staticmethod
+    def _read(path: Path, where: RowFilter | None = None) -> pd.DataFrame:
+        if path.suffix == FORMATS["arrow"]:
+            from pyarrow import feather
+
+            # Zero-copy view of the mapped file; filtering happens before to_pandas
+            table = feather.read_table(path, memory_map=True)
+            expr = where.expression(table.schema.names) if where else None
+            if expr is not None:
+                table = table.filter(expr)
+        else:
+            import pyarrow.parquet as pq
+
+            expr = where.expression(pq.read_schema(path).names) if where else None
+            table = pq.read_table(path, filters=expr)
+        return table.to_pandas()
+
+    @staticmethod
+    def _write(df: pd.DataFrame, path: Path, suffix: str) -> None:
+        if suffix == FORMATS["arrow"]:
+            from pyarrow import feather
+
+            # Uncompressed, so readers can map the file instead of decoding it
+            feather.write_feather(df, path, compression="uncompressed")
+        else:
+            df.to_parquet(path, index=False)
+
+    # ── Eviction ─────────────────────────────────────────────────────────────
+
+    def _remove(self, name: str) -> None:
+        with contextlib.suppress(OSError):
+            (self.directory / name).unlink()
+        if self._entries().pop(name, None) is not None:
+            self._stats.evictions += 1
+
+    def _evict_to_budget(self) -> None:
+        index = self._entries()
+        total = sum(e.size for e in index.values())
+        if total <= self.max_bytes:
+            return
+        for name, entry in sorted(index.items(), key=lambda kv: kv[1].last_access):
+            if total <= self.max_bytes:
+                break
+            self._remove(name)
+            total -= entry.size
+
+    def sweep(self) -> int:
+        """Drop expired entries and stray temp files, then evict LRU to the budget.
+
+        Returns the number of cache entries removed.
+        """
+        with self._lock:
+            before = self._stats.evictions
+            self.refresh()
+            cutoff = time.time() - self.max_age_days * 86400
+            for name, entry in list(self._entries().items()):
+                if entry.written < cutoff:
+                    self._remove(name)
+            self._evict_to_budget()
+            # Temp files left behind by a crashed writer
+            for tmp in self.directory.glob(".*.tmp"):
+                with contextlib.suppress(OSError):
+                    if tmp.stat().st_mtime < time.time() - 3600:
+                        tmp.unlink()
+            return self._stats.evictions - before
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            index = self._entries()
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                read_errors=self._stats.read_errors,
+                writes=self._stats.writes,
+                evictions=self._stats.evictions,
+                entries=len(index),
+                bytes=sum(e.size for e in index.values()),
+            )
+
+    # ── Background janitor ───────────────────────────────────────────────────
+
+    def start_janitor(self, interval_seconds: float) -> None:
+        """Sweep every *interval_seconds* from a daemon thread (idempotent)."""
+        if self._janitor is not None:
+            return
+        with self._lock:
+            if self._janitor is None:
+                self._janitor = threading.Thread(
+                    target=self._janitor_loop, args=(interval_seconds,),
+                    name=f"cache-janitor:{self.directory.name}", daemon=True,
+                )
+                self._janitor.start()
+
+    def _janitor_loop(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info("Cache janitor removed %d file(s) from %s", removed, self.directory)
+            except Exception:
+                logger.warning("Cache janitor sweep failed", exc_info=True)
+            time.sleep(interval_seconds)
@@ -4,86 +4,27 @@ Shared UI components and data helpers for SamanSport ERP Dashboard.
 
 import contextlib
 import logging
-import os
 import random
+import threading
 
 import streamlit as st
 import pandas as pd
 from datetime import timedelta
 
 import tharanis_client as api
-from config import CSV_PATH, ALL_PRODUCTS_LABEL
 from theme import LOADER_ICONS, svg
 
-logger = logging.getLogger(__name__)
-
-
-# ── Data helpers ──────────────────────────────────────────────────────────────
-
-def period_key(series: pd.Series, period: str) -> pd.Series:
-    if period == "Éves":
-        return series.dt.to_period("Y").astype(str)
-    if period == "Havi":
-        return series.dt.strftime("%Y-%m")
-    if period == "Heti":
-        return series.dt.to_period("W").astype(str)
-    return series.dt.strftime("%Y-%m-%d")
-
-
-def find_sku_col(df: pd.DataFrame):
-    for c in ["Cikkszám", "cikkszam", "SKU", "sku"]:
-        if c in df.columns:
-            return c
-    return None
-
-
-def find_name_col(df: pd.DataFrame):
-    for c in ["Cikknév", "cikknev", "Megnevezés"]:
-        if c in df.columns:
-            return c
-    return None
-
-
-@st.cache_data(ttl=timedelta(hours=6), show_spinner="Termék lista betöltése…")
-def load_product_master() -> pd.DataFrame:
-    if not os.path.exists(CSV_PATH):
-        return pd.DataFrame(columns=["Cikkszám", "Cikknév"])
-    df = pd.read_csv(
-        CSV_PATH, usecols=[9, 10], dtype=str,
-        encoding="utf-8-sig", on_bad_lines="skip",
-    )
-    df.columns = ["Cikkszám", "Cikknév"]
-    return (
-        df.dropna(subset=["Cikkszám", "Cikknév"])
-        .drop_duplicates(subset=["Cikkszám"])
-        .sort_values("Cikknév")
-        .reset_index(drop=True)
-    )
+# Data helpers live in the framework-free data_helpers module (used by the
+# Reflex app); re-exported here for the Streamlit pages.
+from data_helpers import (  # noqa: F401
+    build_product_opts,
+    find_name_col,
+    find_sku_col,
+    load_product_master,
+    period_key,
+)
 
-
-def build_product_opts(products: pd.DataFrame) -> dict[str, str | None]:
-    """Build {label: sku} dict from a product DataFrame using vectorized ops."""
-    opts: dict[str, str | None] = {ALL_PRODUCTS_LABEL: None}
-    if products.empty:
-        return opts
-    sc = find_sku_col(products)
-    nc = find_name_col(products)
-    if not sc:
-        return opts
-    subset = (
-        products[[sc] + ([nc] if nc else [])]
-        .drop_duplicates(subset=[sc])
-        .dropna(subset=[sc])
-        .sort_values(nc if nc else sc)
-    )
-    if nc:
-        labels = subset[sc].astype(str) + "  –  " + subset[nc].fillna("").astype(str)
-    else:
-        labels = subset[sc].astype(str)
-    skus = subset[sc].tolist()
-    for lbl, sku in zip(labels.tolist(), skus):
-        opts[lbl] = sku
-    return opts
+logger = logging.getLogger(__name__)
 
 
 # ── UI components ─────────────────────────────────────────────────────────────
@@ -161,10 +102,16 @@ def info_banner(text: str, icon_name: str = "info") -> None:
 
 # ── Fetch helpers ─────────────────────────────────────────────────────────────
 
+# st.cache_data runs the wrapped body on the caller's thread, and only on a
+# miss; the body sets this flag so the caller can tell which one happened.
+_cache_miss = threading.local()
+
+
 @st.cache_data(ttl=timedelta(hours=24), show_spinner="Értékesítési adatok betöltése…")
 def _cached_get_sales(start_str: str, end_str: str,
                       cikkszam: str | None) -> pd.DataFrame | None:
     """In-memory cache (24h TTL) backed by Parquet disk cache in tharanis_client."""
+    _cache_miss.flag = True
     return api.get_sales(start_str, end_str, cikkszam)
 
 
@@ -172,9 +119,18 @@ def _cached_get_sales(start_str: str, end_str: str,
 def _cached_get_movements(start_str: str, end_str: str,
                           cikkszam: str | None) -> pd.DataFrame | None:
     """In-memory cache (24h TTL) backed by Parquet disk cache in tharanis_client."""
+    _cache_miss.flag = True
     return api.get_stock_movements(start_str, end_str, cikkszam)
 
 
+def _counted_lookup(cache: str, fn, *args):
+    """Call an ``st.cache_data`` function and count the lookup as a hit or miss."""
+    _cache_miss.flag = False
+    result = fn(*args)
+    api.CACHE_LOOKUPS.inc(cache=cache, result="miss" if _cache_miss.flag else "hit")
+    return result
+
+
 def fetch_sales(cikkszam, start, end, force_refresh=False):
     start_str = start.strftime("%Y.%m.%d")
     end_str   = end.strftime("%Y.%m.%d")
@@ -183,7 +139,7 @@ def fetch_sales(cikkszam, start, end, force_refresh=False):
             _cached_get_sales.clear()
             df = api.get_sales(start_str, end_str, cikkszam, force_refresh=True)
         else:
-            df = _cached_get_sales(start_str, end_str, cikkszam)
+            df = _counted_lookup("st_sales", _cached_get_sales, start_str, end_str, cikkszam)
         if df is None or df.empty:
             st.warning("Nincs értékesítési adat a megadott feltételekre.")
             return None
@@ -202,7 +158,7 @@ def fetch_movements(cikkszam, start, end, force_refresh=False):
             _cached_get_movements.clear()
             df = api.get_stock_movements(start_str, end_str, cikkszam, force_refresh=True)
         else:
-            df = _cached_get_movements(start_str, end_str, cikkszam)
+            df = _counted_lookup("st_movements", _cached_get_movements, start_str, end_str, cikkszam)
         if df is None or df.empty:
             st.warning("Nincs mozgásadat.")
             return None
@@ -70,7 +70,9 @@ def hydrate_entity(entity: str, start_year: int, end_year: int):
             elif status == "skipped":
                 print(f"  {chunk}  skipped (fresh or already syncing)")
             else:
-                print(f"  {chunk}  {records:>6} records")
+                skipped = result.get("pages_skipped", 0)
+                pages = result.get("pages", 0)
+                print(f"  {chunk}  {records:>6} records  ({skipped}/{pages} pages unchanged)")
 
             time.sleep(DELAY_BETWEEN_CHUNKS)
 
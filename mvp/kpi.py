@@ -0,0 +1,198 @@
+"""
+Single-pass sales KPI kernel.
+
+``summarize_sales`` turns a sales frame (legacy column names, as returned
+by ``tharanis_client.get_sales``) into every number the dashboards show:
+headline KPIs, per-period revenue and quantity, and the top-N SKUs by
+revenue. It works on the underlying NumPy arrays — one factorization per
+key and one ``bincount`` per series — and has no UI dependencies, so the
+Reflex pages and the Streamlit helpers share it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Period names used by the UI toggles → NumPy datetime unit
+_PERIOD_UNITS = {"Éves": "Y", "Havi": "M", "Heti": "W", "Napi": "D"}
+
+
+@dataclass(frozen=True, eq=False)
+class SalesSummary:
+    """Aggregates for one sales frame and one period granularity."""
+
+    revenue: float = 0.0
+    net_revenue: float = 0.0
+    quantity: float = 0.0
+    avg_gross_price: float = 0.0
+    avg_net_price: float = 0.0
+    transactions: int = 0
+    active_months: int = 0
+    active_years: int = 0
+    # Chronologically sorted period labels (same format as helpers.period_key)
+    periods: list[str] = field(default_factory=list)
+    period_revenue: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    period_quantity: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    # Top SKUs by gross revenue, highest first
+    top_skus: list[str] = field(default_factory=list)
+    top_revenue: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return df[col].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _period_codes(days: np.ndarray, unit: str) -> np.ndarray:
+    """Map ``datetime64[D]`` values to sortable period codes."""
+    if unit == "W":
+        # pandas "W" periods run Monday–Sunday; day 0 (1970-01-01) is a Thursday
+        d = days.astype("int64")
+        return (d - (d + 3) % 7).astype("datetime64[D]")
+    return days.astype(f"datetime64[{unit}]")
+
+
+def _period_labels(codes: np.ndarray, unit: str) -> list[str]:
+    if unit == "W":
+        ends = codes + np.timedelta64(6, "D")
+        return [
+            f"{s}/{e}"
+            for s, e in zip(np.datetime_as_string(codes), np.datetime_as_string(ends))
+        ]
+    return np.datetime_as_string(codes).tolist()
+
+
+def top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the *n* largest *values*, largest first (ties by position)."""
+    if n <= 0 or len(values) == 0:
+        return np.zeros(0, dtype=int)
+    if n < len(values):
+        candidates = np.argpartition(-values, n - 1)[:n]
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order]
+
+
+def top_skus_by_revenue(
+    skus: pd.Series,
+    revenue: np.ndarray,
+    n: int = 10,
+) -> tuple[list[str], np.ndarray]:
+    """Top *n* SKUs by summed *revenue* (NaN counts as zero), highest first."""
+    codes, uniques = pd.factorize(skus, use_na_sentinel=True)
+    known = codes >= 0
+    per_sku = np.bincount(
+        codes[known], weights=np.nan_to_num(revenue)[known], minlength=len(uniques)
+    )
+    best = top_n_indices(per_sku, n)
+    return [str(s) for s in np.asarray(uniques)[best]], per_sku[best]
+
+
+def top_products_frame(
+    skus: list[str],
+    revenue,
+    total: float | None = None,
+    names=None,
+    name_len: int = 30,
+) -> pd.DataFrame:
+    """Ranking table for top-N charts, highest revenue first.
+
+    Columns: ``Cikkszám``, ``Cikknév``, ``Forgalom``, ``Pct`` (share of
+    *total*, default the sum of *revenue*) and ``Label`` —
+    ``"Name (SKU)"`` with the name cut to *name_len*, or just the SKU when
+    no name is known. *names* maps SKU → name (a dict, Series or
+    callable such as ``ProductCatalog.name``); by default the shared
+    product catalog is used through the blocking ``get_catalog``, so code
+    on the Reflex event loop passes names from ``aget_catalog`` instead.
+    """
+    if names is None:
+        from product_catalog import get_catalog
+
+        names = get_catalog().name
+    sku_s = pd.Series(skus, dtype=object).astype(str)
+    forgalom = pd.Series(np.asarray(revenue, dtype="float64"))
+    name_s = sku_s.map(names)
+    if total is None:
+        total = float(forgalom.sum())
+
+    label = (name_s.str.slice(0, name_len) + " (" + sku_s + ")").where(name_s.notna(), sku_s)
+    return pd.DataFrame({
+        "Cikkszám": sku_s,
+        "Cikknév": name_s,
+        "Forgalom": forgalom,
+        "Pct": forgalom / total * 100 if total else 0.0,
+        "Label": label,
+    })
+
+
+def summarize_sales(
+    df: pd.DataFrame,
+    period: str = "Havi",
+    top_n: int = 10,
+    sku_col: str | None = "Cikkszám",
+) -> SalesSummary:
+    """Compute all dashboard aggregates for *df* in one pass per key.
+
+    *period* is one of ``"Éves"``, ``"Havi"``, ``"Heti"``, ``"Napi"``
+    (anything else is daily, like ``helpers.period_key``). Missing values
+    count as zero in sums and are skipped in averages.
+    """
+    if df is None or df.empty:
+        return SalesSummary()
+
+    gross = _values(df, "Bruttó érték")
+    net = _values(df, "Nettó érték")
+    qty = _values(df, "Mennyiség")
+    gross_price = _values(df, "Bruttó ár")
+    net_price = _values(df, "Nettó ár")
+
+    gross0 = np.nan_to_num(gross)
+    qty0 = np.nan_to_num(qty)
+
+    def _mean(a: np.ndarray) -> float:
+        valid = ~np.isnan(a)
+        return float(a[valid].mean()) if valid.any() else 0.0
+
+    periods: list[str] = []
+    period_revenue = np.zeros(0)
+    period_quantity = np.zeros(0)
+    active_months = active_years = 0
+
+    if "kelt" in df.columns:
+        days = df["kelt"].to_numpy(dtype="datetime64[D]")
+        dated = ~np.isnat(days)
+        days = days[dated]
+        if len(days):
+            active_months = len(np.unique(days.astype("datetime64[M]")))
+            active_years = len(np.unique(days.astype("datetime64[Y]")))
+            unit = _PERIOD_UNITS.get(period, "D")
+            codes, inverse = np.unique(_period_codes(days, unit), return_inverse=True)
+            periods = _period_labels(codes, unit)
+            period_revenue = np.bincount(inverse, weights=gross0[dated], minlength=len(codes))
+            period_quantity = np.bincount(inverse, weights=qty0[dated], minlength=len(codes))
+
+    top_skus: list[str] = []
+    top_revenue = np.zeros(0)
+    if sku_col and sku_col in df.columns and top_n > 0:
+        top_skus, top_revenue = top_skus_by_revenue(df[sku_col], gross0, top_n)
+
+    return SalesSummary(
+        revenue=float(gross0.sum()),
+        net_revenue=float(np.nan_to_num(net).sum()),
+        quantity=float(qty0.sum()),
+        avg_gross_price=_mean(gross_price),
+        avg_net_price=_mean(net_price),
+        transactions=len(df),
+        active_months=active_months,
+        active_years=active_years,
+        periods=periods,
+        period_revenue=period_revenue,
+        period_quantity=period_quantity,
+        top_skus=top_skus,
+        top_revenue=top_revenue,
+    )
@@ -85,9 +85,22 @@ class SyncMetadata(BaseModel):
     error_message: str | None = None
     ttl_seconds: int
     pages_fetched: int = 0
+    pages_skipped: int = 0
     records_synced: int = 0
 
 
+class SyncPageHash(BaseModel):
+    """Row in ``sync_page_hashes`` (content hash of one raw SOAP page)."""
+
+    id: int | None = None
+    entity: str
+    filter_hash: str
+    page: int = Field(ge=0)
+    content_hash: str
+    record_count: int = 0
+    updated_at: datetime | None = None
+
+
 class EntityConfig(BaseModel):
     """Row in ``entity_config``."""
 
@@ -0,0 +1,239 @@
+"""
+Process-wide product master (cikk) with a prebuilt search index.
+
+The catalog is loaded once per process — from the Supabase ``products``
+table, falling back to the analytics CSV — and shared by the Reflex states
+and the Streamlit helpers. Lookups are read-only, so no per-session copies
+are needed.
+
+``get_catalog`` blocks while it (re)loads and is meant for Streamlit;
+code running on the Reflex event loop uses ``aget_catalog``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+import unicodedata
+
+import pandas as pd
+
+from config import CSV_PATH
+
+logger = logging.getLogger(__name__)
+
+LABEL_SEP = "  –  "
+
+_CATALOG_TTL_SECONDS = 6 * 3600
+
+
+def fold(text: str) -> str:
+    """Lower-case and strip accents so 'Cipő' and 'cipo' compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+class ProductCatalog:
+    """Immutable SKU → name catalog with SKU-prefix and name-substring search.
+
+    Index layout:
+      - ``_prefix_keys``: case-folded SKUs, sorted, for ``bisect`` prefix ranges
+      - ``_haystack``: one accent-folded string of ``"sku name"`` lines; a
+        substring search is a sequence of ``str.find`` calls, and ``_starts``
+        maps each hit offset back to its row.
+    """
+
+    def __init__(self, products: pd.DataFrame):
+        df = (
+            products[["Cikkszám", "Cikknév"]]
+            .dropna(subset=["Cikkszám"])
+            .astype({"Cikkszám": str})
+            .drop_duplicates(subset=["Cikkszám"])
+        )
+        df["Cikknév"] = df["Cikknév"].fillna("").astype(str)
+        df = df.sort_values(["Cikknév", "Cikkszám"]).reset_index(drop=True)
+
+        self._skus: list[str] = df["Cikkszám"].tolist()
+        self._names: list[str] = df["Cikknév"].tolist()
+        self._row_of: dict[str, int] = {sku: i for i, sku in enumerate(self._skus)}
+        self._frame = df
+
+        order = sorted(range(len(self._skus)), key=lambda i: self._skus[i].casefold())
+        self._prefix_keys = [self._skus[i].casefold() for i in order]
+        self._prefix_rows = order
+
+        self._starts: list[int] = []
+        parts: list[str] = []
+        pos = 0
+        for sku, name in zip(self._skus, self._names):
+            line = fold(f"{sku} {name}")
+            self._starts.append(pos)
+            parts.append(line)
+            pos += len(line) + 1
+        self._haystack = "\n".join(parts)
+
+    def __len__(self) -> int:
+        return len(self._skus)
+
+    def __contains__(self, sku: object) -> bool:
+        return sku in self._row_of
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Catalog as a ``Cikkszám``/``Cikknév`` DataFrame, sorted by name."""
+        return self._frame
+
+    def name(self, sku: str) -> str | None:
+        """Product name for *sku*, or None if unknown or unnamed."""
+        row = self._row_of.get(sku)
+        if row is None:
+            return None
+        return self._names[row] or None
+
+    def label(self, sku: str) -> str:
+        """Dropdown label ``"SKU  –  Name"`` (just the SKU when unnamed)."""
+        name = self.name(sku)
+        return f"{sku}{LABEL_SEP}{name}" if name else sku
+
+    def labels(self, skus) -> list[str]:
+        """Labels for *skus*, sorted by product name like the catalog itself."""
+        rows = sorted(
+            (self._row_of.get(s, len(self._skus)), s) for s in {str(s) for s in skus}
+        )
+        return [self.label(s) for _, s in rows]
+
+    def subset(self, skus) -> ProductCatalog:
+        """Catalog restricted to *skus*; SKUs unknown here are kept, unnamed."""
+        keys = sorted({str(s) for s in skus})
+        return ProductCatalog(pd.DataFrame({
+            "Cikkszám": keys,
+            "Cikknév": [self.name(s) for s in keys],
+        }))
+
+    def search(self, query: str, limit: int = 50) -> list[str]:
+        """Return up to *limit* SKUs matching *query*.
+
+        SKU prefix matches come first (in SKU order), then accent-insensitive
+        substring matches on ``"sku name"`` (in name order).
+        """
+        q = query.strip()
+        if not q:
+            return self._skus[:limit]
+
+        hits: list[int] = []
+        seen: set[int] = set()
+
+        key = q.casefold()
+        lo = bisect.bisect_left(self._prefix_keys, key)
+        hi = bisect.bisect_right(self._prefix_keys, key + "\uffff")
+        for i in range(lo, min(hi, lo + limit)):
+            row = self._prefix_rows[i]
+            hits.append(row)
+            seen.add(row)
+
+        needle = fold(q)
+        pos = self._haystack.find(needle)
+        while pos != -1 and len(hits) < limit:
+            row = bisect.bisect_right(self._starts, pos) - 1
+            if row not in seen:
+                hits.append(row)
+                seen.add(row)
+            # Jump to the next line so one product is not matched twice
+            next_start = self._starts[row + 1] if row + 1 < len(self._starts) else len(self._haystack)
+            pos = self._haystack.find(needle, next_start)
+
+        return [self._skus[r] for r in hits[:limit]]
+
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+_catalog: ProductCatalog | None = None
+_catalog_loaded_at: float = 0.0
+_catalog_lock = threading.Lock()
+
+
+def _load_from_csv() -> pd.DataFrame:
+    if not os.path.exists(CSV_PATH):
+        return pd.DataFrame(columns=["Cikkszám", "Cikknév"])
+    df = pd.read_csv(
+        CSV_PATH, usecols=[9, 10], dtype=str,
+        encoding="utf-8-sig", on_bad_lines="skip",
+    )
+    df.columns = ["Cikkszám", "Cikknév"]
+    return df.dropna(subset=["Cikkszám", "Cikknév"])
+
+
+def _load_products() -> pd.DataFrame:
+    """Products from Supabase, or the analytics CSV when that is unavailable."""
+    try:
+        import tharanis_client as api
+
+        df = api.get_products()
+        if df is not None and not df.empty:
+            return df
+    except Exception:
+        logger.warning("Product master read from Supabase failed, using CSV", exc_info=True)
+    return _load_from_csv()
+
+
+async def _aload_products() -> pd.DataFrame:
+    """``_load_products`` without blocking the event loop."""
+    try:
+        import tharanis_client as api
+
+        df = await api.aget_products()
+        if df is not None and not df.empty:
+            return df
+    except Exception:
+        logger.warning("Product master read from Supabase failed, using CSV", exc_info=True)
+    return await asyncio.to_thread(_load_from_csv)
+
+
+def _fresh_catalog() -> ProductCatalog | None:
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _catalog_loaded_at < _CATALOG_TTL_SECONDS:
+        return catalog
+    return None
+
+
+def _install(catalog: ProductCatalog) -> ProductCatalog:
+    global _catalog, _catalog_loaded_at
+    _catalog = catalog
+    _catalog_loaded_at = time.monotonic()
+    logger.info("Product catalog loaded: %d products", len(catalog))
+    return catalog
+
+
+def get_catalog() -> ProductCatalog:
+    """Return the process-wide catalog, loading it on first use (6h TTL)."""
+    catalog = _fresh_catalog()
+    if catalog is not None:
+        return catalog
+    with _catalog_lock:
+        return _fresh_catalog() or _install(ProductCatalog(_load_products()))
+
+
+async def aget_catalog() -> ProductCatalog:
+    """``get_catalog`` for the event loop: reloads through ``aget_products``.
+
+    The index is built in a worker thread. Sessions that find the catalog
+    expired at the same moment may each read the products once; the last
+    one to finish is kept.
+    """
+    catalog = _fresh_catalog()
+    if catalog is not None:
+        return catalog
+    catalog = await asyncio.to_thread(ProductCatalog, await _aload_products())
+    with _catalog_lock:
+        return _install(catalog)
+
+
+def reset_catalog() -> None:
+    """Drop the cached catalog so the next ``get_catalog()`` reloads it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
@@ -0,0 +1,306 @@
+"""
+In-memory cache of date-ranged DataFrames that answers sub-range queries.
+
+Used by ``tharanis_client`` in front of the Supabase and SOAP reads, so
+that switching from "Idén" to "30 nap" or "7 nap" does not fetch again.
+Each key (entity and product filter) holds the intervals it has covered.
+Intervals are disjoint inclusive ``[start, end]`` date ranges, each with
+its rows sorted by ``kelt``.
+
+``lookup`` returns two things:
+
+- the covered part of a request, cut out of each interval by binary search
+  on ``kelt`` (no I/O);
+- the gaps the caller still has to fetch.
+
+``store`` adds a fetched range. It replaces any rows the cache already held
+for that range and merges with overlapping or adjacent intervals, so a
+"7 nap" load followed by "30 nap" leaves one 30-day interval.
+
+Each interval remembers when each of its parts was stored. ``age`` reports
+how old the cached rows for a range are, so the caller can serve them and
+revalidate in the background.
+
+A part can also carry a *watermark*: the caller's marker for the newest
+source row it holds (``tharanis_client`` uses the max Supabase
+``synced_at``). ``watermarks`` returns them for a covered range, and
+``merge`` adds the rows that arrived since, without replacing the rest.
+With *id_col*, the source's row ids are kept beside each interval (not in
+the frames ``lookup`` returns), and ``merge`` skips rows it already holds,
+so callers can re-fetch an overlap safely. A merge does not count as a
+store: the parts keep their store times, so they still expire and get
+read in full again.
+
+Intervals expire *max_age* seconds after their oldest part was stored. Past
+*max_bytes*, the least recently looked-up keys are evicted. Rows without a
+``kelt`` cannot be located by date and are not cached.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+Gap = tuple[date, date]
+# (start, end, monotonic store time, watermark) of one part of an interval
+Stamp = tuple[date, date, float, str | None]
+
+
+@dataclass
+class _Interval:
+    """Rows for one covered ``[start, end]`` range, sorted by ``kelt``."""
+
+    start: date
+    end: date
+    frame: pd.DataFrame
+    kelt: np.ndarray
+    ids: np.ndarray  # source row id per row, -1 when unknown
+    stamps: list[Stamp]
+    nbytes: int
+
+    @property
+    def stored(self) -> float:
+        return min(t for _, _, t, _ in self.stamps)
+
+    def bounds(self, start: date, end: date) -> tuple[int, int]:
+        """Row positions ``[lo, hi)`` with ``start <= kelt <= end`` (binary search, no scan)."""
+        lo = np.searchsorted(self.kelt, np.datetime64(start, "ns"), side="left")
+        hi = np.searchsorted(self.kelt, np.datetime64(end + timedelta(days=1), "ns"), side="left")
+        return int(lo), int(hi)
+
+    def slice(self, start: date, end: date) -> pd.DataFrame:
+        lo, hi = self.bounds(start, end)
+        return self.frame.iloc[lo:hi]
+
+
+def _interval(start: date, end: date, frame: pd.DataFrame, ids: np.ndarray,
+              stamps: list[Stamp]) -> _Interval:
+    return _Interval(
+        start=start,
+        end=end,
+        frame=frame,
+        kelt=frame["kelt"].to_numpy(dtype="datetime64[ns]"),
+        ids=ids,
+        stamps=sorted(stamps, key=lambda p: p[0]),
+        nbytes=int(frame.memory_usage(deep=True).sum()) + ids.nbytes,
+    )
+
+
+def _outside(stamps: list[Stamp], start: date, end: date) -> list[Stamp]:
+    """The parts of *stamps* outside ``[start, end]``."""
+    kept = []
+    for a, b, t, w in stamps:
+        if a < start:
+            kept.append((a, min(b, start - timedelta(days=1)), t, w))
+        if b > end:
+            kept.append((max(a, end + timedelta(days=1)), b, t, w))
+    return kept
+
+
+def _inside(stamps: list[Stamp], start: date, end: date, watermark: str | None) -> list[Stamp]:
+    """The parts of *stamps* within ``[start, end]``, with *watermark* and their store times."""
+    return [
+        (max(a, start), min(b, end), t, watermark)
+        for a, b, t, _ in stamps if a <= end and start <= b
+    ]
+
+
+def combine(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate partial results into one frame ordered by ``kelt``."""
+    frames = [f for f in frames if f is not None]
+    frames = [f for f in frames if not f.empty] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("kelt", kind="stable", ignore_index=True)
+
+
+class RangeCache:
+    """Covered date intervals per key, bounded by *max_bytes* and *max_age* seconds."""
+
+    def __init__(self, max_bytes: int, max_age: float, id_col: str | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.id_col = id_col
+        self._intervals: OrderedDict[Hashable, list[_Interval]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(i.nbytes for ivs in self._intervals.values() for i in ivs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._intervals.clear()
+
+    def _split_ids(self, frame: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+        """*frame* without the id column, and the ids (-1 where unknown)."""
+        if self.id_col is None or self.id_col not in frame.columns:
+            return frame, np.full(len(frame), -1, dtype="int64")
+        ids = pd.to_numeric(frame[self.id_col], errors="coerce").fillna(-1).to_numpy("int64")
+        return frame.drop(columns=self.id_col), ids
+
+    def _live(self, key: Hashable) -> list[_Interval]:
+        """The key's unexpired intervals (expired ones are dropped). Caller holds the lock."""
+        intervals = self._intervals.get(key)
+        if not intervals:
+            return []
+        cutoff = time.monotonic() - self.max_age
+        live = [i for i in intervals if i.stored >= cutoff]
+        if len(live) != len(intervals):
+            if live:
+                self._intervals[key] = live
+            else:
+                del self._intervals[key]
+        return live
+
+    def lookup(self, key: Hashable, start: date, end: date) -> tuple[pd.DataFrame | None, list[Gap]]:
+        """Cached rows for ``[start, end]`` and the sub-ranges that are not cached.
+
+        Returns ``(None, [(start, end)])`` on a full miss and ``(frame, [])``
+        when the whole range is covered.
+        """
+        pieces: list[pd.DataFrame] = []
+        gaps: list[Gap] = []
+        with self._lock:
+            intervals = self._live(key)
+            if intervals:
+                self._intervals.move_to_end(key)
+            cursor = start
+            for iv in intervals:
+                if iv.end < cursor:
+                    continue
+                if iv.start > end:
+                    break
+                if iv.start > cursor:
+                    gaps.append((cursor, iv.start - timedelta(days=1)))
+                pieces.append(iv.slice(max(cursor, iv.start), min(end, iv.end)))
+                cursor = iv.end + timedelta(days=1)
+                if cursor > end:
+                    break
+            if cursor <= end:
+                gaps.append((cursor, end))
+        if not pieces:
+            return None, gaps
+        if len(pieces) == 1:
+            return pieces[0].reset_index(drop=True), gaps
+        return pd.concat(pieces, ignore_index=True), gaps
+
+    def age(self, key: Hashable, start: date, end: date) -> float | None:
+        """Seconds since the oldest cached rows within ``[start, end]`` were stored."""
+        with self._lock:
+            stored = [
+                t for i in self._live(key) for a, b, t, _ in i.stamps if a <= end and start <= b
+            ]
+        return time.monotonic() - min(stored) if stored else None
+
+    def watermarks(self, key: Hashable, start: date, end: date) -> list[tuple[date, date, str | None]] | None:
+        """The parts of ``[start, end]`` with their watermarks; None unless fully cached."""
+        with self._lock:
+            for iv in self._live(key):
+                if iv.start <= start and end <= iv.end:
+                    return [
+                        (max(a, start), min(b, end), w)
+                        for a, b, _, w in iv.stamps if a <= end and start <= b
+                    ]
+        return None
+
+    def merge(self, key: Hashable, start: date, end: date, rows: pd.DataFrame,
+              watermark: str | None) -> int | None:
+        """Add the *rows* dated within ``[start, end]`` to the cached rows for that range.
+
+        Unlike ``store``, the rows already cached are kept, and rows whose id
+        is already cached are skipped. The range's parts get *watermark* but
+        keep their store times; rows dated outside the range are dropped.
+        Returns the number of rows added, or None, changing nothing, unless
+        one interval covers the whole range.
+        """
+        if "kelt" in rows.columns:
+            # Same day bounds as _Interval.bounds; NaT falls outside
+            kelt = rows["kelt"].to_numpy(dtype="datetime64[ns]")
+            inside = (kelt >= np.datetime64(start, "ns")) & (
+                kelt < np.datetime64(end + timedelta(days=1), "ns")
+            )
+            rows = rows[inside]
+        else:
+            rows = rows.iloc[0:0]
+        rows, row_ids = self._split_ids(rows)
+        with self._lock:
+            intervals = self._live(key)
+            for n, iv in enumerate(intervals):
+                if iv.start <= start and end <= iv.end:
+                    break
+            else:
+                return None
+            new = (row_ids < 0) | ~np.isin(row_ids, iv.ids)
+            rows, row_ids = rows[new], row_ids[new]
+            frame, ids = iv.frame, iv.ids
+            if len(rows):
+                frame = pd.concat([frame, rows], ignore_index=True)
+                ids = np.concatenate([ids, row_ids])
+                order = np.argsort(frame["kelt"].to_numpy(dtype="datetime64[ns]"), kind="stable")
+                frame, ids = frame.iloc[order].reset_index(drop=True), ids[order]
+            stamps = [*_outside(iv.stamps, start, end), *_inside(iv.stamps, start, end, watermark)]
+            intervals[n] = _interval(iv.start, iv.end, frame, ids, stamps)
+            self._intervals[key] = intervals
+            self._evict()
+        return len(rows)
+
+    def store(self, key: Hashable, start: date, end: date, frame: pd.DataFrame,
+              watermark: str | None = None) -> None:
+        """Cache *frame* as the complete rows for ``[start, end]``.
+
+        Rows already cached for that range are replaced; the intervals on
+        either side are merged with it when they overlap or touch.
+        """
+        if "kelt" not in frame.columns:
+            return
+        frame = frame[frame["kelt"].notna()].sort_values("kelt", kind="stable", ignore_index=True)
+        frame, ids = self._split_ids(frame)
+        now = time.monotonic()
+        with self._lock:
+            before: list[pd.DataFrame] = []
+            after: list[pd.DataFrame] = []
+            before_ids: list[np.ndarray] = []
+            after_ids: list[np.ndarray] = []
+            kept: list[_Interval] = []
+            stamps: list[Stamp] = [(start, end, now, watermark)]
+            new_start, new_end = start, end
+            for iv in self._live(key):
+                if iv.end < start - timedelta(days=1) or iv.start > end + timedelta(days=1):
+                    kept.append(iv)
+                    continue
+                # Overlapping or adjacent: keep the parts outside [start, end]
+                if iv.start < start:
+                    lo, hi = iv.bounds(iv.start, start - timedelta(days=1))
+                    before.append(iv.frame.iloc[lo:hi])
+                    before_ids.append(iv.ids[lo:hi])
+                if iv.end > end:
+                    lo, hi = iv.bounds(end + timedelta(days=1), iv.end)
+                    after.append(iv.frame.iloc[lo:hi])
+                    after_ids.append(iv.ids[lo:hi])
+                new_start, new_end = min(new_start, iv.start), max(new_end, iv.end)
+                stamps += _outside(iv.stamps, start, end)
+            if before or after:
+                frame = pd.concat([*before, frame, *after], ignore_index=True)
+                ids = np.concatenate([*before_ids, ids, *after_ids])
+            kept.append(_interval(new_start, new_end, frame, ids, stamps))
+            kept.sort(key=lambda i: i.start)
+            self._intervals[key] = kept
+            self._intervals.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used keys until under budget. Caller holds the lock."""
+        total = sum(i.nbytes for ivs in self._intervals.values() for i in ivs)
+        while total > self.max_bytes and self._intervals:
+            _, intervals = self._intervals.popitem(last=False)
+            total -= sum(i.nbytes for i in intervals)
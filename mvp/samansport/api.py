@@ -0,0 +1,37 @@
+"""Backend HTTP routes served next to the Reflex event socket."""
+
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv_export
+import metrics
+
+
+async def export_csv(request: Request) -> Response:
+    """Stream a registered export (see csv_export.register) as a CSV download."""
+    export = csv_export.lookup(request.path_params["token"])
+    if export is None:
+        return PlainTextResponse("Export not found or expired", status_code=404)
+    return StreamingResponse(
+        csv_export.iter_csv(export.frame, export.columns),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'},
+    )
+
+
+async def metrics_text(request: Request) -> Response:
+    """Prometheus text exposition of the process-wide metrics registry."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+api = Starlette(routes=[
+    Route("/export/{token}", export_csv, methods=["GET"]),
+    Route("/metrics", metrics_text, methods=["GET"]),
+])
@@ -0,0 +1,228 @@
+"""Plotly figure builders for the Reflex pages.
+
+Every figure is held in state and re-serialized on each change, so the
+builders keep the payload small:
+
+- a shared ``samansport`` template replaces Plotly's default one, which
+  would otherwise be embedded in every figure (~6.5 KB each);
+- line and area series longer than the point budget are downsampled
+  with LTTB (largest-triangle-three-buckets), which keeps peaks and
+  troughs;
+- bar series are never sampled: callers re-aggregate them to a coarser
+  period (``data_helpers.fit_period``) and, as a last resort, bars still
+  over budget are merged into equal runs of consecutive periods using the
+  metric's own aggregation (sum or mean);
+- values are rounded to two decimals and long line series are drawn
+  with ``Scattergl``.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from samansport.styles import COLORS
+
+TEMPLATE = "samansport"
+
+# Roughly one point per two pixels of a full-width chart
+DEFAULT_WIDTH_PX = 1200
+PX_PER_POINT = 2
+# Line series longer than this (before downsampling) are drawn with WebGL
+WEBGL_MIN_POINTS = 1000
+
+pio.templates[TEMPLATE] = go.layout.Template(
+    layout=go.Layout(
+        autosize=True,
+        paper_bgcolor="white",
+        plot_bgcolor=COLORS["25"],
+        margin=dict(l=0, r=0, t=10, b=0),
+        font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
+        xaxis=dict(gridcolor=COLORS["100"]),
+        yaxis=dict(gridcolor=COLORS["100"], separatethousands=True),
+        showlegend=False,
+    )
+)
+
+
+# ── Downsampling ─────────────────────────────────────────────────────────────
+
+
+def point_budget(width_px: int = DEFAULT_WIDTH_PX) -> int:
+    """Maximum number of points worth sending for a chart *width_px* wide."""
+    return max(3, width_px // PX_PER_POINT)
+
+
+def lttb_indices(y, n_out: int) -> np.ndarray:
+    """Indices of the *n_out* points LTTB keeps from series *y*.
+
+    x is taken to be the point position, which matches the category axes
+    used by the period charts. The first and last points are always kept.
+    """
+    values = np.nan_to_num(np.asarray(y, dtype="float64"))
+    n = len(values)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    # n_out - 2 buckets over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            lo, hi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = (lo + hi - 1) / 2, values[lo:hi].mean()
+        else:
+            avg_x, avg_y = n - 1, values[-1]
+        xs = np.arange(start, end)
+        area = np.abs((a - avg_x) * (values[xs] - values[a]) - (a - xs) * (avg_y - values[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return keep
+
+
+def bucket_starts(n: int, n_out: int) -> np.ndarray:
+    """Starts of equal runs of consecutive points, at most *n_out* of them.
+
+    Every run has the same length except possibly the last, which is
+    shorter when the runs do not divide *n* evenly.
+    """
+    size = -(-n // max(n_out, 1)) if n else 1
+    return np.arange(0, n, size)
+
+
+def _bucket_labels(x, starts: np.ndarray) -> list:
+    labels = np.asarray(x, dtype=object)
+    ends = np.append(starts[1:], len(labels)) - 1
+    return [
+        labels[a] if a == b else f"{labels[a]} – {labels[b]}"
+        for a, b in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def _bucket_values(seq, starts: np.ndarray, agg: str = "sum") -> list:
+    """Combine each run with *agg*: ``"mean"`` averages, anything else sums."""
+    values = np.asarray(seq, dtype="float64")
+    if not len(starts):
+        return []
+    totals = np.add.reduceat(np.nan_to_num(values), starts)
+    if agg == "mean":
+        counts = np.add.reduceat((~np.isnan(values)).astype("float64"), starts)
+        totals = np.divide(totals, counts, out=np.full_like(totals, np.nan), where=counts > 0)
+    return np.round(totals, 2).tolist()
+
+
+def _take(seq, idx: np.ndarray) -> list:
+    arr = np.asarray(seq, dtype=object)
+    return arr[idx].tolist()
+
+
+def _take_values(seq, idx: np.ndarray) -> list:
+    # Two decimals is below what any HUF or quantity axis can show
+    return np.round(np.asarray(seq, dtype="float64")[idx], 2).tolist()
+
+
+# ── Figures ──────────────────────────────────────────────────────────────────
+
+
+def period_figure(
+    x,
+    y,
+    kind: str = "bar",
+    name: str = "",
+    color: str = COLORS["accent"],
+    height: int = 380,
+    y_title: str | None = None,
+    opacity: float = 1.0,
+    width_px: int = DEFAULT_WIDTH_PX,
+    agg: str = "sum",
+) -> go.Figure:
+    """Single-series period chart; *kind* is ``"bar"``, ``"line"`` or ``"area"``.
+
+    *agg* is how *y* was aggregated per period (``"sum"``, ``"mean"`` or
+    ``"count"``). Bars still over the point budget are merged into equal
+    runs of periods with it; lines and areas are downsampled with LTTB.
+    """
+    n = len(x)
+    if kind == "bar":
+        starts = bucket_starts(n, point_budget(width_px))
+        trace = go.Bar(
+            x=_bucket_labels(x, starts), y=_bucket_values(y, starts, agg), name=name,
+            marker=dict(color=color, opacity=opacity),
+        )
+    else:
+        idx = lttb_indices(y, point_budget(width_px))
+        xs, ys = _take(x, idx), _take_values(y, idx)
+        scatter = go.Scattergl if n > WEBGL_MIN_POINTS else go.Scatter
+        trace = scatter(
+            x=xs, y=ys, name=name,
+            mode="lines" if kind == "area" or n > WEBGL_MIN_POINTS else "lines+markers",
+            line=dict(color=color, width=2.5),
+            fill="tozeroy",
+            fillcolor="rgba(78,91,166,0.07)",
+        )
+
+    fig = go.Figure(trace)
+    fig.update_layout(
+        template=TEMPLATE,
+        height=height,
+        xaxis=dict(type="category"),
+        yaxis=dict(title=y_title) if y_title else {},
+    )
+    return fig
+
+
+def grouped_bar_figure(
+    x,
+    series: list[tuple[str, list, str]],
+    height: int = 380,
+    width_px: int = DEFAULT_WIDTH_PX,
+) -> go.Figure:
+    """Grouped bars for ``(name, values, color)`` series sharing one x axis.
+
+    The values are per-period sums; over the point budget, every series is
+    summed over the same equal runs of consecutive periods.
+    """
+    # Each category draws one bar per series
+    starts = bucket_starts(len(x), point_budget(width_px) // max(len(series), 1))
+    xs = _bucket_labels(x, starts)
+    fig = go.Figure([
+        go.Bar(x=xs, y=_bucket_values(values, starts), name=name, marker_color=color)
+        for name, values, color in series
+    ])
+    fig.update_layout(
+        template=TEMPLATE,
+        barmode="group",
+        height=height,
+        showlegend=True,
+        xaxis=dict(type="category"),
+    )
+    return fig
+
+
+def hbar_figure(labels, values, color: str = COLORS["accent"], height: int = 400) -> go.Figure:
+    """Horizontal ranking bar chart (e.g. top products)."""
+    fig = go.Figure(go.Bar(
+        x=list(values), y=list(labels), orientation="h",
+        marker=dict(color=color, opacity=0.85),
+    ))
+    fig.update_layout(
+        template=TEMPLATE,
+        height=height,
+        margin=dict(l=0, r=0, t=0, b=30),
+        yaxis=dict(type="category", automargin=True),
+        xaxis=dict(separatethousands=True, automargin=True),
+    )
+    return fig
+
+
+def figure_bytes(fig: go.Figure) -> int:
+    """Size of *fig* as it is sent to the browser (compact JSON, UTF-8)."""
+    return len(json.dumps(json.loads(fig.to_json()), separators=(",", ":")).encode())
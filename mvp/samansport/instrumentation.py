@@ -0,0 +1,312 @@
+"""
+Metrics and opt-in profiling for the Reflex state's event handlers.
+
+Metrics are served on ``/metrics`` (see ``api.py``).
+
+``@profiled`` samples handler calls when ``SAMANSPORT_PROFILE=N`` is set
+(every N-th call of each handler, so the first call of every handler is
+always one of them). While a sampled call runs, a background thread samples
+the handler thread's Python stack every ``SAMPLE_INTERVAL_S``. Each handler
+gets a folded-stack file, ``<qualname>.folded`` (one ``frame;frame;… count``
+line per stack), under ``SAMANSPORT_PROFILE_DIR`` (default
+``mvp/.profiles``). The files can be fed straight to ``flamegraph.pl``,
+speedscope or inferno. Each sampled call is also appended to
+``events.jsonl`` with:
+
+- wall and CPU time;
+- the size of the serialized state delta the call sends to the browser, so
+  payload bloat shows up next to CPU time.
+
+For coroutine and async-generator handlers, only the handler's own
+synchronous segments (between two suspensions) are timed, so wall and CPU
+time leave out the awaits themselves and whatever else the event loop runs
+meanwhile. Stacks are sampled only while the handler's frame is running.
+The delta sizes of all of an async generator's updates are summed.
+"""
+
+import contextlib
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+logger = logging.getLogger("profiling")
+
+# Time from the loading flag being pushed to the client until the handler
+# finishes, labelled by handler name (e.g. "load_sales_data").
+HANDLER_SECONDS = metrics.histogram(
+    "samansport_handler_seconds", "Reflex data-load handler duration", ("handler",)
+)
+HANDLER_ERRORS = metrics.counter(
+    "samansport_handler_errors_total", "Reflex data-load handlers that failed", ("handler",)
+)
+DELTA_BYTES = metrics.histogram(
+    "samansport_handler_delta_bytes",
+    "Serialized state delta per profiled handler call",
+    ("handler",),
+    buckets=(1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000),
+)
+
+
+# ── Profiling ────────────────────────────────────────────────────────────────
+
+SAMPLE_INTERVAL_S = 0.001
+
+
+def _env_every() -> int:
+    try:
+        return max(0, int(os.getenv("SAMANSPORT_PROFILE", "0") or 0))
+    except ValueError:
+        return 0
+
+
+_DEFAULT_DIRECTORY = Path(__file__).resolve().parent.parent / ".profiles"
+
+# Read on first use, after .env is loaded, unless configure() set them first
+_every: int | None = None
+_directory: Path | None = None
+
+_lock = threading.Lock()
+_calls: dict[str, itertools.count] = {}
+_stacks: dict[str, Counter] = {}
+
+
+def _load_settings() -> None:
+    global _every, _directory
+    from dotenv import load_dotenv
+    load_dotenv()
+    if _every is None:
+        _every = _env_every()
+    if _directory is None:
+        _directory = Path(os.getenv("SAMANSPORT_PROFILE_DIR") or _DEFAULT_DIRECTORY)
+
+
+def configure(every: int, directory: str | Path | None = None) -> None:
+    """Profile every *every*-th call of each handler (0 disables), writing to *directory*."""
+    global _every, _directory
+    _every = max(0, every)
+    if directory is not None:
+        _directory = Path(directory)
+    with _lock:
+        _calls.clear()
+        _stacks.clear()
+
+
+def _should_sample(name: str) -> bool:
+    if _every is None:
+        _load_settings()
+    if not _every:
+        return False
+    with _lock:
+        counter = _calls.setdefault(name, itertools.count())
+    return next(counter) % _every == 0
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame, root_code) -> str | None:
+    """Root-first ``;``-joined stack from the handler frame down to *frame*."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        if frame.f_code is root_code:
+            return ";".join(reversed(labels))
+        frame = frame.f_back
+    return None
+
+
+class _StackSampler:
+    """Samples one thread's stack on a timer for the duration of a ``with`` block."""
+
+    def __init__(self, root_code, stacks: Counter) -> None:
+        self.root_code = root_code
+        self.stacks = stacks
+        self.thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="handler-sampler", daemon=True)
+
+    def __enter__(self) -> "_StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(SAMPLE_INTERVAL_S):
+            stack = _fold(sys._current_frames().get(self.thread_id), self.root_code)
+            if stack:
+                self.stacks[stack] += 1
+
+
+def _delta_bytes(state) -> int | None:
+    """Size of the JSON state delta Reflex would send for *state*'s tree now."""
+    try:
+        from reflex.utils.format import json_dumps
+
+        return len(json_dumps(state._get_root_state().get_delta()).encode())
+    except Exception:
+        return None
+
+
+class _Resume:
+    """Hand a value a stepped coroutine yielded to the event loop, return what it sends back."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def __await__(self):
+        return (yield self.value)
+
+
+class _Profile:
+    """Timing, CPU, stack samples and delta sizes for one sampled handler call."""
+
+    def __init__(self, name: str, root_code) -> None:
+        self.name = name
+        self.root_code = root_code
+        self.stacks: Counter = Counter()
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.delta = 0
+
+    def sampling(self) -> _StackSampler:
+        """Sample the handler's stack for the whole call; suspended frames are not on it."""
+        return _StackSampler(self.root_code, self.stacks)
+
+    @contextlib.contextmanager
+    def step(self) -> Iterator[None]:
+        """Time one synchronous segment of the handler."""
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.wall += time.perf_counter() - t0
+            self.cpu += time.thread_time() - c0
+
+    async def run(self, awaitable):
+        """Await *awaitable*, timing only the segments it runs between suspensions."""
+        send, value = awaitable.send, None
+        while True:
+            try:
+                with self.step():
+                    yielded = send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                send, value = awaitable.send, await _Resume(yielded)
+            except BaseException as exc:  # e.g. cancellation: deliver it to the handler
+                send, value = awaitable.throw, exc
+
+    def add_delta(self, state) -> None:
+        size = _delta_bytes(state)
+        if size is not None:
+            self.delta += size
+
+    def finish(self) -> None:
+        DELTA_BYTES.observe(self.delta, handler=self.name)
+        record = {
+            "handler": self.name,
+            "ts": round(time.time(), 3),
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "delta_bytes": self.delta,
+            "samples": sum(self.stacks.values()),
+        }
+        try:
+            _write(self.name, self.stacks, record)
+        except OSError:
+            logger.warning("Could not write profile for %s", self.name, exc_info=True)
+
+
+def _write(name: str, stacks: Counter, record: dict) -> None:
+    if _directory is None:
+        _load_settings()
+    with _lock:
+        total = _stacks.setdefault(name, Counter())
+        total.update(stacks)
+        _directory.mkdir(parents=True, exist_ok=True)
+        (_directory / f"{name}.folded").write_text(
+            "".join(f"{stack} {n}\n" for stack, n in sorted(total.items())), encoding="utf-8"
+        )
+        with open(_directory / "events.jsonl", "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def profiled(fn):
+    """Decorator for state event handlers: profile sampled calls (see module docstring).
+
+    Keeps the handler's kind (plain, coroutine or async generator) so Reflex
+    dispatches it the same way.
+    """
+    name = fn.__qualname__
+    code = fn.__code__
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def agen_wrapper(self, *args, **kwargs):
+            if not _should_sample(name):
+                async for update in fn(self, *args, **kwargs):
+                    yield update
+                return
+            profile = _Profile(name, code)
+            agen = fn(self, *args, **kwargs)
+            try:
+                while True:
+                    with profile.sampling():
+                        try:
+                            update = await profile.run(agen.__anext__())
+                        except StopAsyncIteration:
+                            break
+                    profile.add_delta(self)
+                    yield update
+                profile.add_delta(self)
+            finally:
+                profile.finish()
+        return agen_wrapper
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def coro_wrapper(self, *args, **kwargs):
+            if not _should_sample(name):
+                return await fn(self, *args, **kwargs)
+            profile = _Profile(name, code)
+            try:
+                with profile.sampling():
+                    result = await profile.run(fn(self, *args, **kwargs).__await__())
+                profile.add_delta(self)
+                return result
+            finally:
+                profile.finish()
+        return coro_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not _should_sample(name):
+            return fn(self, *args, **kwargs)
+        profile = _Profile(name, code)
+        try:
+            with profile.sampling(), profile.step():
+                result = fn(self, *args, **kwargs)
+            profile.add_delta(self)
+            return result
+        finally:
+            profile.finish()
+    return wrapper
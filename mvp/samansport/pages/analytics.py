@@ -5,18 +5,23 @@ import plotly.graph_objects as go
 import pandas as pd
 import sys
 import os
-import csv
-import io
+import time
 from datetime import datetime, date
+from typing import Any
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from samansport.state import AppState
+from samansport.state import WATCH_FRESH_SECONDS, AppState
+from samansport.figures import grouped_bar_figure, period_figure, point_budget
+from samansport.instrumentation import HANDLER_ERRORS, HANDLER_SECONDS, profiled
 from samansport.styles import COLORS
 from samansport.templates.template import template
+from table_pager import page_count
 
 
 PERIOD_OPTIONS = ["Éves", "Havi", "Heti", "Napi"]
+PRODUCT_SUGGESTION_LIMIT = 50
+TABLE_PAGE_SIZE = 50
 METRIC_KEYS = [
     "Bruttó forgalom",
     "Nettó forgalom",
@@ -46,9 +51,10 @@ class AnalyticsState(AppState):
     selected_period: str = "Havi"
     chart_type: str = "Oszlop"
 
-    # Product selection
-    product_options: list[str] = ["— Összes termék —"]
+    # Product selection — typeahead; only the current matches reach the browser
     selected_product: str = "— Összes termék —"
+    product_query: str = ""
+    product_suggestions: list[str] = []
 
     # Plotly chart figures (Reflex serialises go.Figure natively)
     sales_chart: go.Figure = go.Figure()
@@ -67,16 +73,21 @@ class AnalyticsState(AppState):
     mov_net: str = "0 db"
     mov_types: str = "0"
 
-    # Data table (list of lists for rx.data_table)
-    table_data: list[list] = []
+    # Data tables — only the visible page is held in state (see table_pager)
     table_columns: list[str] = []
-    mov_table_data: list[dict] = []
-
-    # CSV download
-    csv_data: str = ""
-    csv_filename: str = ""
-    mov_csv_data: str = ""
-    mov_csv_filename: str = ""
+    table_rows: list[list] = []
+    table_page: int = 0
+    table_total: int = 0
+    table_sort_by: str = ""
+    table_sort_desc: bool = False
+    table_query: str = ""
+    mov_table_columns: list[str] = []
+    mov_table_rows: list[list] = []
+    mov_page: int = 0
+    mov_total: int = 0
+    mov_sort_by: str = ""
+    mov_sort_desc: bool = False
+    mov_query: str = ""
 
     # Loading states
     is_loading_sales: bool = False
@@ -86,39 +97,145 @@ class AnalyticsState(AppState):
 
     # Private (non-serialized) storage for DataFrames
     _sales_df: pd.DataFrame = pd.DataFrame()
+    _movements_df: pd.DataFrame = pd.DataFrame()
+    # Search index over the SKUs in _sales_df (ProductCatalog)
+    _product_index: Any = None
+    # Paged table backends (table_pager.FrameTable)
+    _sales_table: Any = None
+    _mov_table: Any = None
+    # ("YYYY.MM.DD", "YYYY.MM.DD") of the loaded frames, and a counter bumped
+    # by every load so older fresh-data watchers stop
+    _sales_range: tuple = ()
+    _mov_range: tuple = ()
+    _sales_seq: int = 0
+    _mov_seq: int = 0
+    # tharanis_client.revalidation_mark() taken before each read
+    _sales_mark: int = 0
+    _mov_mark: int = 0
+
+    @rx.var
+    def table_page_label(self) -> str:
+        return _page_label(self.table_page, self.table_total)
+
+    @rx.var
+    def mov_page_label(self) -> str:
+        return _page_label(self.mov_page, self.mov_total)
 
+    @profiled
     def set_tab(self, tab: str):
         self.active_tab = tab
 
+    @profiled
     def set_metric(self, metric: str):
         self.selected_metric = metric
         if self.has_sales_data:
             self._rebuild_sales_chart()
 
+    @profiled
     def set_analytics_period(self, period: str):
         self.selected_period = period
         if self.has_sales_data:
             self._rebuild_sales_chart()
 
+    @profiled
     def set_chart_type(self, chart_type: str):
         self.chart_type = chart_type
         if self.has_sales_data:
             self._rebuild_sales_chart()
 
+    @profiled
     def set_product(self, product: str):
         self.selected_product = product
+        self.product_query = ""
+        self.product_suggestions = []
         if self.has_sales_data:
             self._apply_product_filter()
 
+    @profiled
+    def clear_product(self):
+        self.set_product("— Összes termék —")
+
+    @profiled
+    def search_products(self, query: str):
+        """Typeahead: top matches by SKU prefix or accent-insensitive name."""
+        self.product_query = query
+        index = self._product_index
+        if index is None or not query.strip():
+            self.product_suggestions = []
+            return
+        self.product_suggestions = [
+            index.label(sku) for sku in index.search(query, limit=PRODUCT_SUGGESTION_LIMIT)
+        ]
+
+    # ── Paged tables ─────────────────────────────────────────────────────────
+
+    def _refresh_sales_page(self):
+        if self._sales_table is None:
+            self.table_rows, self.table_total = [], 0
+            return
+        self.table_rows, self.table_total = self._sales_table.page(
+            self.table_page, TABLE_PAGE_SIZE,
+            self.table_sort_by or None, self.table_sort_desc, self.table_query,
+        )
+        self.table_page = min(self.table_page, page_count(self.table_total, TABLE_PAGE_SIZE) - 1)
+
+    def _refresh_mov_page(self):
+        if self._mov_table is None:
+            self.mov_table_rows, self.mov_total = [], 0
+            return
+        self.mov_table_rows, self.mov_total = self._mov_table.page(
+            self.mov_page, TABLE_PAGE_SIZE,
+            self.mov_sort_by or None, self.mov_sort_desc, self.mov_query,
+        )
+        self.mov_page = min(self.mov_page, page_count(self.mov_total, TABLE_PAGE_SIZE) - 1)
+
+    @profiled
+    def set_table_page(self, page: int):
+        self.table_page = max(0, page)
+        self._refresh_sales_page()
+
+    @profiled
+    def sort_table(self, column: str):
+        """Sort by *column*; clicking the active column flips the direction."""
+        self.table_sort_desc = column == self.table_sort_by and not self.table_sort_desc
+        self.table_sort_by = column
+        self.table_page = 0
+        self._refresh_sales_page()
+
+    @profiled
+    def filter_table(self, query: str):
+        self.table_query = query
+        self.table_page = 0
+        self._refresh_sales_page()
+
+    @profiled
+    def set_mov_page(self, page: int):
+        self.mov_page = max(0, page)
+        self._refresh_mov_page()
+
+    @profiled
+    def sort_mov_table(self, column: str):
+        self.mov_sort_desc = column == self.mov_sort_by and not self.mov_sort_desc
+        self.mov_sort_by = column
+        self.mov_page = 0
+        self._refresh_mov_page()
+
+    @profiled
+    def filter_mov_table(self, query: str):
+        self.mov_query = query
+        self.mov_page = 0
+        self._refresh_mov_page()
+
+    @profiled
     async def load_sales_data(self):
         """Load sales data from the API."""
         self.is_loading_sales = True
+        self._sales_seq += 1
         yield
 
+        t0 = time.perf_counter()
         try:
             import tharanis_client as api
-            from theme import hu_thousands
-            from helpers import period_key, find_sku_col, find_name_col
 
             start = (
                 self.date_start
@@ -126,47 +243,86 @@ class AnalyticsState(AppState):
             ).replace("-", ".")
             end = (self.date_end or date.today().isoformat()).replace("-", ".")
 
-            df = api.get_sales(start, end, None)
+            from product_catalog import aget_catalog
+
+            self._sales_mark = api.revalidation_mark()
+            df = await api.aget_sales(start, end, None)
             if df is None or df.empty:
                 self.has_sales_data = False
                 self.is_loading_sales = False
                 return
 
-            # Store df reference for rebuilding (underscore-prefixed = private)
-            self._sales_df = df
-
-            # Build product options
-            sc = find_sku_col(df)
-            nc = find_name_col(df)
-            opts = ["— Összes termék —"]
-            if sc:
-                products = (
-                    df[[sc] + ([nc] if nc else [])]
-                    .drop_duplicates(subset=[sc])
-                    .sort_values(nc if nc else sc)
-                )
-                for _, row in products.iterrows():
-                    label = (
-                        f"{row[sc]}  –  {row[nc]}"
-                        if nc and pd.notna(row.get(nc))
-                        else str(row[sc])
-                    )
-                    opts.append(label)
-            self.product_options = opts
-
-            self.has_sales_data = True
-
-            # Build chart, summary, table for current product filter
-            self._apply_product_filter()
+            self._sales_range = (start, end)
+            self._set_sales(df, await aget_catalog())
         except Exception as e:
             print(f"Sales load error: {e}")
+            HANDLER_ERRORS.inc(handler="load_sales_data")
             self.has_sales_data = False
         finally:
             self.is_loading_sales = False
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, handler="load_sales_data")
+
+        if self.has_sales_data:
+            yield AnalyticsState.watch_fresh_sales
+
+    @rx.event(background=True)
+    async def watch_fresh_sales(self):
+        """Update the sales tab in place when fresher sales land for its range."""
+        import tharanis_client as api
+        from product_catalog import aget_catalog
+
+        async with self:
+            seq = self._sales_seq
+            start, end = self._sales_range
+            mark = self._sales_mark
+        while True:
+            event = await api.wait_for_revalidation(
+                "kimeno_szamla", start, end, timeout=WATCH_FRESH_SECONDS, after=mark
+            )
+            if event is None:
+                return
+            mark = event.seq
+            async with self:
+                if self._sales_seq != seq:
+                    return
+            df = await api.aget_sales(start, end, None)
+            catalog = await aget_catalog()
+            async with self:
+                if self._sales_seq != seq:
+                    return
+                if df is not None and not df.empty:
+                    self._set_sales(df, catalog, keep_page=True)
+
+    def _set_sales(self, df: pd.DataFrame, catalog, keep_page: bool = False):
+        """Show the sales *df*: product index, chart, summary and table.
+
+        *catalog* is the shared ``ProductCatalog``, fetched by the caller
+        with ``aget_catalog`` so a reload never blocks the event loop.
+        """
+        from data_helpers import find_sku_col
+
+        # Store df reference for rebuilding (underscore-prefixed = private)
+        self._sales_df = df
+
+        # Index only the products present in the loaded range
+        sc = find_sku_col(df)
+        self._product_index = (
+            catalog.subset(df[sc].dropna().unique()) if sc else None
+        )
+        self.product_suggestions = []
+
+        self.has_sales_data = True
+
+        # Build chart, summary, table for current product filter
+        page = self.table_page
+        self._apply_product_filter()
+        if keep_page:
+            self.table_page = page
+            self._refresh_sales_page()
 
     def _get_filtered_df(self) -> pd.DataFrame:
         """Return sales df filtered by selected product."""
-        from helpers import find_sku_col
+        from data_helpers import find_sku_col
 
         df = self._sales_df
         if df is None or df.empty:
@@ -184,7 +340,7 @@ class AnalyticsState(AppState):
     def _apply_product_filter(self):
         """Re-filter data, rebuild chart, summary and table for selected product."""
         from theme import hu_thousands
-        from helpers import find_sku_col, find_name_col
+        from data_helpers import find_sku_col, find_name_col
 
         df = self._get_filtered_df()
         if df is None or df.empty:
@@ -199,43 +355,66 @@ class AnalyticsState(AppState):
         # Rebuild chart
         self._rebuild_sales_chart()
 
-        # Rebuild table
-        table_df = df.copy()
-        table_df["kelt"] = table_df["kelt"].dt.strftime("%Y.%m.%d")
-        sc = find_sku_col(table_df)
-        nc = find_name_col(table_df)
-        # Build display table with selected columns
+        # Rebuild table backend; only the first page goes to the client
+        from table_pager import FrameTable
+
+        sc = find_sku_col(df)
+        nc = find_name_col(df)
         cols = ["kelt"]
         if sc:
             cols.append(sc)
         if nc:
             cols.append(nc)
         cols += ["Mennyiség", "Bruttó érték", "Nettó érték"]
-        available = [c for c in cols if c in table_df.columns]
-        self.table_columns = available
-        self.table_data = table_df[available].head(1000).values.tolist()
-
-        # Update CSV
+        self._sales_table = FrameTable(df, cols)
+        self.table_columns = self._sales_table.columns
+        self.table_page = 0
+        self._refresh_sales_page()
+
+    @profiled
+    def download_sales_csv(self):
+        """Export the filtered sales table; rendered only when downloaded."""
+        df = self._get_filtered_df()
+        if df is None or df.empty:
+            return
         start = (self.date_start or "").replace("-", ".")
         end = (self.date_end or "").replace("-", ".")
         sku_part = "osszes"
         if self.selected_product != "— Összes termék —":
             sku_part = self.selected_product.split("  –  ")[0].strip().replace("/", "-")
-        self.csv_data = table_df[available].to_csv(index=False)
-        self.csv_filename = f"samansport_ertekesites_{sku_part}_{start}_{end}.csv"
+        return _csv_download(
+            df, f"samansport_ertekesites_{sku_part}_{start}_{end}.csv", self.table_columns
+        )
+
+    @profiled
+    def download_movements_csv(self):
+        """Export all loaded movements; rendered only when downloaded."""
+        df = self._movements_df
+        if df is None or df.empty:
+            return
+        start = (
+            self.date_start
+            or date.today().replace(year=date.today().year - 1).isoformat()
+        ).replace("-", ".")
+        end = (self.date_end or date.today().isoformat()).replace("-", ".")
+        return _csv_download(df, f"samansport_mozgas_osszes_{start}_{end}.csv")
 
     def _rebuild_sales_chart(self):
         """Rebuild the sales chart based on current metric/period/chart_type."""
-        import plotly.graph_objects as go
-        from helpers import period_key
+        from data_helpers import fit_period, period_key
 
         df = self._get_filtered_df()
         if df is None or df.empty:
             return
 
         col_name, agg_fn, unit = METRIC_CFG[self.selected_metric]
+        kind = "bar" if self.chart_type == "Oszlop" else "line"
+        period = self.selected_period
+        if kind == "bar":
+            # Too many bars for the chart: group by a coarser period instead
+            period = fit_period(df["kelt"], period, point_budget())
         df2 = df.copy()
-        df2["Periódus"] = period_key(df2["kelt"], self.selected_period)
+        df2["Periódus"] = period_key(df2["kelt"], period)
         grouped = (
             df2.groupby("Periódus")[col_name]
             .agg(agg_fn)
@@ -243,57 +422,31 @@ class AnalyticsState(AppState):
             .sort_values("Periódus")
         )
 
-        self.summary_periods = str(grouped["Periódus"].nunique())
-
-        fig = go.Figure()
-        if self.chart_type == "Oszlop":
-            fig.add_trace(
-                go.Bar(
-                    x=grouped["Periódus"].tolist(),
-                    y=grouped[col_name].tolist(),
-                    marker_color=COLORS["accent"],
-                    name=self.selected_metric,
-                )
-            )
+        if period == self.selected_period:
+            self.summary_periods = str(grouped["Periódus"].nunique())
         else:
-            fig.add_trace(
-                go.Scatter(
-                    x=grouped["Periódus"].tolist(),
-                    y=grouped[col_name].tolist(),
-                    mode="lines+markers",
-                    name=self.selected_metric,
-                    line=dict(color=COLORS["accent"], width=2.5),
-                    fill="tozeroy",
-                    fillcolor="rgba(78,91,166,0.07)",
-                )
-            )
-        fig.update_layout(
-            height=380,
-            autosize=True,
-            paper_bgcolor="white",
-            plot_bgcolor=COLORS["25"],
-            margin=dict(l=0, r=0, t=10, b=0),
-            font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
-            xaxis=dict(gridcolor=COLORS["100"], type="category"),
-            yaxis=dict(
-                gridcolor=COLORS["100"],
-                separatethousands=True,
-                title=f"{self.selected_metric} ({unit})",
-            ),
-            showlegend=False,
+            # The card counts the periods the user picked, not the chart's
+            self.summary_periods = str(period_key(df["kelt"], self.selected_period).nunique())
+
+        self.sales_chart = period_figure(
+            grouped["Periódus"].tolist(),
+            grouped[col_name].tolist(),
+            kind=kind,
+            name=self.selected_metric,
+            y_title=f"{self.selected_metric} ({unit})",
+            agg=agg_fn,
         )
-        self.sales_chart = fig
 
+    @profiled
     async def load_movements_data(self):
         """Load warehouse movements data from the API."""
         self.is_loading_movements = True
+        self._mov_seq += 1
         yield
 
+        t0 = time.perf_counter()
         try:
             import tharanis_client as api
-            from theme import hu_thousands
-            from helpers import period_key
-            import plotly.graph_objects as go
 
             start = (
                 self.date_start
@@ -301,75 +454,106 @@ class AnalyticsState(AppState):
             ).replace("-", ".")
             end = (self.date_end or date.today().isoformat()).replace("-", ".")
 
-            mdf = api.get_stock_movements(start, end, None)
+            self._mov_mark = api.revalidation_mark()
+            mdf = await api.aget_stock_movements(start, end, None)
             if mdf is None or mdf.empty:
                 self.has_movements_data = False
                 self.is_loading_movements = False
                 return
 
-            # Summary
-            total_be = mdf[mdf["Irány"] == "B"]["Mennyiség"].sum()
-            total_ki = mdf[mdf["Irány"] == "K"]["Mennyiség"].sum()
-            net = total_be - total_ki
-            self.mov_incoming = f"{hu_thousands(total_be)} db"
-            self.mov_outgoing = f"{hu_thousands(total_ki)} db"
-            self.mov_net = f"{'+'if net > 0 else ''}{hu_thousands(net)} db"
-            self.mov_types = str(mdf["Mozgástípus"].nunique())
-
-            # Chart
-            mdf2 = mdf.copy()
-            mdf2["Periódus"] = period_key(mdf2["kelt"], self.selected_period)
-            be_map = (
-                mdf2[mdf2["Irány"] == "B"]
-                .groupby("Periódus")["Mennyiség"]
-                .sum()
-                .to_dict()
-            )
-            ki_map = (
-                mdf2[mdf2["Irány"] == "K"]
-                .groupby("Periódus")["Mennyiség"]
-                .sum()
-                .to_dict()
-            )
-            all_p = sorted(set(be_map) | set(ki_map))
-            be_v = [be_map.get(p, 0) for p in all_p]
-            ki_v = [ki_map.get(p, 0) for p in all_p]
-
-            fig = go.Figure()
-            fig.add_trace(
-                go.Bar(x=all_p, y=be_v, name="Beérkező", marker_color=COLORS["accent"])
-            )
-            fig.add_trace(
-                go.Bar(x=all_p, y=ki_v, name="Kiadó", marker_color=COLORS["charcoal"])
-            )
-            fig.update_layout(
-                barmode="group",
-                height=380,
-                autosize=True,
-                paper_bgcolor="white",
-                plot_bgcolor=COLORS["25"],
-                margin=dict(l=0, r=0, t=10, b=0),
-                font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
-                xaxis=dict(gridcolor=COLORS["100"], type="category"),
-                yaxis=dict(gridcolor=COLORS["100"], separatethousands=True),
-            )
-            self.movements_chart_data = fig
-
-            # Table
-            show_m = mdf.copy()
-            show_m["kelt"] = show_m["kelt"].dt.strftime("%Y.%m.%d")
-            self.mov_table_data = show_m.head(1000).to_dict("records")
-
-            # CSV
-            self.mov_csv_data = show_m.to_csv(index=False)
-            self.mov_csv_filename = f"samansport_mozgas_osszes_{start}_{end}.csv"
-
-            self.has_movements_data = True
+            self._mov_range = (start, end)
+            self._set_movements(mdf)
         except Exception as e:
             print(f"Movements load error: {e}")
+            HANDLER_ERRORS.inc(handler="load_movements_data")
             self.has_movements_data = False
         finally:
             self.is_loading_movements = False
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, handler="load_movements_data")
+
+        if self.has_movements_data:
+            yield AnalyticsState.watch_fresh_movements
+
+    @rx.event(background=True)
+    async def watch_fresh_movements(self):
+        """Update the movements tab in place when fresher movements land for its range."""
+        import tharanis_client as api
+
+        async with self:
+            seq = self._mov_seq
+            start, end = self._mov_range
+            mark = self._mov_mark
+        while True:
+            event = await api.wait_for_revalidation(
+                "raktari_mozgas", start, end, timeout=WATCH_FRESH_SECONDS, after=mark
+            )
+            if event is None:
+                return
+            mark = event.seq
+            async with self:
+                if self._mov_seq != seq:
+                    return
+            mdf = await api.aget_stock_movements(start, end, None)
+            async with self:
+                if self._mov_seq != seq:
+                    return
+                if mdf is not None and not mdf.empty:
+                    self._set_movements(mdf, keep_page=True)
+
+    def _set_movements(self, mdf: pd.DataFrame, keep_page: bool = False):
+        """Show the movements *mdf*: summary, chart and table."""
+        from theme import hu_thousands
+        from data_helpers import fit_period, period_key
+
+        # Summary
+        total_be = mdf[mdf["Irány"] == "B"]["Mennyiség"].sum()
+        total_ki = mdf[mdf["Irány"] == "K"]["Mennyiség"].sum()
+        net = total_be - total_ki
+        self.mov_incoming = f"{hu_thousands(total_be)} db"
+        self.mov_outgoing = f"{hu_thousands(total_ki)} db"
+        self.mov_net = f"{'+'if net > 0 else ''}{hu_thousands(net)} db"
+        self.mov_types = str(mdf["Mozgástípus"].nunique())
+
+        # Chart
+        mdf2 = mdf.copy()
+        # Two bars per period
+        period = fit_period(mdf2["kelt"], self.selected_period, point_budget() // 2)
+        mdf2["Periódus"] = period_key(mdf2["kelt"], period)
+        be_map = (
+            mdf2[mdf2["Irány"] == "B"]
+            .groupby("Periódus")["Mennyiség"]
+            .sum()
+            .to_dict()
+        )
+        ki_map = (
+            mdf2[mdf2["Irány"] == "K"]
+            .groupby("Periódus")["Mennyiség"]
+            .sum()
+            .to_dict()
+        )
+        all_p = sorted(set(be_map) | set(ki_map))
+        be_v = [be_map.get(p, 0) for p in all_p]
+        ki_v = [ki_map.get(p, 0) for p in all_p]
+
+        self.movements_chart_data = grouped_bar_figure(
+            all_p,
+            [
+                ("Beérkező", be_v, COLORS["accent"]),
+                ("Kiadó", ki_v, COLORS["charcoal"]),
+            ],
+        )
+
+        # Table
+        from table_pager import FrameTable
+
+        self._mov_table = FrameTable(mdf)
+        self.mov_table_columns = self._mov_table.columns
+        if not keep_page:
+            self.mov_page = 0
+        self._refresh_mov_page()
+        self._movements_df = mdf
+
+        self.has_movements_data = True
 
 
 # ---------------------------------------------------------------------------
@@ -384,8 +568,6 @@ class InventoryMonitorState(AppState):
     monitor_data: list[dict] = []
     monitor_loading: bool = False
     has_monitor_data: bool = False
-    monitor_csv_data: str = ""
-    monitor_csv_filename: str = ""
 
     @rx.var
     def total_monitored(self) -> int:
@@ -435,12 +617,14 @@ class InventoryMonitorState(AppState):
             ])
         return rows
 
+    @profiled
     async def load_monitor_data(self):
         self.monitor_loading = True
         yield
+        t0 = time.perf_counter()
         try:
             import tharanis_client as api
-            data = api.get_inventory_monitor(
+            data = await api.aget_inventory_monitor(
                 lookback_years=self.lookback_years,
                 top_n=100,
                 lead_time=self.lead_time,
@@ -448,30 +632,34 @@ class InventoryMonitorState(AppState):
             )
             self.monitor_data = data
             self.has_monitor_data = len(data) > 0
-            self._build_csv()
         except Exception as e:
             print(f"Inventory monitor load error: {e}")
+            HANDLER_ERRORS.inc(handler="load_monitor_data")
             self.has_monitor_data = False
         finally:
             self.monitor_loading = False
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, handler="load_monitor_data")
 
+    @profiled
     def set_lookback(self, years: str):
         self.lookback_years = int(years)
         return self.load_monitor_data()
 
+    @profiled
     def set_lead_time(self, months: str):
         self.lead_time = int(months)
         return self.load_monitor_data()
 
+    @profiled
     def set_service_level(self, level: str):
         self.service_level = float(level)
         return self.load_monitor_data()
 
-    def _build_csv(self):
+    @profiled
+    def download_csv(self):
+        """Export the monitor report; rendered only when downloaded."""
         if not self.monitor_data:
-            self.monitor_csv_data = ""
             return
-        buf = io.StringIO()
         cols = [
             "#", "Cikkszám", "Terméknév", "Stabilitás",
             "Havi eladás", "Havi hátra",
@@ -481,23 +669,38 @@ class InventoryMonitorState(AppState):
             "Javasolt 1h", "Javasolt 2h", "Javasolt 3h",
             "Státusz",
         ]
-        writer = csv.writer(buf)
-        writer.writerow(cols)
-        for r in self.monitor_data:
-            writer.writerow([
-                r.get("rank"), r.get("cikkszam"), r.get("cikknev"),
-                r.get("stability"),
-                r.get("month_sold_qty"), r.get("month_remaining_qty"),
-                r.get("forecast_m1"), r.get("forecast_m2"),
-                r.get("forecast_m3"),
-                r.get("on_inventory"), r.get("inventory_position"),
-                r.get("rop_1m"), r.get("rop_2m"), r.get("rop_3m"),
-                r.get("javasolt_1m"), r.get("javasolt_2m"), r.get("javasolt_3m"),
-                r.get("status"),
-            ])
-        self.monitor_csv_data = buf.getvalue()
+        keys = [
+            "rank", "cikkszam", "cikknev", "stability",
+            "month_sold_qty", "month_remaining_qty",
+            "forecast_m1", "forecast_m2", "forecast_m3",
+            "on_inventory", "inventory_position",
+            "rop_1m", "rop_2m", "rop_3m",
+            "javasolt_1m", "javasolt_2m", "javasolt_3m",
+            "status",
+        ]
+        report = pd.DataFrame(
+            [[r.get(k) for k in keys] for r in self.monitor_data], columns=cols
+        )
         today = date.today().isoformat()
-        self.monitor_csv_filename = f"samansport_keszlet_riport_{today}.csv"
+        return _csv_download(report, f"samansport_keszlet_riport_{today}.csv")
+
+
+def _csv_download(frame: pd.DataFrame, filename: str, columns: list[str] | None = None):
+    """Register *frame* with csv_export and point the browser at its stream."""
+    import csv_export
+    from reflex.config import get_config
+
+    token = csv_export.register(frame, filename, columns)
+    return rx.redirect(f"{get_config().api_url}/export/{token}")
+
+
+def _page_label(page: int, total: int) -> str:
+    from theme import hu_thousands
+
+    return (
+        f"{page + 1} / {page_count(total, TABLE_PAGE_SIZE)} oldal"
+        f" · {hu_thousands(total)} sor"
+    )
 
 
 def _fmt_num(val) -> str:
@@ -550,19 +753,139 @@ def _toggle_btn(
     )
 
 
+# ---------------------------------------------------------------------------
+# Paged table (rows, sorting and filtering are served by the backend)
+# ---------------------------------------------------------------------------
+def _paged_table(
+    title: str,
+    columns: rx.Var,
+    rows: rx.Var,
+    page: rx.Var,
+    page_label: rx.Var,
+    sort_by: rx.Var,
+    sort_desc: rx.Var,
+    query: rx.Var,
+    on_sort,
+    on_filter,
+    on_page,
+) -> rx.Component:
+    def header(col: rx.Var) -> rx.Component:
+        return rx.table.column_header_cell(
+            col,
+            rx.cond(sort_by == col, rx.cond(sort_desc, " ↓", " ↑"), ""),
+            on_click=on_sort(col),
+            cursor="pointer",
+            white_space="nowrap",
+        )
+
+    def row(values: rx.Var) -> rx.Component:
+        return rx.table.row(rx.foreach(values, lambda v: rx.table.cell(v)))
+
+    return rx.box(
+        rx.hstack(
+            rx.text(
+                title,
+                font_weight="700",
+                font_size="0.85rem",
+                color=COLORS["charcoal"],
+            ),
+            rx.spacer(),
+            rx.input(
+                value=query,
+                on_change=on_filter,
+                debounce_timeout=300,
+                placeholder="Szűrés…",
+                size="1",
+                width="220px",
+            ),
+            align="center",
+            width="100%",
+            margin_bottom="0.5rem",
+        ),
+        rx.table.root(
+            rx.table.header(rx.table.row(rx.foreach(columns, header))),
+            rx.table.body(rx.foreach(rows, row)),
+            size="1",
+            width="100%",
+        ),
+        rx.hstack(
+            rx.button("‹", on_click=on_page(page - 1), variant="soft", size="1"),
+            rx.text(page_label, font_size="0.8rem", color=COLORS["muted"]),
+            rx.button("›", on_click=on_page(page + 1), variant="soft", size="1"),
+            align="center",
+            justify="end",
+            spacing="3",
+            margin_top="0.5rem",
+        ),
+        background="white",
+        border_radius="10px",
+        padding="1rem",
+        border=f"1px solid {COLORS['100']}",
+        margin_bottom="1rem",
+        overflow="auto",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Sales tab
 # ---------------------------------------------------------------------------
-def _sales_tab() -> rx.Component:
+def _product_suggestion(label: rx.Var) -> rx.Component:
     return rx.box(
-        # Product selector
-        rx.select(
-            AnalyticsState.product_options,
-            value=AnalyticsState.selected_product,
-            on_change=AnalyticsState.set_product,
+        rx.text(label, font_size="0.85rem", color=COLORS["charcoal"]),
+        on_click=AnalyticsState.set_product(label),
+        padding="0.4rem 0.75rem",
+        cursor="pointer",
+        _hover={"background": COLORS["25"]},
+    )
+
+
+def _product_picker() -> rx.Component:
+    """Typeahead product selector; matches are searched on the backend."""
+    return rx.box(
+        rx.hstack(
+            rx.input(
+                value=AnalyticsState.product_query,
+                on_change=AnalyticsState.search_products,
+                debounce_timeout=250,
+                placeholder="Termék keresése (cikkszám vagy név)…",
+                width="100%",
+            ),
+            rx.button(
+                "Összes termék",
+                on_click=AnalyticsState.clear_product,
+                variant="soft",
+                color_scheme="gray",
+            ),
             width="100%",
-            margin_bottom="1rem",
+            spacing="2",
+        ),
+        rx.cond(
+            AnalyticsState.product_suggestions.length() > 0,
+            rx.box(
+                rx.foreach(AnalyticsState.product_suggestions, _product_suggestion),
+                max_height="320px",
+                overflow_y="auto",
+                background="white",
+                border=f"1px solid {COLORS['100']}",
+                border_radius="8px",
+                margin_top="0.25rem",
+            ),
         ),
+        rx.text(
+            AnalyticsState.selected_product,
+            font_size="0.8rem",
+            font_weight="600",
+            color=COLORS["muted"],
+            margin_top="0.35rem",
+        ),
+        width="100%",
+        margin_bottom="1rem",
+    )
+
+
+def _sales_tab() -> rx.Component:
+    return rx.box(
+        _product_picker(),
         # When no data loaded — show load button
         rx.cond(
             ~AnalyticsState.has_sales_data,
@@ -687,44 +1010,28 @@ def _sales_tab() -> rx.Component:
                 ),
                 # Data table
                 rx.cond(
-                    AnalyticsState.table_data.length() > 0,
-                    rx.box(
-                        rx.text(
-                            "Tranzakciók",
-                            font_weight="700",
-                            font_size="0.85rem",
-                            margin_bottom="0.5rem",
-                            color=COLORS["charcoal"],
-                        ),
-                        rx.data_table(
-                            data=AnalyticsState.table_data,
-                            columns=AnalyticsState.table_columns,
-                            pagination=True,
-                            search=True,
-                            sort=True,
-                        ),
-                        background="white",
-                        border_radius="10px",
-                        padding="1rem",
-                        border=f"1px solid {COLORS['100']}",
-                        margin_bottom="1rem",
-                        overflow="auto",
+                    AnalyticsState.table_columns.length() > 0,
+                    _paged_table(
+                        "Tranzakciók",
+                        columns=AnalyticsState.table_columns,
+                        rows=AnalyticsState.table_rows,
+                        page=AnalyticsState.table_page,
+                        page_label=AnalyticsState.table_page_label,
+                        sort_by=AnalyticsState.table_sort_by,
+                        sort_desc=AnalyticsState.table_sort_desc,
+                        query=AnalyticsState.table_query,
+                        on_sort=AnalyticsState.sort_table,
+                        on_filter=AnalyticsState.filter_table,
+                        on_page=AnalyticsState.set_table_page,
                     ),
                     rx.fragment(),
                 ),
                 # CSV download button
-                rx.cond(
-                    AnalyticsState.csv_data != "",
-                    rx.button(
-                        "CSV letöltése",
-                        on_click=rx.download(
-                            data=AnalyticsState.csv_data,
-                            filename=AnalyticsState.csv_filename,
-                        ),
-                        variant="outline",
-                        size="2",
-                    ),
-                    rx.fragment(),
+                rx.button(
+                    "CSV letöltése",
+                    on_click=AnalyticsState.download_sales_csv,
+                    variant="outline",
+                    size="2",
                 ),
             ),
         ),
@@ -793,20 +1100,31 @@ def _movements_tab() -> rx.Component:
                     width="100%",
                     margin_bottom="1rem",
                 ),
-                # CSV download for movements
+                # Movements table
                 rx.cond(
-                    AnalyticsState.mov_csv_data != "",
-                    rx.button(
-                        "CSV letöltése",
-                        on_click=rx.download(
-                            data=AnalyticsState.mov_csv_data,
-                            filename=AnalyticsState.mov_csv_filename,
-                        ),
-                        variant="outline",
-                        size="2",
+                    AnalyticsState.mov_table_columns.length() > 0,
+                    _paged_table(
+                        "Mozgások",
+                        columns=AnalyticsState.mov_table_columns,
+                        rows=AnalyticsState.mov_table_rows,
+                        page=AnalyticsState.mov_page,
+                        page_label=AnalyticsState.mov_page_label,
+                        sort_by=AnalyticsState.mov_sort_by,
+                        sort_desc=AnalyticsState.mov_sort_desc,
+                        query=AnalyticsState.mov_query,
+                        on_sort=AnalyticsState.sort_mov_table,
+                        on_filter=AnalyticsState.filter_mov_table,
+                        on_page=AnalyticsState.set_mov_page,
                     ),
                     rx.fragment(),
                 ),
+                # CSV download for movements
+                rx.button(
+                    "CSV letöltése",
+                    on_click=AnalyticsState.download_movements_csv,
+                    variant="outline",
+                    size="2",
+                ),
             ),
         ),
     )
@@ -976,18 +1294,11 @@ def _monitor_tab() -> rx.Component:
                     font_size="0.8rem",
                 ),
                 # CSV export
-                rx.cond(
-                    InventoryMonitorState.monitor_csv_data != "",
-                    rx.button(
-                        "CSV Exportálás",
-                        on_click=rx.download(
-                            data=InventoryMonitorState.monitor_csv_data,
-                            filename=InventoryMonitorState.monitor_csv_filename,
-                        ),
-                        variant="outline",
-                        size="2",
-                    ),
-                    rx.fragment(),
+                rx.button(
+                    "CSV Exportálás",
+                    on_click=InventoryMonitorState.download_csv,
+                    variant="outline",
+                    size="2",
                 ),
                 width="100%",
                 spacing="4",
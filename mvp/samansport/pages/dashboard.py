@@ -4,16 +4,22 @@ import reflex as rx
 import plotly.graph_objects as go
 import sys
 import os
+import time
 
 # Add mvp/ to path so we can import backend modules (tharanis_client, helpers, etc.)
 _mvp_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if _mvp_dir not in sys.path:
     sys.path.insert(0, _mvp_dir)
 
-from samansport.state import AppState
+from samansport.state import WATCH_FRESH_SECONDS, AppState
 from samansport.components.kpi_cards import kpi_card, kpi_grid
+from samansport.figures import hbar_figure, period_figure, point_budget
+from samansport.instrumentation import HANDLER_ERRORS, HANDLER_SECONDS, profiled
+from config import DASHBOARD_PERIODS
+from kpi import SalesSummary, summarize_sales, top_products_frame
 from samansport.styles import COLORS
 from samansport.templates.template import template
+from warmup import sales_summary
 
 
 # ---------------------------------------------------------------------------
@@ -29,19 +35,6 @@ def _hu_thousands(n, decimals=0):
     return formatted.replace(",", " ").replace(".", ",")
 
 
-def _period_key(series, period: str):
-    """Convert a datetime Series to period strings."""
-    import pandas as pd  # noqa: local import
-
-    if period == "Éves":
-        return series.dt.to_period("Y").astype(str)
-    if period == "Havi":
-        return series.dt.strftime("%Y-%m")
-    if period == "Heti":
-        return series.dt.to_period("W").astype(str)
-    return series.dt.strftime("%Y-%m-%d")
-
-
 def _find_sku_col(df):
     for c in ("Cikkszám", "cikkszam", "SKU", "sku"):
         if c in df.columns:
@@ -56,6 +49,16 @@ def _find_name_col(df):
     return None
 
 
+async def _catalog_name_lookup():
+    """``sku -> name`` from the shared product catalog (no-op if unavailable)."""
+    try:
+        from product_catalog import aget_catalog
+
+        return (await aget_catalog()).name
+    except Exception:
+        return lambda sku: None
+
+
 # ---------------------------------------------------------------------------
 # Dashboard state
 # ---------------------------------------------------------------------------
@@ -83,21 +86,29 @@ class DashboardState(AppState):
 
     # Private storage for the raw DataFrame so period changes can rebuild charts
     _raw_sales_df: object = None  # pd.DataFrame stored as object to avoid serialisation
+    _raw_sales_range: tuple = ()  # ("YYYY.MM.DD", "YYYY.MM.DD") of _raw_sales_df
+    _load_seq: int = 0  # bumped by every load so older fresh-data watchers stop
+    _fresh_mark: int = 0  # tharanis_client.revalidation_mark() taken before the read
 
-    def set_period(self, period: str):
+    @profiled
+    async def set_period(self, period: str):
         """Override parent to rebuild charts when dashboard period changes."""
         self.period = period
         if self._raw_sales_df is not None:
-            self._rebuild_charts(self._raw_sales_df)
+            df = self._raw_sales_df
+            self._rebuild_charts(
+                df, sales_summary(df, *self._raw_sales_range, period), await _catalog_name_lookup()
+            )
 
+    @profiled
     async def load_dashboard_data(self):
         """Fetch sales data and compute KPIs + charts."""
         self.is_loading = True
+        self._load_seq += 1
         yield
 
+        t0 = time.perf_counter()
         try:
-            import pandas as pd
-            import plotly.graph_objects as go
             import tharanis_client as api
 
             # Determine date range
@@ -114,174 +125,142 @@ class DashboardState(AppState):
             start_fmt = start.replace("-", ".")
             end_fmt = end.replace("-", ".")
 
-            df = api.get_sales(start_fmt, end_fmt, None)
+            self._fresh_mark = api.revalidation_mark()
+            df = await api.aget_sales(start_fmt, end_fmt, None)
             if df is None or df.empty:
                 self.has_data = False
                 self.is_loading = False
                 return
 
-            # ── KPIs ─────────────────────────────────────────────────
-            self.kpi_revenue = f"{_hu_thousands(df['Bruttó érték'].sum())} HUF"
-            self.kpi_quantity = f"{_hu_thousands(df['Mennyiség'].sum())} db"
-            self.kpi_avg_price = f"{_hu_thousands(df['Bruttó ár'].mean())} HUF"
-            self.kpi_transactions = _hu_thousands(len(df))
-
-            self.kpi_revenue_sub = (
-                f"{df['kelt'].dt.to_period('M').nunique()} aktív hónap"
-            )
-            self.kpi_quantity_sub = (
-                f"Nettó: {_hu_thousands(df['Nettó érték'].sum())} HUF"
-            )
-            self.kpi_avg_price_sub = (
-                f"Átl. nettó: {_hu_thousands(df['Nettó ár'].mean())} HUF"
-            )
-            self.kpi_transactions_sub = f"{df['kelt'].dt.year.nunique()} aktív év"
-
-            # Store raw df for period-change rebuilds
-            self._raw_sales_df = df
-
-            # Build charts from data
-            self._rebuild_charts(df)
-
-            self.has_data = True
+            self._show_sales(df, start_fmt, end_fmt, await _catalog_name_lookup())
         except Exception as e:
             print(f"Dashboard load error: {e}")
             import traceback
 
             traceback.print_exc()
+            HANDLER_ERRORS.inc(handler="load_dashboard_data")
             self.has_data = False
         finally:
             self.is_loading = False
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, handler="load_dashboard_data")
+
+        if self.has_data:
+            yield DashboardState.watch_fresh_sales
+
+    @rx.event(background=True)
+    async def watch_fresh_sales(self):
+        """Patch KPIs and charts in place when fresher sales land for the shown range."""
+        import tharanis_client as api
+
+        async with self:
+            seq = self._load_seq
+            start_fmt, end_fmt = self._raw_sales_range
+            mark = self._fresh_mark
+        while True:
+            event = await api.wait_for_revalidation(
+                "kimeno_szamla", start_fmt, end_fmt, timeout=WATCH_FRESH_SECONDS, after=mark
+            )
+            if event is None:
+                return
+            mark = event.seq
+            async with self:
+                if self._load_seq != seq:
+                    return
+            df = await api.aget_sales(start_fmt, end_fmt, None)
+            names = await _catalog_name_lookup()
+            async with self:
+                if self._load_seq != seq:
+                    return
+                if df is not None and not df.empty:
+                    self._show_sales(df, start_fmt, end_fmt, names)
+
+    def _show_sales(self, df, start_fmt: str, end_fmt: str, catalog_name):
+        """Set KPIs and charts from the sales *df* for ``[start_fmt, end_fmt]``.
+
+        *catalog_name* maps SKU → catalog name (see ``_catalog_name_lookup``).
+        """
+        # ── KPIs (one pass: KPIs, period series and top-10) ──────
+        # Warmed for the presets, so usually already computed
+        summary = sales_summary(df, start_fmt, end_fmt, self.period)
+        self.kpi_revenue = f"{_hu_thousands(summary.revenue)} HUF"
+        self.kpi_quantity = f"{_hu_thousands(summary.quantity)} db"
+        self.kpi_avg_price = f"{_hu_thousands(summary.avg_gross_price)} HUF"
+        self.kpi_transactions = _hu_thousands(summary.transactions)
+
+        self.kpi_revenue_sub = f"{summary.active_months} aktív hónap"
+        self.kpi_quantity_sub = (
+            f"Nettó: {_hu_thousands(summary.net_revenue)} HUF"
+        )
+        self.kpi_avg_price_sub = (
+            f"Átl. nettó: {_hu_thousands(summary.avg_net_price)} HUF"
+        )
+        self.kpi_transactions_sub = f"{summary.active_years} aktív év"
 
-    def _rebuild_charts(self, df):
-        """(Re)build revenue, quantity, and top-10 charts from *df*."""
-        import pandas as pd
-        import plotly.graph_objects as go
+        # Store raw df for period-change rebuilds
+        self._raw_sales_df = df
+        self._raw_sales_range = (start_fmt, end_fmt)
 
-        # ── Revenue trend (area) ─────────────────────────────────
-        df2 = df.copy()
-        df2["Periódus"] = _period_key(df2["kelt"], self.period)
-        monthly = (
-            df2.groupby("Periódus")["Bruttó érték"]
-            .sum()
-            .reset_index()
-            .sort_values("Periódus")
-        )
+        # Build charts from the same summary
+        self._rebuild_charts(df, summary, catalog_name)
 
-        fig_rev = go.Figure()
-        fig_rev.add_trace(
-            go.Scatter(
-                x=monthly["Periódus"].tolist(),
-                y=monthly["Bruttó érték"].tolist(),
-                mode="lines",
-                name="Bruttó forgalom",
-                line=dict(color=COLORS["accent"], width=2.5),
-                fill="tozeroy",
-                fillcolor="rgba(78,91,166,0.08)",
-            )
-        )
-        fig_rev.update_layout(
+        self.has_data = True
+
+    def _rebuild_charts(self, df, summary: SalesSummary | None = None,
+                        catalog_name=lambda sku: None):
+        """(Re)build revenue, quantity, and top-10 charts from *df*.
+
+        *catalog_name* maps SKU → catalog name for the top-10 labels.
+        """
+        if summary is None:
+            summary = summarize_sales(df, self.period, top_n=10, sku_col=_find_sku_col(df))
+
+        # ── Revenue trend (area) ─────────────────────────────────
+        self.revenue_chart = period_figure(
+            summary.periods,
+            summary.period_revenue,
+            kind="area",
+            name="Bruttó forgalom",
             height=260,
-            autosize=True,
-            paper_bgcolor="white",
-            plot_bgcolor=COLORS["25"],
-            margin=dict(l=0, r=0, t=10, b=0),
-            font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
-            xaxis=dict(gridcolor=COLORS["100"], type="category"),
-            yaxis=dict(gridcolor=COLORS["100"], separatethousands=True),
-            showlegend=False,
         )
-        self.revenue_chart = fig_rev
 
         # ── Quantity bar chart ───────────────────────────────────
-        mq = (
-            df2.groupby("Periódus")["Mennyiség"]
-            .sum()
-            .reset_index()
-            .sort_values("Periódus")
-        )
-        fig_qty = go.Figure(
-            go.Bar(
-                x=mq["Periódus"].tolist(),
-                y=mq["Mennyiség"].tolist(),
-                marker=dict(color=COLORS["charcoal"], opacity=0.8),
-            )
-        )
-        fig_qty.update_layout(
+        bars = summary
+        if len(summary.periods) > point_budget():
+            # Too many bars for the chart: sum by a coarser period instead
+            from data_helpers import fit_period
+
+            period = fit_period(df["kelt"], self.period, point_budget())
+            bars = summarize_sales(df, period, top_n=0, sku_col=None)
+        self.quantity_chart = period_figure(
+            bars.periods,
+            bars.period_quantity,
+            color=COLORS["charcoal"],
+            opacity=0.8,
             height=230,
-            autosize=True,
-            paper_bgcolor="white",
-            plot_bgcolor=COLORS["25"],
-            margin=dict(l=0, r=0, t=10, b=0),
-            font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
-            xaxis=dict(gridcolor=COLORS["100"], type="category"),
-            yaxis=dict(gridcolor=COLORS["100"], separatethousands=True),
-            showlegend=False,
         )
-        self.quantity_chart = fig_qty
 
         # ── Top 10 products (horizontal bar) ─────────────────────
-        sc = _find_sku_col(df)
-        if sc:
-            grp = (
-                df.groupby(sc)["Bruttó érték"]
-                .sum()
-                .nlargest(10)
-                .reset_index()
-            )
-            grp.columns = ["Cikkszám", "Forgalom"]
+        if summary.top_skus:
+            row_names: dict = {}
             nc = _find_name_col(df)
-            if nc:
-                names = (
-                    df[[sc, nc]]
-                    .drop_duplicates()
-                    .rename(columns={sc: "Cikkszám", nc: "Cikknév"})
-                )
-                grp = grp.merge(names, on="Cikkszám", how="left")
-            # Fallback: load product names from CSV master if not in data
-            if "Cikknév" not in grp.columns or grp["Cikknév"].isna().all():
-                try:
-                    from helpers import load_product_master
-                    pm = load_product_master()
-                    if not pm.empty:
-                        grp = grp.drop(columns=["Cikknév"], errors="ignore")
-                        grp = grp.merge(
-                            pm[["Cikkszám", "Cikknév"]].drop_duplicates(subset=["Cikkszám"]),
-                            on="Cikkszám", how="left",
-                        )
-                except Exception:
-                    pass
-            grp["Label"] = grp.apply(
-                lambda r: (
-                    f"{r['Cikknév'][:30]} ({r['Cikkszám']})"
-                    if pd.notna(r.get("Cikknév"))
-                    else str(r["Cikkszám"])
-                ),
-                axis=1,
+            sc = _find_sku_col(df)
+            if nc and sc:
+                # Names carried by the sales rows win; only the top SKUs' rows are read
+                rows = df.loc[df[sc].isin(summary.top_skus), [sc, nc]].dropna()
+                row_names = dict(zip(rows[sc].astype(str), rows[nc]))
+            grp = top_products_frame(
+                summary.top_skus,
+                summary.top_revenue,
+                summary.revenue,
+                lambda sku: row_names.get(sku) or catalog_name(sku),
             )
+            grp = grp.iloc[::-1]  # plotly draws the first bar at the bottom
 
-            grp = grp.sort_values("Forgalom").reset_index(drop=True)
-
-            fig_top = go.Figure(
-                go.Bar(
-                    x=grp["Forgalom"].tolist(),
-                    y=grp["Label"].tolist(),
-                    orientation="h",
-                    marker=dict(color=COLORS["accent"], opacity=0.85),
-                )
-            )
-            fig_top.update_layout(
+            self.top10_chart = hbar_figure(
+                grp["Label"].tolist(),
+                grp["Forgalom"].tolist(),
                 height=max(400, len(grp) * 42),
-                autosize=True,
-                paper_bgcolor="white",
-                plot_bgcolor=COLORS["25"],
-                margin=dict(l=0, r=0, t=0, b=30),
-                font=dict(color=COLORS["charcoal"], size=13, family="Inter"),
-                yaxis=dict(type="category", automargin=True),
-                xaxis=dict(separatethousands=True, automargin=True),
-                showlegend=False,
             )
-            self.top10_chart = fig_top
 
 
 # ---------------------------------------------------------------------------
@@ -318,9 +297,8 @@ def _chart_card(title: str, chart_data: rx.Var) -> rx.Component:
 
 def _period_toggle() -> rx.Component:
     """Radio-button-style period selector."""
-    periods = ["Éves", "Havi", "Heti", "Napi"]
     buttons = []
-    for p in periods:
+    for p in DASHBOARD_PERIODS:
         buttons.append(
             rx.button(
                 p,
@@ -4,6 +4,15 @@ import reflex as rx
 
 # Import pages so their @rx.page decorators register routes
 from samansport.pages import dashboard, analytics  # noqa: F401
+from samansport.api import api
 from samansport.styles import BASE_STYLE
 
-app = rx.App(style=BASE_STYLE)
+import tharanis_client
+import warmup  # mvp/ is on sys.path once the pages are imported
+
+app = rx.App(style=BASE_STYLE, api_transformer=api)
+
+# Open the SOAP fallback disk cache off the event loop before the first request
+app.register_lifespan_task(tharanis_client.ainit_disk_cache)
+# Preload the date presets at start and after every completed sync
+app.register_lifespan_task(warmup.run_forever)
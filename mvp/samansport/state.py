@@ -1,6 +1,19 @@
 import reflex as rx
+import sys
+import os
 from datetime import datetime, date, timedelta
 
+# Add mvp/ to path so we can import backend modules (data_helpers, tharanis_client)
+_mvp_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _mvp_dir not in sys.path:
+    sys.path.insert(0, _mvp_dir)
+
+from data_helpers import preset_ranges
+
+# How long a page keeps listening for fresher data (tharanis_client
+# revalidations) for the range it shows before it stops until the next load
+WATCH_FRESH_SECONDS = 15 * 60
+
 
 class AppState(rx.State):
     """Global application state."""
@@ -27,14 +40,6 @@ class AppState(rx.State):
     def check_connection_and_sync(self):
         """Fetch connection health and last sync timestamp from the API."""
         try:
-            import sys
-            import os
-
-            _mvp_dir = os.path.dirname(
-                os.path.dirname(os.path.abspath(__file__))
-            )
-            if _mvp_dir not in sys.path:
-                sys.path.insert(0, _mvp_dir)
             import tharanis_client as api
 
             health = api.check_connection()
@@ -95,17 +100,7 @@ class AppState(rx.State):
         self.sidebar_collapsed = not self.sidebar_collapsed
 
     def set_preset(self, preset: str):
-        today = date.today()
-        ranges = {
-            "Ma": (today, today),
-            "7 nap": (today - timedelta(days=7), today),
-            "30 nap": (today - timedelta(days=30), today),
-            "Idén": (today.replace(month=1, day=1), today),
-            "Tavaly": (
-                today.replace(year=today.year - 1, month=1, day=1),
-                today.replace(year=today.year - 1, month=12, day=31),
-            ),
-        }
+        ranges = preset_ranges(date.today())
         if preset in ranges:
             start, end = ranges[preset]
             self.date_start = start.isoformat()
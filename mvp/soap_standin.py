@@ -0,0 +1,378 @@
+"""
+Local stand-in for the Tharanis ``apiv3.php`` SOAP endpoint.
+
+Serves deterministic synthetic ``kimeno_szamla``, ``raktari_mozgas`` and
+``keszlet`` data in the same envelope ``tharanis_client`` sends and parses,
+so the SOAP fallback path can be tested and benchmarked offline:
+
+- the request body is the ``leker`` envelope from ``_build_envelope``;
+- ``limit`` / ``oldal`` page over ``<elem>`` records (invoices, movement
+  documents or products);
+- ``szurok`` filters on dates (``teljdat`` / ``kelt``), ``storno`` /
+  ``torolt`` and ``cikksz`` are honored;
+- data volume is SKUs × years × lines per day, generated once from a seed;
+- every response can be delayed by a fixed latency plus random jitter.
+
+Usage::
+
+    with StandinServer(SyntheticTharanis(skus=500, years=3)) as server:
+        ...  # point THARANIS_API_URL (or _Config.api_url) at server.url
+
+or from the command line::
+
+    python -m soap_standin --port 8765 --skus 500 --years 3 --latency-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+MOVEMENT_TYPES = ["Beszállítás", "Értékesítés", "Átmozgatás", "Leltár"]
+
+_DATE_FIELDS = {"kimeno_szamla": "teljdat", "raktari_mozgas": "kelt"}
+_DELETED_FIELDS = {"kimeno_szamla": "storno", "raktari_mozgas": "torolt"}
+
+_OPS = {
+    "=": np.equal, "!=": np.not_equal,
+    ">=": np.greater_equal, "<=": np.less_equal,
+    ">": np.greater, "<": np.less,
+}
+
+
+@dataclass(frozen=True)
+class Filter:
+    """One ``<szuro>``: field, relation and value."""
+
+    field: str
+    op: str
+    value: str
+
+
+def parse_leker(leker_xml: str) -> tuple[int, int, list[Filter]]:
+    """``(limit, oldal, filters)`` from a ``<leker>`` document."""
+    limit = re.search(r"<limit>(\d+)</limit>", leker_xml)
+    page = re.search(r"<oldal>(\d+)</oldal>", leker_xml)
+    filters = [
+        Filter(m.group(1).strip(), html.unescape(m.group(2)).strip(), m.group(3).strip())
+        for m in re.finditer(
+            r"<szuro><mezo>(.*?)</mezo><relacio>(.*?)</relacio><ertek>(.*?)</ertek></szuro>",
+            leker_xml, re.DOTALL,
+        )
+    ]
+    return (int(limit.group(1)) if limit else 200, int(page.group(1)) if page else 0, filters)
+
+
+def _hu_date(days: np.ndarray) -> np.ndarray:
+    return np.char.replace(np.datetime_as_string(days, unit="D"), "-", ".")
+
+
+class SyntheticTharanis:
+    """Deterministic synthetic Tharanis data set.
+
+    *years* of history ending on *end_date*; each day has *lines_per_day*
+    invoice lines grouped *lines_per_invoice* to an invoice, and half as
+    many movement lines. SKU popularity follows a power law and November /
+    December sell double, so seasonality and top-N code has something to find.
+    """
+
+    def __init__(
+        self,
+        skus: int = 200,
+        years: float = 3,
+        lines_per_day: int = 40,
+        lines_per_invoice: int = 3,
+        end_date: date = date(2025, 12, 31),
+        seed: int = 7354,
+    ) -> None:
+        self.skus = skus
+        self.years = years
+        self.lines_per_day = lines_per_day
+        self.lines_per_invoice = lines_per_invoice
+        self.end_date = end_date
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        end = np.datetime64(end_date, "D")
+        n_days = max(1, int(round(years * 365.25)))
+        self.start_date = (end - np.timedelta64(n_days - 1, "D")).astype(object)
+        days = np.arange(end - np.timedelta64(n_days - 1, "D"), end + np.timedelta64(1, "D"))
+
+        self.sku_codes = np.array([f"SK-{i:05d}" for i in range(skus)])
+        popularity = 1.0 / np.arange(1, skus + 1) ** 0.8
+        popularity /= popularity.sum()
+        net_price = rng.integers(20, 400, skus) * 100.0
+
+        self.sales = self._lines(rng, days, lines_per_day, lines_per_invoice, popularity)
+        self.sales["netto_ar"] = net_price[self.sales["sku"]]
+        self.sales["storno"] = (self.sales["doc"] % 97 == 0).astype(int)
+
+        self.movements = self._lines(rng, days, max(1, lines_per_day // 2), 2, popularity)
+        n_docs = int(self.movements["doc"].max()) + 1 if len(self.movements["doc"]) else 0
+        doc_type = rng.integers(0, len(MOVEMENT_TYPES), n_docs)
+        self.movements["tipus"] = doc_type[self.movements["doc"]]
+        self.movements["torolt"] = (self.movements["doc"] % 89 == 0).astype(int)
+
+        self.stock = rng.integers(0, 40, (skus, 6))
+
+    @staticmethod
+    def _lines(rng, days, per_day, per_doc, popularity) -> dict[str, np.ndarray]:
+        n = len(days) * per_day
+        day = np.repeat(days, per_day)
+        pos = np.tile(np.arange(per_day), len(days))
+        docs_per_day = -(-per_day // per_doc)
+        doc = np.repeat(np.arange(len(days)), per_day) * docs_per_day + pos // per_doc
+        month = day.astype("datetime64[M]").astype(int) % 12 + 1
+        qty = rng.integers(1, 4, n) * np.where(month >= 11, 2, 1)
+        return {
+            "day": day,
+            "doc": doc,
+            "sku": rng.choice(len(popularity), n, p=popularity),
+            "menny": qty.astype(float),
+        }
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _doc_mask(self, lines: dict[str, np.ndarray], entity: str,
+                  filters: list[Filter]) -> np.ndarray:
+        """Which documents (by id) pass every filter."""
+        n_docs = int(lines["doc"].max()) + 1 if len(lines["doc"]) else 0
+        keep = np.ones(n_docs, dtype=bool)
+        for f in filters:
+            op = _OPS.get(f.op)
+            if op is None:
+                continue
+            if f.field == _DATE_FIELDS[entity]:
+                value = np.datetime64(f.value.replace(".", "-"), "D")
+                doc_day = np.zeros(n_docs, dtype="datetime64[D]")
+                doc_day[lines["doc"]] = lines["day"]
+                keep &= op(doc_day, value)
+            elif f.field == _DELETED_FIELDS[entity]:
+                deleted = np.zeros(n_docs, dtype=int)
+                deleted[lines["doc"]] = lines[f.field]
+                keep &= op(deleted, int(f.value))
+            elif f.field == "cikksz" and f.op == "=":
+                # Documents containing the SKU are returned whole
+                has = np.zeros(n_docs, dtype=bool)
+                has[lines["doc"][self.sku_codes[lines["sku"]] == f.value]] = True
+                keep &= has
+        return keep
+
+    def _page_docs(self, lines, entity, limit, page, filters) -> tuple[np.ndarray, np.ndarray]:
+        """Line indices and doc ids for one page of matching documents."""
+        keep = self._doc_mask(lines, entity, filters)
+        doc_ids = np.flatnonzero(keep)[page * limit:(page + 1) * limit]
+        line_idx = np.flatnonzero(np.isin(lines["doc"], doc_ids))
+        return line_idx, doc_ids
+
+    def sales_xml(self, limit: int, page: int, filters: list[Filter]) -> str:
+        s = self.sales
+        line_idx, doc_ids = self._page_docs(s, "kimeno_szamla", limit, page, filters)
+        dates = _hu_date(s["day"][line_idx])
+        out: list[str] = []
+        current = -1
+        for i, d in zip(line_idx.tolist(), dates.tolist()):
+            doc = int(s["doc"][i])
+            if doc != current:
+                if current >= 0:
+                    out.append("</tetelek></elem>")
+                out.append(
+                    f"<elem><fej><sorszam>SZ-{doc:08d}</sorszam><telj_dat>{d}</telj_dat>"
+                    f"<storno>{s['storno'][i]}</storno></fej><tetelek>"
+                )
+                current = doc
+            out.append(
+                f"<tetel><cikksz>{self.sku_codes[s['sku'][i]]}</cikksz>"
+                f"<menny>{s['menny'][i]:g}</menny><netto_ar>{s['netto_ar'][i]:.2f}</netto_ar>"
+                f"<afa_szaz>27</afa_szaz></tetel>"
+            )
+        if current >= 0:
+            out.append("</tetelek></elem>")
+        return "".join(out)
+
+    def movements_xml(self, limit: int, page: int, filters: list[Filter]) -> str:
+        m = self.movements
+        line_idx, _ = self._page_docs(m, "raktari_mozgas", limit, page, filters)
+        dates = _hu_date(m["day"][line_idx])
+        out: list[str] = []
+        current = -1
+        for i, d in zip(line_idx.tolist(), dates.tolist()):
+            doc = int(m["doc"][i])
+            if doc != current:
+                if current >= 0:
+                    out.append("</tetelek></elem>")
+                tipus = int(m["tipus"][i])
+                irany = "B" if MOVEMENT_TYPES[tipus] == "Beszállítás" else "K"
+                out.append(
+                    f"<elem><fej><sorszam>RM-{doc:08d}</sorszam><kelt>{d}</kelt>"
+                    f"<irany>{irany}</irany><mozgas>{MOVEMENT_TYPES[tipus]}</mozgas>"
+                    f"<torolt>{m['torolt'][i]}</torolt></fej><tetelek>"
+                )
+                current = doc
+            sign = "" if MOVEMENT_TYPES[int(m["tipus"][i])] == "Beszállítás" else "-"
+            out.append(
+                f"<tetel><cikksz>{self.sku_codes[m['sku'][i]]}</cikksz>"
+                f"<menny>{sign}{m['menny'][i]:g}</menny></tetel>"
+            )
+        if current >= 0:
+            out.append("</tetelek></elem>")
+        return "".join(out)
+
+    def stock_xml(self, limit: int, page: int, filters: list[Filter]) -> str:
+        idx = np.arange(self.skus)
+        for f in filters:
+            if f.field == "cikksz" and f.op == "=":
+                idx = idx[self.sku_codes[idx] == f.value]
+        out = []
+        for i in idx[page * limit:(page + 1) * limit].tolist():
+            qty = "".join(f"<kiadhato{w + 1}>{self.stock[i, w]}</kiadhato{w + 1}>" for w in range(6))
+            out.append(f"<elem><cikksz>{self.sku_codes[i]}</cikksz>{qty}</elem>")
+        return "".join(out)
+
+    def respond(self, entity: str, leker_xml: str) -> str:
+        """Full SOAP response body for one request."""
+        limit, page, filters = parse_leker(leker_xml)
+        builders = {
+            "kimeno_szamla": self.sales_xml,
+            "raktari_mozgas": self.movements_xml,
+            "keszlet": self.stock_xml,
+        }
+        if entity not in builders:
+            return soap_response(1, f"Ismeretlen entitás: {entity}")
+        return soap_response(0, builders[entity](limit, page, filters))
+
+
+def soap_response(hiba: int, valasz: str) -> str:
+    """Wrap *valasz* the way ``apiv3.php`` does: escaped XML inside ``<return>``."""
+    inner = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<eredmeny><hiba>{hiba}</hiba><valasz>{valasz}</valasz></eredmeny>"
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:ns1="urn://apiv3" xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        "<SOAP-ENV:Body><ns1:lekerResponse>"
+        f'<return xsi:type="xsd:string">{html.escape(inner, quote=False)}</return>'
+        "</ns1:lekerResponse></SOAP-ENV:Body></SOAP-ENV:Envelope>"
+    )
+
+
+# ── HTTP server ──────────────────────────────────────────────────────────────
+
+
+class StandinServer:
+    """Serve *data* over HTTP on localhost in a background thread.
+
+    Each response is delayed by *latency_s* plus uniform jitter in
+    [0, *jitter_s*]. ``requests_served`` counts handled POSTs. Use as a
+    context manager, or call ``start`` / ``stop``.
+    """
+
+    def __init__(self, data: SyntheticTharanis, host: str = "127.0.0.1", port: int = 0,
+                 latency_s: float = 0.0, jitter_s: float = 0.0) -> None:
+        self.data = data
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._jitter = random.Random(data.seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/apiv3.php"
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.requests_served += 1
+            jitter = self._jitter.uniform(0, self.jitter_s) if self.jitter_s else 0.0
+        return self.latency_s + jitter
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 — http.server naming
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                entity = re.search(r"<param3[^>]*>(.*?)</param3>", body, re.DOTALL)
+                leker = re.search(r"<!\[CDATA\[(.*?)\]\]>", body, re.DOTALL)
+                delay = server._delay()
+                if not entity or not leker:
+                    self.send_error(400, "Expected a leker SOAP envelope")
+                    return
+                if delay:
+                    time.sleep(delay)
+                payload = server.data.respond(entity.group(1).strip(), leker.group(1)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:  # noqa: A002
+                pass
+
+        return Handler
+
+    def start(self) -> StandinServer:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="soap-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> StandinServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Tharanis SOAP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skus", type=int, default=200)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--lines-per-day", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7354)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    data = SyntheticTharanis(args.skus, args.years, args.lines_per_day, seed=args.seed)
+    server = StandinServer(data, args.host, args.port,
+                           args.latency_ms / 1000, args.jitter_ms / 1000)
+    print(f"Tharanis stand-in on {server.url} "
+          f"({len(data.sales['day']):,} invoice lines, {data.start_date} – {data.end_date})")
+    print(f"Set THARANIS_API_URL={server.url} and leave SUPABASE_URL empty to use it.", flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Server-side paging, sorting and filtering over an in-memory DataFrame.
+
+The Reflex tables keep a ``FrameTable`` in backend-only state and push just
+the visible page to the browser, so the payload per interaction is bounded
+by the page size no matter how many rows were loaded.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class FrameTable:
+    """Read-only view over *df* that serves one page of rows at a time.
+
+    The lower-cased search text and the row order for the current
+    filter/sort are computed on demand and cached, so flipping pages only
+    slices the cached order.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columns: list[str] | None = None,
+        date_format: str = "%Y.%m.%d",
+    ):
+        self.columns = [c for c in (columns or list(df.columns)) if c in df.columns]
+        self._df = df[self.columns].reset_index(drop=True)
+        self._date_format = date_format
+        self._text: pd.Series | None = None
+        self._order_key: tuple[str, str | None, bool] | None = None
+        self._order: np.ndarray = np.arange(len(self._df))
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def _search_text(self) -> pd.Series:
+        if self._text is None:
+            parts = [
+                self._formatted(c).astype(str).where(self._df[c].notna(), "")
+                for c in self.columns
+            ]
+            text = parts[0].str.cat(parts[1:], sep=" ") if parts else pd.Series(dtype=str)
+            self._text = text.str.lower()
+        return self._text
+
+    def _formatted(self, col: str) -> pd.Series:
+        s = self._df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return s.dt.strftime(self._date_format)
+        return s
+
+    def _row_order(self, query: str, sort_by: str | None, descending: bool) -> np.ndarray:
+        key = (query, sort_by, descending)
+        if key == self._order_key:
+            return self._order
+
+        if query:
+            mask = self._search_text().str.contains(query, regex=False).to_numpy()
+            rows = np.flatnonzero(mask)
+        else:
+            rows = np.arange(len(self._df))
+
+        if sort_by in self.columns and len(rows):
+            col = self._df[sort_by].iloc[rows]
+            ranked = col.sort_values(
+                ascending=not descending, kind="stable", na_position="last"
+            )
+            # The frame has a RangeIndex, so index labels are row positions
+            rows = ranked.index.to_numpy()
+
+        self._order_key = key
+        self._order = rows
+        return rows
+
+    def page(
+        self,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sort_by: str | None = None,
+        descending: bool = False,
+        query: str = "",
+    ) -> tuple[list[list], int]:
+        """Return ``(rows, matching_row_count)`` for one page.
+
+        *page* is zero-based and clamped to the last page; *query* is a
+        case-insensitive substring matched against the displayed values.
+        """
+        rows = self._row_order(query.strip().lower(), sort_by, descending)
+        total = len(rows)
+        page = max(0, min(page, page_count(total, page_size) - 1))
+        window = rows[page * page_size:(page + 1) * page_size]
+
+        out = self._df.iloc[window].copy()
+        for c in self.columns:
+            if pd.api.types.is_datetime64_any_dtype(out[c]):
+                out[c] = out[c].dt.strftime(self._date_format)
+        out = out.astype(object).where(out.notna(), None)
+        return out.values.tolist(), total
+
+
+def page_count(total: int, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """Number of pages for *total* rows (at least 1, so page 0 always exists)."""
+    return max(1, math.ceil(total / page_size))
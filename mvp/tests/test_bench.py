@@ -0,0 +1,89 @@
+"""Tests for the bench harness — measurement records, baseline comparison, CLI."""
+
+import contextlib
+import json
+
+import pytest
+
+from bench.__main__ import main
+from bench.runner import compare, measure
+from bench.scenarios import SCENARIOS, Scenario
+
+
+def _scenario(run, rows=10, warmup=True):
+    @contextlib.contextmanager
+    def setup(scale):
+        yield run, rows
+    return Scenario("fake", "fake", setup, warmup)
+
+
+class TestMeasure:
+    def test_record_fields(self):
+        result = measure(_scenario(lambda: bytearray(1 << 20)), repeat=2)
+        assert set(result) == {"wall_s", "rows", "rows_per_s", "peak_mem_mb"}
+        assert result["rows"] == 10
+        assert result["peak_mem_mb"] >= 1.0
+
+    def test_cold_scenario_not_warmed_up(self):
+        calls = []
+        measure(_scenario(lambda: calls.append(1), warmup=False), repeat=2)
+        assert len(calls) == 3  # two timed + one traced
+
+    def test_failing_setup_is_skipped(self):
+        @contextlib.contextmanager
+        def setup(scale):
+            raise ImportError("no pyarrow")
+            yield
+
+        assert measure(Scenario("x", "x", setup)) == {"skipped": "ImportError: no pyarrow"}
+
+    def test_real_scenario_small_scale(self):
+        result = measure(SCENARIOS["period_key_1m"], scale=0.001, repeat=1)
+        assert result["rows"] == 1000
+
+
+class TestCompare:
+    BASE = {"results": {
+        "a": {"wall_s": 1.0, "peak_mem_mb": 10.0},
+        "b": {"skipped": "no pyarrow"},
+    }}
+
+    def test_within_tolerance(self):
+        assert compare({"a": {"wall_s": 1.2, "peak_mem_mb": 10.0}}, self.BASE, 0.25) == []
+
+    def test_slowdown_and_memory_flagged(self):
+        regressions = compare({"a": {"wall_s": 1.5, "peak_mem_mb": 20.0}}, self.BASE, 0.25)
+        assert len(regressions) == 2
+        assert regressions[0].startswith("a: wall_s")
+
+    def test_skipped_and_new_scenarios_ignored(self):
+        results = {"b": {"wall_s": 9.0, "peak_mem_mb": 1.0}, "c": {"wall_s": 9.0, "peak_mem_mb": 1.0}}
+        assert compare(results, self.BASE) == []
+
+
+class TestCli:
+    def test_list(self, capsys):
+        assert main(["--list"]) == 0
+        assert "soap_get_sales_3y" in capsys.readouterr().out
+
+    def test_json_and_regression_exit_code(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({
+            "scale": 0.001,
+            "results": {"period_key_1m": {"wall_s": 1e-9, "peak_mem_mb": 1e-9}},
+        }))
+        out = tmp_path / "out.json"
+        code = main(["-s", "period_key_1m", "--scale", "0.001", "--repeat", "1",
+                     "--baseline", str(baseline), "--json", str(out)])
+        assert code == 1
+        assert json.loads(out.read_text())["results"]["period_key_1m"]["rows"] == 1000
+
+    def test_update_baseline(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        assert main(["-s", "period_key_1m", "--scale", "0.001", "--repeat", "1",
+                     "--baseline", str(baseline), "--update-baseline"]) == 0
+        assert json.loads(baseline.read_text())["scale"] == 0.001
+
+    def test_unknown_scenario_rejected(self):
+        with pytest.raises(SystemExit):
+            main(["-s", "nope"])
@@ -107,6 +107,17 @@ class TestTop10ProductsChart:
         assert fig.data[0].type == "bar"
         assert fig.data[0].orientation == "h"
 
+    @patch(_ST_CHART)
+    def test_bar_text(self, mock_chart, top10_df):
+        from charts import top10_products_chart
+        top10_products_chart(top10_df)
+        fig = _last_figure(mock_chart)
+        assert list(fig.data[0].text) == [
+            "  1 500 000 Ft  (53.6%)",
+            "  900 000 Ft  (32.1%)",
+            "  400 000 Ft  (14.3%)",
+        ]
+
     @patch(_ST_CHART)
     def test_empty_df_shows_placeholder(self, mock_chart):
         from charts import top10_products_chart
@@ -215,3 +226,68 @@ class TestHbarChart:
         hbar_chart(["A"], [50], "#000", height=500)
         fig = _last_figure(mock_chart)
         assert fig.layout.height == 500
+
+
+# ── Shared base layout ───────────────────────────────────────────────────────
+
+
+class TestBaseLayout:
+    @staticmethod
+    def _effective_layout(fig: go.Figure) -> tuple[dict, dict]:
+        """Layout as rendered (template layout with the figure's own on top), and trace defaults."""
+        layout = fig.layout.to_plotly_json()
+        template = layout.pop("template")
+        merged = go.Layout(template.get("layout", {}))
+        merged.update(layout)
+        return merged.to_plotly_json(), template.get("data", {})
+
+    @patch(_ST_CHART)
+    def test_charts_reference_base_template(self, mock_chart):
+        from charts import BASE_TEMPLATE, hbar_chart
+        hbar_chart(["A"], [50], "#000")
+        fig = _last_figure(mock_chart)
+        assert fig.layout.template.layout.separators == ", "
+        base = BASE_TEMPLATE.layout.to_plotly_json()
+        assert fig.layout.template.layout.paper_bgcolor == base["paper_bgcolor"]
+        # Per-chart overrides merge on top of the template
+        assert fig.layout.yaxis.automargin is True
+
+    @patch(_ST_CHART)
+    def test_keeps_streamlit_theme(self, mock_chart):
+        import plotly.io as pio
+        from charts import hbar_chart
+        hbar_chart(["A"], [50], "#000")
+        fig = _last_figure(mock_chart)
+        streamlit = pio.templates["streamlit"]
+        assert fig.layout.template.layout.colorway == streamlit.layout.colorway
+        assert fig.layout.template.data.bar == streamlit.data.bar
+
+    @patch(_ST_CHART)
+    def test_matches_legacy_inline_layout(self, mock_chart, monkeypatch):
+        import copy
+
+        import charts
+        from theme import PLOTLY_BASE_LAYOUT
+
+        def legacy_base_layout(**overrides):
+            layout = copy.deepcopy(PLOTLY_BASE_LAYOUT)
+            layout.update(overrides)
+            return layout
+
+        monthly = pd.DataFrame({"Periódus": ["2025-01", "2025-02"], "Bruttó érték": [1, 2]})
+        charts.revenue_trend_chart(monthly)
+        shared = _last_figure(mock_chart)
+        monkeypatch.setattr(charts, "_base_layout", legacy_base_layout)
+        charts.revenue_trend_chart(monthly)
+        legacy = _last_figure(mock_chart)
+        assert self._effective_layout(shared) == self._effective_layout(legacy)
+
+    def test_base_layout_does_not_copy_base_dict(self):
+        from charts import CHART_TEMPLATE_NAME, _base_layout
+        assert _base_layout(height=10) == {"template": CHART_TEMPLATE_NAME, "height": 10}
+
+    def test_overrides_do_not_leak_into_template(self):
+        from charts import BASE_TEMPLATE, _base_layout
+        fig = go.Figure()
+        fig.update_layout(**_base_layout(xaxis=dict(tickangle=45)))
+        assert BASE_TEMPLATE.layout.xaxis.tickangle == -30
@@ -0,0 +1,68 @@
+"""Tests for csv_export.py — export registry and chunked CSV streaming."""
+
+import io
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import csv_export
+from csv_export import iter_csv, lookup, register
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    csv_export.clear()
+    yield
+    csv_export.clear()
+
+
+@pytest.fixture()
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "kelt": pd.to_datetime(["2025-06-15", "2025-06-16", "2025-06-17"]),
+        "Cikkszám": ["A, 1", "B", "C"],
+        "Mennyiség": [1.0, 2.0, 3.0],
+    })
+
+
+class TestRegistry:
+    def test_register_and_lookup(self, frame):
+        token = register(frame, "x.csv", ["kelt"])
+        export = lookup(token)
+        assert export.frame is frame
+        assert export.filename == "x.csv"
+        assert export.columns == ["kelt"]
+
+    def test_unknown_token(self):
+        assert lookup("nincs") is None
+
+    def test_expired_token_dropped(self, frame):
+        token = register(frame, "x.csv")
+        with patch.object(csv_export.time, "monotonic", return_value=1e12):
+            assert lookup(token) is None
+
+    def test_bounded(self, frame):
+        tokens = [register(frame, f"{i}.csv") for i in range(csv_export._MAX_EXPORTS + 5)]
+        assert lookup(tokens[0]) is None
+        assert lookup(tokens[-1]) is not None
+
+
+class TestIterCsv:
+    def test_chunks_round_trip(self, frame):
+        chunks = list(iter_csv(frame, chunk_rows=2))
+        assert len(chunks) == 3  # header + 2 row chunks
+        back = pd.read_csv(io.StringIO("".join(chunks)))
+        assert back["kelt"].tolist() == ["2025.06.15", "2025.06.16", "2025.06.17"]
+        assert back["Cikkszám"].tolist() == ["A, 1", "B", "C"]
+
+    def test_column_subset(self, frame):
+        text = "".join(iter_csv(frame, ["Mennyiség", "nincs"]))
+        assert text.splitlines() == ["Mennyiség", "1.0", "2.0", "3.0"]
+
+    def test_empty_frame_is_header_only(self, frame):
+        assert "".join(iter_csv(frame.iloc[:0])).strip() == "kelt,Cikkszám,Mennyiség"
+
+    def test_source_frame_untouched(self, frame):
+        list(iter_csv(frame, chunk_rows=1))
+        assert pd.api.types.is_datetime64_any_dtype(frame["kelt"])
@@ -0,0 +1,175 @@
+"""Tests for disk_cache.py — LRU budget, access tracking, atomic writes."""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from disk_cache import DiskCache, RowFilter
+
+
+@pytest.fixture()
+def cache(tmp_path, monkeypatch) -> DiskCache:
+    # Pickle stands in for Parquet so the tests do not need pyarrow
+    monkeypatch.setattr(DiskCache, "_read", staticmethod(lambda path, where=None: pd.read_pickle(path)))
+    monkeypatch.setattr(DiskCache, "_write", staticmethod(lambda df, path, suffix: df.to_pickle(path)))
+    return DiskCache(tmp_path / "cache", max_bytes=10_000_000)
+
+
+def _frame(n: int = 10) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(n)})
+
+
+def _age(path, seconds: float, atime_seconds: float | None = None) -> None:
+    now = time.time()
+    os.utime(path, (now - (atime_seconds if atime_seconds is not None else seconds), now - seconds))
+
+
+class TestReadWrite:
+    def test_round_trip_counts_hit(self, cache):
+        path = cache.path("x")
+        assert cache.save(_frame(), path)
+        pd.testing.assert_frame_equal(cache.load(path), _frame())
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.writes, stats.entries) == (1, 0, 1, 1)
+
+    def test_missing_counts_miss(self, cache):
+        assert cache.load(cache.path("nope")) is None
+        assert cache.stats().misses == 1
+
+    def test_max_age(self, cache):
+        path = cache.path("x")
+        cache.save(_frame(), path)
+        _age(path, 7200)
+        assert cache.load(path, max_age_seconds=3600) is None
+        assert cache.load(path) is not None
+        assert cache.age_seconds(path) == pytest.approx(7200, abs=5)
+
+    def test_unreadable_file_is_kept(self, cache):
+        path = cache.path("x")
+        cache.directory.mkdir()
+        path.write_bytes(b"half a file")
+        assert cache.load(path) is None
+        assert path.exists()
+        assert cache.stats().read_errors == 1
+
+    def test_no_temp_files_left(self, cache):
+        cache.save(_frame(), cache.path("x"))
+        assert [p.name for p in cache.directory.iterdir()] == ["x.parquet"]
+
+    def test_failed_write_keeps_old_file(self, cache, monkeypatch):
+        path = cache.path("x")
+        cache.save(_frame(3), path)
+
+        def _broken(df, p, suffix):
+            p.write_bytes(b"partial")
+            raise OSError("disk full")
+
+        monkeypatch.setattr(DiskCache, "_write", staticmethod(_broken))
+        assert not cache.save(_frame(5), path)
+        assert len(cache.load(path)) == 3
+        assert [p.name for p in cache.directory.iterdir()] == ["x.parquet"]
+
+    def test_read_records_access_not_write_time(self, cache):
+        path = cache.path("x")
+        cache.save(_frame(), path)
+        _age(path, 3600)
+        written = path.stat().st_mtime
+        cache.load(path)
+        assert path.stat().st_mtime == pytest.approx(written)
+        assert path.stat().st_atime > written + 3000
+
+
+class TestEviction:
+    def test_budget_evicts_least_recently_read(self, cache):
+        a, b, c = (cache.path(n) for n in "abc")
+        for p in (a, b, c):
+            cache.save(_frame(), p)
+        size = a.stat().st_size
+        cache.load(a)  # a is now the most recently used
+        cache.max_bytes = 2 * size
+        cache.save(_frame(), c)
+        assert a.exists() and not b.exists() and c.exists()
+        assert cache.stats().evictions == 1
+
+    def test_sweep_drops_expired_and_rescans(self, cache, tmp_path):
+        cache.save(_frame(), cache.path("old"))
+        cache.save(_frame(), cache.path("new"))
+        _age(cache.path("old"), 8 * 86400)
+        # A file written by another process
+        _frame().to_pickle(cache.path("other"))
+        assert cache.sweep() == 1
+        assert sorted(p.name for p in cache.directory.iterdir()) == ["new.parquet", "other.parquet"]
+        assert cache.stats().entries == 2
+
+    def test_sweep_lru_uses_atime_from_disk(self, cache):
+        for n in "ab":
+            cache.save(_frame(), cache.path(n))
+        # "a" written first but read recently by some other process
+        _age(cache.path("a"), 300, atime_seconds=10)
+        _age(cache.path("b"), 200)
+        cache.max_bytes = cache.path("a").stat().st_size
+        cache.sweep()
+        assert cache.path("a").exists() and not cache.path("b").exists()
+
+    def test_sweep_removes_stale_temp_files(self, cache):
+        cache.directory.mkdir()
+        tmp = cache.directory / ".x.parquet.abc.tmp"
+        tmp.write_bytes(b"")
+        _age(tmp, 7200)
+        cache.sweep()
+        assert not tmp.exists()
+
+    def test_missing_directory(self, tmp_path):
+        assert DiskCache(tmp_path / "nope", max_bytes=1).sweep() == 0
+
+
+def test_unknown_format_rejected(tmp_path):
+    with pytest.raises(ValueError, match="format"):
+        DiskCache(tmp_path, max_bytes=1, fmt="csv")
+
+
+@pytest.fixture()
+def sales() -> pd.DataFrame:
+    return pd.DataFrame({
+        "kelt": pd.date_range("2025-01-01", periods=90, freq="D"),
+        "Cikkszám": ["A", "B", "C"] * 30,
+        "Mennyiség": [float(i) for i in range(90)],
+    })
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+class TestFileFormats:
+    @pytest.fixture(autouse=True)
+    def _pyarrow(self):
+        pytest.importorskip("pyarrow", exc_type=ImportError)
+
+    def test_round_trip(self, tmp_path, sales, fmt):
+        cache = DiskCache(tmp_path, max_bytes=10_000_000, fmt=fmt)
+        path = cache.path("x")
+        assert path.suffix == f".{fmt}"
+        cache.save(sales, path)
+        pd.testing.assert_frame_equal(cache.load(path), sales)
+
+    def test_pushdown_sku_and_range(self, tmp_path, sales, fmt):
+        cache = DiskCache(tmp_path, max_bytes=10_000_000, fmt=fmt)
+        cache.save(sales, cache.path("x"))
+        where = RowFilter(pd.Timestamp("2025-02-01"), pd.Timestamp("2025-02-28"), "B")
+        got = cache.load(cache.path("x"), where=where)
+        want = sales[sales["kelt"].between("2025-02-01", "2025-02-28") & (sales["Cikkszám"] == "B")]
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), want.reset_index(drop=True))
+
+    def test_filter_on_missing_column_ignored(self, tmp_path, fmt):
+        cache = DiskCache(tmp_path, max_bytes=10_000_000, fmt=fmt)
+        inv = pd.DataFrame({"Cikkszám": ["A", "B"], "Készlet": [1.0, 2.0]})
+        cache.save(inv, cache.path("inv"))
+        got = cache.load(cache.path("inv"), where=RowFilter(start=pd.Timestamp("2025-01-01")))
+        assert len(got) == 2
+
+    def test_other_format_still_indexed(self, tmp_path, sales, fmt):
+        other = "arrow" if fmt == "parquet" else "parquet"
+        DiskCache(tmp_path, max_bytes=10_000_000, fmt=other).save(sales, tmp_path / f"old.{other}")
+        cache = DiskCache(tmp_path, max_bytes=10_000_000, fmt=fmt)
+        assert cache.stats().entries == 1
+        assert len(cache.load(tmp_path / f"old.{other}")) == len(sales)
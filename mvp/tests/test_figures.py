@@ -0,0 +1,136 @@
+"""Tests for samansport/figures.py — shared template, LTTB, payload size."""
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from samansport.figures import (
+    TEMPLATE,
+    WEBGL_MIN_POINTS,
+    bucket_starts,
+    figure_bytes,
+    grouped_bar_figure,
+    hbar_figure,
+    lttb_indices,
+    period_figure,
+    point_budget,
+)
+
+
+@pytest.fixture()
+def daily_series() -> tuple[list[str], list[float]]:
+    """Three years of daily periods with a seasonal pattern and one spike."""
+    n = 3 * 365
+    rng = np.random.default_rng(7)
+    y = 1e6 + 4e5 * np.sin(np.linspace(0, 6 * np.pi, n)) + rng.normal(0, 5e4, n)
+    y[500] = 9e6
+    x = [f"D{i:04d}" for i in range(n)]
+    return x, y.tolist()
+
+
+class TestLttb:
+    def test_short_series_untouched(self):
+        assert lttb_indices([1, 2, 3], 10).tolist() == [0, 1, 2]
+
+    def test_keeps_ends_and_budget(self, daily_series):
+        _, y = daily_series
+        idx = lttb_indices(y, 200)
+        assert len(idx) == 200
+        assert idx[0] == 0 and idx[-1] == len(y) - 1
+        assert np.all(np.diff(idx) > 0)
+
+    def test_keeps_spike(self, daily_series):
+        _, y = daily_series
+        assert 500 in lttb_indices(y, 100)
+
+    def test_nan_tolerated(self):
+        y = [1.0, np.nan, 3.0, 2.0, 5.0, np.nan, 1.0]
+        assert len(lttb_indices(y, 4)) == 4
+
+
+class TestBuckets:
+    def test_under_budget_one_per_point(self):
+        assert bucket_starts(3, 10).tolist() == [0, 1, 2]
+
+    def test_equal_runs_within_budget(self):
+        starts = bucket_starts(1095, 200)
+        assert len(starts) <= 200
+        assert starts[0] == 0 and set(np.diff(starts)) == {6}
+
+
+class TestFigures:
+    def test_template_applied(self):
+        fig = period_figure(["a", "b"], [1, 2])
+        assert fig.layout.plot_bgcolor is None  # comes from the template
+        assert fig.layout.template.layout.plot_bgcolor == "#FCFCFD"
+
+    def test_long_line_uses_webgl_and_budget(self, daily_series):
+        x, y = daily_series
+        assert len(x) > WEBGL_MIN_POINTS
+        fig = period_figure(x, y, kind="line")
+        assert isinstance(fig.data[0], go.Scattergl)
+        assert len(fig.data[0].x) == point_budget()
+
+    def test_short_line_stays_svg(self):
+        fig = period_figure(["a", "b", "c"], [1, 2, 3], kind="line")
+        assert isinstance(fig.data[0], go.Scatter)
+
+    def test_grouped_bars_share_buckets(self, daily_series):
+        x, y = daily_series
+        fig = grouped_bar_figure(x, [("Be", y, "#000"), ("Ki", y[::-1], "#fff")])
+        assert fig.data[0].x == fig.data[1].x
+        assert len(fig.data[0].x) <= point_budget() // 2
+        assert sum(fig.data[1].y) == pytest.approx(sum(y), rel=1e-9)
+
+    def test_long_bars_summed_not_sampled(self, daily_series):
+        x, y = daily_series
+        fig = period_figure(x, y, kind="bar")
+        assert len(fig.data[0].x) <= point_budget()
+        assert sum(fig.data[0].y) == pytest.approx(sum(y), rel=1e-9)
+        assert fig.data[0].x[0] == f"{x[0]} – {x[1]}"
+
+    def test_mean_bars_averaged(self):
+        x = [f"D{i:03d}" for i in range(730)]
+        fig = period_figure(x, [1000.0] * 730, kind="bar", agg="mean")
+        assert set(fig.data[0].y) == {1000.0}
+
+    def test_flat_sum_has_no_spikes(self):
+        x = [f"D{i:03d}" for i in range(1000)]
+        fig = period_figure(x, [1.0] * 1000, kind="bar")
+        assert set(fig.data[0].y) == {2.0}
+
+    def test_short_bars_untouched(self):
+        fig = period_figure(["a", "b", "c"], [1, 2, 3])
+        assert list(fig.data[0].x) == ["a", "b", "c"]
+        assert list(fig.data[0].y) == [1, 2, 3]
+
+    def test_empty_bars(self):
+        assert len(period_figure([], []).data[0].x) == 0
+
+    def test_hbar(self):
+        fig = hbar_figure(["A", "B"], [1, 2], height=400)
+        assert fig.data[0].orientation == "h"
+        assert fig.layout.height == 400
+
+    def test_payload_reduction(self, daily_series):
+        """Long daily range: the old per-figure layout vs the builder."""
+        x, y = daily_series
+        legacy = go.Figure(go.Scatter(x=x, y=y, mode="lines+markers"))
+        legacy.update_layout(
+            height=380, autosize=True, paper_bgcolor="white",
+            plot_bgcolor="#FCFCFD", margin=dict(l=0, r=0, t=10, b=0),
+            xaxis=dict(gridcolor="#EAECF5", type="category"),
+            yaxis=dict(gridcolor="#EAECF5", separatethousands=True),
+        )
+        new = period_figure(x, y, kind="line", width_px=1200)
+        assert figure_bytes(new) * 2 < figure_bytes(legacy)
+
+    def test_small_figure_drops_default_template(self):
+        legacy = go.Figure(go.Bar(x=["a"], y=[1]))
+        assert figure_bytes(period_figure(["a"], [1])) < figure_bytes(legacy) / 4
+
+
+def test_template_name():
+    import plotly.io as pio
+
+    assert TEMPLATE in pio.templates
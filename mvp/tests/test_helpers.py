@@ -53,6 +53,29 @@ class TestPeriodKey:
 # ── find_sku_col ─────────────────────────────────────────────────────────────
 
 
+class TestFitPeriod:
+    @staticmethod
+    def _days(start: str, n: int) -> pd.Series:
+        return pd.Series(pd.date_range(start, periods=n, freq="D"))
+
+    def test_fits_keeps_period(self):
+        from data_helpers import fit_period
+        assert fit_period(self._days("2025-01-01", 300), "Napi", 600) == "Napi"
+
+    def test_steps_to_coarser_period(self):
+        from data_helpers import fit_period
+        assert fit_period(self._days("2023-01-01", 730), "Napi", 600) == "Heti"
+        assert fit_period(self._days("2015-01-01", 3650), "Napi", 150) == "Havi"
+
+    def test_yearly_is_the_floor(self):
+        from data_helpers import fit_period
+        assert fit_period(self._days("2015-01-01", 3650), "Heti", 3) == "Éves"
+
+    def test_empty_dates(self):
+        from data_helpers import fit_period
+        assert fit_period(pd.Series([], dtype="datetime64[ns]"), "Havi", 10) == "Havi"
+
+
 class TestFindSkuCol:
     def test_hungarian_cikkszam(self):
         df = pd.DataFrame({"Cikkszám": ["A"], "Mennyiség": [1]})
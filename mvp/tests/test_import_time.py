@@ -0,0 +1,77 @@
+"""Import-time checks for the modules on the Reflex import path.
+
+Each check runs in a fresh interpreter so modules already imported by the
+test session (Streamlit is pulled in by test_helpers) do not hide a
+regression.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+MVP_DIR = Path(__file__).resolve().parent.parent
+
+# Modules the Reflex pages import; none of them may pull in Streamlit
+REFLEX_PATH_MODULES = [
+    "data_helpers", "theme", "kpi", "product_catalog",
+    "table_pager", "csv_export", "tharanis_client", "warmup",
+]
+
+
+def _run(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=MVP_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+class TestReflexImportPath:
+    def test_streamlit_not_imported(self):
+        out = _run(
+            f"import sys, {', '.join(REFLEX_PATH_MODULES)}; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] == 'streamlit'))"
+        )
+        assert out == "[]"
+
+    def test_helpers_still_reexports(self):
+        out = _run(
+            "import data_helpers, helpers; "
+            "print(all(getattr(helpers, n) is getattr(data_helpers, n) for n in "
+            "('period_key', 'find_sku_col', 'find_name_col', "
+            "'build_product_opts', 'load_product_master')))"
+        )
+        assert out == "True"
+
+
+def _self_times_us(module: str) -> dict[str, int]:
+    """Per-module self import time (µs) from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=MVP_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+class TestTharanisClientImport:
+    # The module body itself should do no work: no .env lookup, no cache
+    # directory scan, no threads. Import time is tracked by the
+    # import_* scenarios in mvp/bench.
+
+    def test_dotenv_not_imported(self):
+        assert "dotenv" not in _self_times_us("tharanis_client")
+
+    def test_no_work_at_import(self):
+        out = _run(
+            "import threading, tharanis_client as tc; "
+            "print(tc._config is None, tc._disk_cache is None, threading.active_count())"
+        )
+        assert out == "True True 1"
@@ -0,0 +1,155 @@
+"""Tests for samansport/instrumentation.py — sampled handler profiling."""
+
+import asyncio
+import inspect
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from samansport import instrumentation
+from samansport.instrumentation import profiled
+
+
+def _burn(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class _State:
+    """Stand-in for a Reflex state: the root state reports a fixed delta."""
+
+    def __init__(self, delta: dict) -> None:
+        self._root = SimpleNamespace(get_delta=lambda: delta)
+
+    def _get_root_state(self):
+        return self._root
+
+    @profiled
+    def set_metric(self, metric: str):
+        _burn(0.03)
+        return metric
+
+    @profiled
+    async def load_data(self):
+        yield
+        _burn(0.03)
+
+    @profiled
+    async def load_slow(self):
+        await asyncio.sleep(0.2)
+        _burn(0.03)
+        await asyncio.sleep(0)
+        return "done"
+
+    @profiled
+    async def stream_slow(self):
+        await asyncio.sleep(0.2)
+        yield 1
+        _burn(0.03)
+
+
+@pytest.fixture()
+def profile_dir(tmp_path):
+    instrumentation.configure(every=2, directory=tmp_path)
+    yield tmp_path
+    instrumentation.configure(every=0)
+
+
+def _events(directory):
+    return [json.loads(line) for line in (directory / "events.jsonl").read_text().splitlines()]
+
+
+class TestSettings:
+    def test_read_after_dotenv(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(instrumentation, "_every", None)
+        monkeypatch.setattr(instrumentation, "_directory", None)
+        monkeypatch.delenv("SAMANSPORT_PROFILE", raising=False)
+
+        def load_dotenv():
+            monkeypatch.setenv("SAMANSPORT_PROFILE", "3")
+            monkeypatch.setenv("SAMANSPORT_PROFILE_DIR", str(tmp_path))
+
+        with patch("dotenv.load_dotenv", load_dotenv):
+            assert instrumentation._should_sample("_State.settings_probe")
+        assert instrumentation._every == 3
+        assert instrumentation._directory == tmp_path
+
+    def test_invalid_every_disables(self, monkeypatch):
+        monkeypatch.setenv("SAMANSPORT_PROFILE", "often")
+        assert instrumentation._env_every() == 0
+
+
+class TestProfiled:
+    def test_disabled_calls_through(self, tmp_path):
+        instrumentation.configure(every=0, directory=tmp_path)
+        assert _State({}).set_metric("x") == "x"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_samples_one_in_n(self, profile_dir):
+        state = _State({"analytics_state": {"selected_metric_rx_state_": "Mennyiség"}})
+        for _ in range(3):
+            assert state.set_metric("Mennyiség") == "Mennyiség"
+        events = _events(profile_dir)
+        assert [e["handler"] for e in events] == ["_State.set_metric"] * 2
+        assert events[0]["delta_bytes"] == len(
+            '{"analytics_state": {"selected_metric_rx_state_": "Mennyiség"}}'.encode()
+        )
+        assert events[0]["cpu_ms"] > 10
+
+    def test_folded_stacks_start_at_handler(self, profile_dir):
+        _State({}).set_metric("x")
+        lines = (profile_dir / "_State.set_metric.folded").read_text().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("_State.set_metric (test_instrumentation.py:")
+            assert int(count) >= 1
+        assert any("_burn" in line for line in lines)
+
+    def test_async_generator_updates_and_delta_summed(self, profile_dir):
+        state = _State({"s": {"v": 1}})
+
+        async def drain():
+            return [u async for u in state.load_data()]
+
+        assert asyncio.run(drain()) == [None]
+        (event,) = _events(profile_dir)
+        # One delta per yielded update plus the final one
+        assert event["delta_bytes"] == 2 * len('{"s": {"v": 1}}')
+        assert event["samples"] > 0
+        assert "_burn" in (profile_dir / "_State.load_data.folded").read_text()
+
+    def test_awaits_not_timed(self, profile_dir):
+        state = _State({})
+        assert asyncio.run(state.load_slow()) == "done"
+        assert asyncio.run(self._drain(state.stream_slow())) == [1]
+        for event in _events(profile_dir):
+            assert 25 < event["wall_ms"] < 150
+            assert event["cpu_ms"] > 10
+
+    def test_cancellation_reaches_handler(self, profile_dir):
+        async def main():
+            task = asyncio.ensure_future(_State({}).load_slow())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        (event,) = _events(profile_dir)
+        assert event["wall_ms"] < 150
+
+    @staticmethod
+    async def _drain(agen):
+        return [u async for u in agen]
+
+    def test_handler_kind_preserved(self):
+        from samansport.pages.analytics import AnalyticsState, InventoryMonitorState
+
+        assert inspect.isasyncgenfunction(InventoryMonitorState.load_monitor_data.fn)
+        assert not inspect.isasyncgenfunction(AnalyticsState.set_metric.fn)
+        assert "metric" in inspect.signature(AnalyticsState.set_metric.fn).parameters
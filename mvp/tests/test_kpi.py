@@ -0,0 +1,126 @@
+"""Tests for kpi.py — the single-pass sales KPI kernel."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi import (
+    SalesSummary,
+    summarize_sales,
+    top_n_indices,
+    top_products_frame,
+    top_skus_by_revenue,
+)
+
+
+@pytest.fixture()
+def sales() -> pd.DataFrame:
+    """Legacy-named sales frame spanning two years, with gaps and NaNs."""
+    return pd.DataFrame({
+        "kelt": pd.to_datetime([
+            "2024-12-30", "2025-01-05", "2025-01-06", "2025-01-06",
+            "2025-02-10", None,
+        ]),
+        "Cikkszám": ["A", "B", "A", "C", "B", "A"],
+        "Mennyiség": [1.0, 2.0, 3.0, np.nan, 5.0, 1.0],
+        "Bruttó érték": [100.0, 200.0, 300.0, 400.0, np.nan, 50.0],
+        "Nettó érték": [80.0, 160.0, 240.0, 320.0, 0.0, 40.0],
+        "Bruttó ár": [100.0, 100.0, 100.0, np.nan, 200.0, 50.0],
+        "Nettó ár": [80.0, 80.0, 80.0, 80.0, 160.0, 40.0],
+    })
+
+
+def _grouped(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    d = df.dropna(subset=["kelt"])
+    key = d["kelt"].dt.to_period(freq).astype(str)
+    return d.groupby(key)[["Bruttó érték", "Mennyiség"]].sum().sort_index()
+
+
+class TestSummarizeSales:
+    def test_headline_kpis(self, sales):
+        s = summarize_sales(sales)
+        assert s.revenue == pytest.approx(1050.0)
+        assert s.net_revenue == pytest.approx(840.0)
+        assert s.quantity == pytest.approx(12.0)
+        assert s.avg_gross_price == pytest.approx(sales["Bruttó ár"].mean())
+        assert s.avg_net_price == pytest.approx(sales["Nettó ár"].mean())
+        assert s.transactions == 6
+
+    def test_active_months_and_years_skip_missing_dates(self, sales):
+        s = summarize_sales(sales)
+        assert s.active_months == 3
+        assert s.active_years == 2
+
+    @pytest.mark.parametrize("period,freq", [("Éves", "Y"), ("Havi", "M"), ("Napi", "D"), ("Heti", "W")])
+    def test_period_series_match_groupby(self, sales, period, freq):
+        s = summarize_sales(sales, period)
+        expected = _grouped(sales, freq)
+        assert s.periods == expected.index.tolist()
+        np.testing.assert_allclose(s.period_revenue, expected["Bruttó érték"])
+        np.testing.assert_allclose(s.period_quantity, expected["Mennyiség"])
+
+    def test_monthly_labels(self, sales):
+        assert summarize_sales(sales, "Havi").periods == ["2024-12", "2025-01", "2025-02"]
+
+    def test_top_skus(self, sales):
+        s = summarize_sales(sales, top_n=2)
+        assert s.top_skus == ["A", "C"]
+        np.testing.assert_allclose(s.top_revenue, [450.0, 400.0])
+
+    def test_without_sku_column(self, sales):
+        s = summarize_sales(sales, sku_col=None)
+        assert s.top_skus == []
+        assert s.revenue == pytest.approx(1050.0)
+
+    def test_empty_frame(self):
+        s = summarize_sales(pd.DataFrame())
+        assert isinstance(s, SalesSummary)
+        assert s.transactions == 0 and s.periods == [] and s.top_skus == []
+
+
+class TestTopNIndices:
+    def test_largest_first(self):
+        values = np.array([5.0, 1.0, 9.0, 7.0])
+        assert top_n_indices(values, 2).tolist() == [2, 3]
+
+    def test_ties_keep_position_order(self):
+        values = np.array([3.0, 5.0, 5.0, 1.0])
+        assert top_n_indices(values, 3).tolist() == [1, 2, 0]
+
+    def test_n_larger_than_input(self):
+        assert top_n_indices(np.array([1.0, 2.0]), 10).tolist() == [1, 0]
+
+    def test_empty(self):
+        assert top_n_indices(np.zeros(0), 3).tolist() == []
+
+
+class TestTopSkusByRevenue:
+    def test_sums_per_sku_and_skips_missing(self):
+        skus = pd.Series(["A", "B", None, "A", "C"])
+        revenue = np.array([1.0, 5.0, 100.0, 3.0, np.nan])
+        top, values = top_skus_by_revenue(skus, revenue, 2)
+        assert top == ["B", "A"]
+        np.testing.assert_allclose(values, [5.0, 4.0])
+
+
+class TestTopProductsFrame:
+    def test_labels_and_share(self):
+        names = {"A": "Úszószemüveg felnőtt hosszú megnevezéssel"}
+        grp = top_products_frame(["A", "B"], [300.0, 100.0], total=1000.0, names=names)
+        assert grp["Label"].tolist() == ["Úszószemüveg felnőtt hosszú me (A)", "B"]
+        assert grp["Pct"].tolist() == [30.0, 10.0]
+        assert grp["Cikkszám"].tolist() == ["A", "B"]
+
+    def test_callable_names(self):
+        grp = top_products_frame(["A"], [1.0], names=lambda sku: "Alma")
+        assert grp["Label"].tolist() == ["Alma (A)"]
+        assert grp["Pct"].tolist() == [100.0]
+
+    def test_defaults_to_shared_catalog(self):
+        from unittest.mock import MagicMock, patch
+
+        catalog = MagicMock()
+        catalog.name = {"A": "Alma"}.get
+        with patch("product_catalog.get_catalog", return_value=catalog):
+            grp = top_products_frame(["A", "Z"], [2.0, 1.0])
+        assert grp["Label"].tolist() == ["Alma (A)", "Z"]
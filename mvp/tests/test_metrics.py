@@ -0,0 +1,176 @@
+"""Tests for metrics.py — registry, Prometheus text format, client wiring, /metrics route."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pandas as pd
+import pytest
+
+import metrics
+import tharanis_client as tc
+from disk_cache import DiskCache
+from metrics import Registry
+
+
+_SUPABASE_CFG = tc._Config(
+    api_url="", ugyfelkod="", cegkod="", apikulcs="",
+    supabase_url="https://sb.test", supabase_key="key", bulk_read_min_rows=0,
+    cache_max_bytes=0, cache_format="parquet",
+)
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture()
+def registry():
+    return Registry()
+
+
+class TestRegistry:
+    def test_get_or_create_returns_same_metric(self, registry):
+        a = registry.counter("jobs_total", "Jobs", ("kind",))
+        assert registry.counter("jobs_total", "Jobs", ("kind",)) is a
+
+    def test_conflicting_registration_rejected(self, registry):
+        registry.counter("jobs_total", "Jobs", ("kind",))
+        with pytest.raises(ValueError):
+            registry.gauge("jobs_total", "Jobs", ("kind",))
+        with pytest.raises(ValueError):
+            registry.counter("jobs_total", "Jobs", ("other",))
+
+    def test_labels_must_match(self, registry):
+        c = registry.counter("jobs_total", "Jobs", ("kind",))
+        with pytest.raises(ValueError):
+            c.inc()
+        with pytest.raises(ValueError):
+            c.inc(kind="a", extra="b")
+
+    def test_counter_cannot_decrease(self, registry):
+        with pytest.raises(ValueError):
+            registry.counter("jobs_total", "Jobs").inc(-1)
+
+
+class TestRender:
+    def test_counter_and_gauge(self, registry):
+        c = registry.counter("jobs_total", "Jobs run", ("kind",))
+        c.inc(kind="a")
+        c.inc(2, kind="b")
+        g = registry.gauge("queue_depth", "Queued jobs")
+        g.inc(3)
+        g.dec()
+        assert registry.render() == (
+            "# HELP jobs_total Jobs run\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{kind="a"} 1\n'
+            'jobs_total{kind="b"} 2\n'
+            "# HELP queue_depth Queued jobs\n"
+            "# TYPE queue_depth gauge\n"
+            "queue_depth 2\n"
+        )
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        h = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 0.7, 3.0):
+            h.observe(v, op="read")
+        lines = registry.render().splitlines()
+        assert lines[2:] == [
+            'latency_seconds_bucket{op="read",le="0.1"} 1',
+            'latency_seconds_bucket{op="read",le="1"} 3',
+            'latency_seconds_bucket{op="read",le="+Inf"} 4',
+            'latency_seconds_sum{op="read"} 4.25',
+            'latency_seconds_count{op="read"} 4',
+        ]
+
+    def test_histogram_time_records_on_error(self, registry):
+        h = registry.histogram("op_seconds", "Op time")
+        with pytest.raises(RuntimeError), h.time():
+            raise RuntimeError
+        assert h.count() == 1
+
+    def test_gauge_function_read_at_render(self, registry):
+        value = [1]
+        registry.gauge("size_bytes", "Size").set_function(lambda: value[0])
+        value[0] = 42
+        assert "size_bytes 42\n" in registry.render()
+
+    def test_label_values_escaped(self, registry):
+        registry.counter("x_total", "X", ("path",)).inc(path='a"b\\c\nd')
+        assert 'x_total{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+class TestClientWiring:
+    def test_cache_lookups_registered_once(self):
+        import helpers
+
+        lookups = metrics.REGISTRY.get("tharanis_cache_lookups_total")
+        assert lookups is tc.CACHE_LOOKUPS
+        assert "st_sales" in lookups.help
+        assert not hasattr(helpers, "_CACHE_LOOKUPS")
+
+    def test_disk_cache_hit_and_miss(self, tmp_path: Path):
+        lookups = metrics.REGISTRY.get("tharanis_cache_lookups_total")
+        hits = lookups.value(cache="disk", result="hit")
+        misses = lookups.value(cache="disk", result="miss")
+        cache = DiskCache(tmp_path, max_bytes=1 << 30)
+        cache._read = lambda path, where=None: pd.read_pickle(path)
+        cache._write = lambda df, path, suffix: df.to_pickle(path)
+        with patch.object(tc, "_disk_cache", cache):
+            assert tc._load_fresh_cache("kimeno_szamla", "2025.01.01", "2025.01.31", None) is None
+            tc._save_cache(pd.DataFrame({"a": [1]}),
+                           tc._cache_path("kimeno_szamla", "2025.01.01", "2025.01.31", None))
+            assert tc._load_fresh_cache("kimeno_szamla", "2025.01.01", "2025.01.31", None) is not None
+        assert lookups.value(cache="disk", result="miss") == misses + 1
+        assert lookups.value(cache="disk", result="hit") == hits + 1
+
+    def test_soap_latency_and_errors(self):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        seconds = metrics.REGISTRY.get("tharanis_soap_request_seconds")
+        errors = metrics.REGISTRY.get("tharanis_soap_errors_total")
+        before = seconds.count(entity="keszlet"), errors.value(entity="keszlet")
+        with patch.object(tc, "_http", side_effect=lambda: _mock_client(refuse)), \
+             pytest.raises(httpx.ConnectError):
+            asyncio.run(tc._post_soap("keszlet", "<leker/>"))
+        assert seconds.count(entity="keszlet") == before[0] + 1
+        assert errors.value(entity="keszlet") == before[1] + 1
+
+    def test_postgrest_page_latency(self):
+        seconds = metrics.REGISTRY.get("tharanis_postgrest_request_seconds")
+        before = seconds.count(table="products", kind="page")
+        with patch.object(tc, "_get_config", return_value=_SUPABASE_CFG), \
+             patch.object(tc, "_http", side_effect=lambda: _mock_client(
+                 lambda request: httpx.Response(200, json=[]))):
+            asyncio.run(tc._supabase_select_all("products", "sku,name"))
+        assert seconds.count(table="products", kind="page") == before + 1
+
+    def test_sync_gauge_returns_to_zero(self):
+        triggers = metrics.REGISTRY.get("tharanis_sync_triggers_total")
+        before = triggers.value(entity="keszlet")
+
+        async def trigger():
+            tc._trigger_sync_background("keszlet", {})
+            await asyncio.gather(*tc._sync_tasks)
+
+        with patch.object(tc, "_use_supabase", return_value=False):
+            asyncio.run(trigger())
+        assert triggers.value(entity="keszlet") == before + 1
+        assert metrics.REGISTRY.get("tharanis_sync_active").value() == 0
+
+
+class TestMetricsRoute:
+    def test_prometheus_text_served(self):
+        from starlette.testclient import TestClient
+
+        from samansport.api import api
+
+        metrics.counter("samansport_handler_errors_total", "", ("handler",)).inc(handler="test")
+        response = TestClient(api).get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == metrics.CONTENT_TYPE
+        assert "# TYPE tharanis_soap_request_seconds histogram" in response.text
+        assert 'samansport_handler_errors_total{handler="test"}' in response.text
@@ -12,6 +12,7 @@ from models import (
     Product,
     SalesInvoiceLine,
     SyncMetadata,
+    SyncPageHash,
     WarehouseMovement,
 )
 
@@ -214,6 +215,7 @@ class TestSyncMetadata:
         )
         assert m.sync_status == "idle"  # default
         assert m.pages_fetched == 0
+        assert m.pages_skipped == 0
         assert m.records_synced == 0
 
     def test_missing_entity(self):
@@ -240,6 +242,25 @@ class TestSyncMetadata:
             )
 
 
+# ── SyncPageHash ─────────────────────────────────────────────────────────────
+
+
+class TestSyncPageHash:
+    def test_valid_minimal(self):
+        h = SyncPageHash(
+            entity="kimeno_szamla",
+            filter_hash="abc123",
+            page=0,
+            content_hash="f" * 64,
+        )
+        assert h.record_count == 0  # default
+        assert h.updated_at is None
+
+    def test_negative_page_rejected(self):
+        with pytest.raises(ValidationError):
+            SyncPageHash(entity="x", filter_hash="x", page=-1, content_hash="x")
+
+
 # ── EntityConfig ─────────────────────────────────────────────────────────────
 
 
@@ -0,0 +1,147 @@
+"""Tests for product_catalog.py — search index, labels, and loading."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+
+import product_catalog
+from product_catalog import ProductCatalog, fold, get_catalog, reset_catalog
+
+
+@pytest.fixture()
+def catalog(products_df: pd.DataFrame) -> ProductCatalog:
+    df = products_df.rename(columns={"sku": "Cikkszám", "name": "Cikknév"})
+    extra = pd.DataFrame({
+        "Cikkszám": ["4633", "4634", "NOPE-1"],
+        "Cikknév": ["Úszószemüveg felnőtt", "Futócipő női", None],
+    })
+    return ProductCatalog(pd.concat([df, extra], ignore_index=True))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_catalog():
+    reset_catalog()
+    yield
+    reset_catalog()
+
+
+# ── fold ─────────────────────────────────────────────────────────────────────
+
+
+class TestFold:
+    def test_strips_hungarian_accents(self):
+        assert fold("Úszószemüveg ŐŰ") == "uszoszemuveg ou"
+
+    def test_plain_ascii_unchanged_except_case(self):
+        assert fold("NIKE-42") == "nike-42"
+
+
+# ── ProductCatalog ───────────────────────────────────────────────────────────
+
+
+class TestProductCatalog:
+    def test_len_and_contains(self, catalog):
+        assert len(catalog) == 6
+        assert "4633" in catalog
+        assert "UNKNOWN" not in catalog
+
+    def test_name_lookup(self, catalog):
+        assert catalog.name("4634") == "Futócipő női"
+        assert catalog.name("NOPE-1") is None
+        assert catalog.name("UNKNOWN") is None
+
+    def test_label(self, catalog):
+        assert catalog.label("4633") == "4633  –  Úszószemüveg felnőtt"
+        assert catalog.label("NOPE-1") == "NOPE-1"
+
+    def test_labels_sorted_by_name(self, catalog):
+        labels = catalog.labels(["4633", "4634", "ADIDAS-UB-44", "4634"])
+        assert labels == [
+            "ADIDAS-UB-44  –  Adidas Ultraboost 22 - 44-es",
+            "4634  –  Futócipő női",
+            "4633  –  Úszószemüveg felnőtt",
+        ]
+
+    def test_search_sku_prefix_first(self, catalog):
+        assert catalog.search("463") == ["4633", "4634"]
+
+    def test_search_prefix_is_case_insensitive(self, catalog):
+        assert catalog.search("nike")[0] == "NIKE-AIR-MAX-42"
+
+    def test_search_accent_insensitive_substring(self, catalog):
+        assert catalog.search("futocipo") == ["4634"]
+        assert catalog.search("SZEMÜVEG") == ["4633"]
+
+    def test_search_limit(self, catalog):
+        assert len(catalog.search("e", limit=2)) == 2
+
+    def test_search_no_match(self, catalog):
+        assert catalog.search("xyz-nincs") == []
+
+    def test_subset_keeps_names_and_unknown_skus(self, catalog):
+        sub = catalog.subset(["4633", "4634", "NEW-SKU", "4633"])
+        assert len(sub) == 3
+        assert sub.name("4634") == "Futócipő női"
+        assert "NEW-SKU" in sub and sub.name("NEW-SKU") is None
+        assert "ADIDAS-UB-44" not in sub
+        assert sub.search("futo") == ["4634"]
+
+    def test_empty_query_returns_first_products(self, catalog):
+        assert catalog.search("   ", limit=3) == catalog.frame["Cikkszám"].tolist()[:3]
+
+
+# ── get_catalog ──────────────────────────────────────────────────────────────
+
+
+class TestGetCatalog:
+    def test_prefers_supabase(self):
+        df = pd.DataFrame({"Cikkszám": ["A1"], "Cikknév": ["Alpha"]})
+        with patch("tharanis_client.get_products", return_value=df), \
+             patch.object(product_catalog, "_load_from_csv") as mock_csv:
+            cat = get_catalog()
+        assert cat.name("A1") == "Alpha"
+        mock_csv.assert_not_called()
+
+    def test_falls_back_to_csv(self):
+        csv_df = pd.DataFrame({"Cikkszám": ["B2"], "Cikknév": ["Beta"]})
+        with patch("tharanis_client.get_products", return_value=None), \
+             patch.object(product_catalog, "_load_from_csv", return_value=csv_df):
+            cat = get_catalog()
+        assert cat.name("B2") == "Beta"
+
+    def test_loaded_once(self):
+        df = pd.DataFrame({"Cikkszám": ["A1"], "Cikknév": ["Alpha"]})
+        with patch("tharanis_client.get_products", return_value=df) as mock_get:
+            first = get_catalog()
+            second = get_catalog()
+        assert first is second
+        mock_get.assert_called_once()
+
+
+class TestAgetCatalog:
+    def test_reload_uses_async_read(self):
+        df = pd.DataFrame({"Cikkszám": ["A1"], "Cikknév": ["Alpha"]})
+        with patch("tharanis_client.aget_products", new=AsyncMock(return_value=df)), \
+             patch("tharanis_client.get_products") as sync_get:
+            cat = asyncio.run(product_catalog.aget_catalog())
+        assert cat.name("A1") == "Alpha"
+        sync_get.assert_not_called()
+        assert get_catalog() is cat
+
+    def test_falls_back_to_csv(self):
+        csv_df = pd.DataFrame({"Cikkszám": ["B2"], "Cikknév": ["Beta"]})
+        with patch("tharanis_client.aget_products", new=AsyncMock(side_effect=ConnectionError)), \
+             patch.object(product_catalog, "_load_from_csv", return_value=csv_df):
+            cat = asyncio.run(product_catalog.aget_catalog())
+        assert cat.name("B2") == "Beta"
+
+    def test_expired_catalog_reloaded(self):
+        old = pd.DataFrame({"Cikkszám": ["A1"], "Cikknév": ["Old"]})
+        new = pd.DataFrame({"Cikkszám": ["A1"], "Cikknév": ["New"]})
+        with patch("tharanis_client.get_products", return_value=old):
+            get_catalog()
+        with patch.object(product_catalog, "_catalog_loaded_at", -1e9), \
+             patch("tharanis_client.aget_products", new=AsyncMock(return_value=new)):
+            assert asyncio.run(product_catalog.aget_catalog()).name("A1") == "New"
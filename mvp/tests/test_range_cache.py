@@ -0,0 +1,159 @@
+"""Tests for range_cache.py — sub-range slicing, gap detection, merging, eviction."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from range_cache import RangeCache, combine
+
+KEY = ("kimeno_szamla", None)
+
+
+def _days(start: str, end: str) -> pd.DataFrame:
+    """One row per day, with the day of year as the value."""
+    kelt = pd.date_range(start, end, freq="D")
+    return pd.DataFrame({"kelt": kelt, "Cikkszám": "A", "v": kelt.dayofyear})
+
+
+def _d(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+@pytest.fixture()
+def cache() -> RangeCache:
+    return RangeCache(max_bytes=1 << 30, max_age=60)
+
+
+class TestLookup:
+    def test_miss(self, cache):
+        assert cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31")) == (
+            None, [(_d("2025-01-01"), _d("2025-01-31"))]
+        )
+
+    def test_sub_range_sliced_without_gaps(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-12-31"), _days("2025-01-01", "2025-12-31"))
+        df, gaps = cache.lookup(KEY, _d("2025-03-01"), _d("2025-03-07"))
+        assert gaps == []
+        pd.testing.assert_frame_equal(df, _days("2025-03-01", "2025-03-07"))
+
+    def test_partial_cover_reports_gaps(self, cache):
+        cache.store(KEY, _d("2025-01-10"), _d("2025-01-20"), _days("2025-01-10", "2025-01-20"))
+        df, gaps = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert gaps == [
+            (_d("2025-01-01"), _d("2025-01-09")),
+            (_d("2025-01-21"), _d("2025-01-31")),
+        ]
+        assert len(df) == 11
+
+    def test_unsorted_input_and_missing_kelt(self, cache):
+        missing = pd.DataFrame({"kelt": pd.to_datetime([None]), "Cikkszám": ["A"], "v": [0]})
+        df = pd.concat([_days("2025-01-01", "2025-01-05").iloc[::-1], missing])
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-05"), df)
+        hit, _ = cache.lookup(KEY, _d("2025-01-02"), _d("2025-01-03"))
+        assert hit["v"].tolist() == [2, 3]
+
+    def test_expired_intervals_ignored(self, cache):
+        cache.max_age = -1
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"))
+        assert cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))[0] is None
+        assert cache.nbytes == 0
+
+
+class TestStore:
+    def test_adjacent_ranges_merge(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-15"), _days("2025-01-01", "2025-01-15"))
+        cache.store(KEY, _d("2025-01-16"), _d("2025-01-31"), _days("2025-01-16", "2025-01-31"))
+        assert len(cache._intervals[KEY]) == 1
+        df, gaps = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert gaps == []
+        pd.testing.assert_frame_equal(df, _days("2025-01-01", "2025-01-31"))
+
+    def test_overlap_replaces_rows(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"))
+        fresh = _days("2025-01-10", "2025-01-12").assign(v=-1)
+        cache.store(KEY, _d("2025-01-10"), _d("2025-01-12"), fresh)
+        df, _ = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert len(df) == 31
+        assert df["kelt"].is_monotonic_increasing
+        assert df.loc[df["v"] == -1, "kelt"].dt.day.tolist() == [10, 11, 12]
+
+    def test_lru_eviction(self):
+        cache = RangeCache(max_bytes=1, max_age=60)
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"))
+        assert cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))[0] is None
+
+    def test_frame_without_kelt_not_cached(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), pd.DataFrame({"v": [1]}))
+        assert cache.nbytes == 0
+
+
+class TestAge:
+    def test_uncached_range_has_no_age(self, cache):
+        assert cache.age(KEY, _d("2025-01-01"), _d("2025-01-31")) is None
+
+    def test_replaced_part_is_younger(self):
+        cache = RangeCache(max_bytes=1 << 30, max_age=3600)
+        with patch("range_cache.time.monotonic", return_value=100.0):
+            cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"))
+        with patch("range_cache.time.monotonic", return_value=200.0):
+            cache.store(KEY, _d("2025-01-25"), _d("2025-01-31"), _days("2025-01-25", "2025-01-31"))
+        with patch("range_cache.time.monotonic", return_value=250.0):
+            assert cache.age(KEY, _d("2025-01-25"), _d("2025-01-31")) == 50.0
+            assert cache.age(KEY, _d("2025-01-01"), _d("2025-01-31")) == 150.0
+
+
+class TestMerge:
+    def test_rows_added_and_kept(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"), "w1")
+        new = _days("2025-01-15", "2025-01-15").assign(v=-1)
+        assert cache.merge(KEY, _d("2025-01-10"), _d("2025-01-20"), new, "w2")
+        df, _ = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert len(df) == 32
+        assert df["kelt"].is_monotonic_increasing
+        assert df.loc[df["kelt"].dt.day == 15, "v"].tolist() == [15, -1]
+
+    def test_watermarks_per_part(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"), "w1")
+        cache.merge(KEY, _d("2025-01-10"), _d("2025-01-20"), _days("2025-01-01", "2025-01-01").iloc[0:0], "w2")
+        assert cache.watermarks(KEY, _d("2025-01-05"), _d("2025-01-15")) == [
+            (_d("2025-01-05"), _d("2025-01-09"), "w1"),
+            (_d("2025-01-10"), _d("2025-01-15"), "w2"),
+        ]
+
+    def test_known_ids_skipped_and_store_time_kept(self):
+        cache = RangeCache(max_bytes=1 << 30, max_age=3600, id_col="id")
+        with patch("range_cache.time.monotonic", return_value=100.0):
+            cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"),
+                        _days("2025-01-01", "2025-01-31").assign(id=range(31)), "w1")
+        rows = _days("2025-01-15", "2025-01-16").assign(id=[14, 99])
+        with patch("range_cache.time.monotonic", return_value=200.0):
+            assert cache.merge(KEY, _d("2025-01-01"), _d("2025-01-31"), rows, "w2") == 1
+            assert cache.age(KEY, _d("2025-01-01"), _d("2025-01-31")) == 100.0
+            df, _ = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert len(df) == 32
+        assert "id" not in df.columns
+
+    def test_rows_outside_range_dropped(self, cache):
+        cache.store(KEY, _d("2025-01-01"), _d("2025-01-31"), _days("2025-01-01", "2025-01-31"), "w1")
+        rows = _days("2025-01-09", "2025-01-21").assign(v=-1)
+        assert cache.merge(KEY, _d("2025-01-10"), _d("2025-01-20"), rows, "w2") == 11
+        df, _ = cache.lookup(KEY, _d("2025-01-01"), _d("2025-01-31"))
+        assert df.loc[df["v"] == -1, "kelt"].dt.day.tolist() == list(range(10, 21))
+
+    def test_uncovered_range_not_merged(self, cache):
+        cache.store(KEY, _d("2025-01-10"), _d("2025-01-20"), _days("2025-01-10", "2025-01-20"))
+        assert cache.watermarks(KEY, _d("2025-01-01"), _d("2025-01-15")) is None
+        assert cache.merge(KEY, _d("2025-01-01"), _d("2025-01-15"), _days("2025-01-05", "2025-01-05"), "w") is None
+        assert len(cache.lookup(KEY, _d("2025-01-10"), _d("2025-01-20"))[0]) == 11
+
+
+class TestCombine:
+    def test_orders_by_kelt(self):
+        df = combine([_days("2025-01-10", "2025-01-12"), None, _days("2025-01-01", "2025-01-02")])
+        assert df["kelt"].dt.day.tolist() == [1, 2, 10, 11, 12]
+
+    def test_all_empty_keeps_columns(self):
+        empty = _days("2025-01-01", "2025-01-01").iloc[0:0]
+        assert list(combine([None, empty]).columns) == ["kelt", "Cikkszám", "v"]
@@ -0,0 +1,95 @@
+"""Tests for soap_standin.py — the local Tharanis SOAP endpoint.
+
+The end-to-end cases run the real tharanis_client SOAP fallback
+(_build_leker → HTTP → _extract_valasz → _parse_*) against the stand-in.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+import tharanis_client as tc
+from soap_standin import StandinServer, SyntheticTharanis, parse_leker
+
+_M = "tharanis_client"
+
+
+@pytest.fixture(scope="module")
+def data() -> SyntheticTharanis:
+    return SyntheticTharanis(skus=50, years=1, lines_per_day=12)
+
+
+@pytest.fixture()
+def server(data):
+    with StandinServer(data) as srv:
+        cfg = tc._Config(
+            api_url=srv.url, ugyfelkod="7354", cegkod="ab", apikulcs="",
+            supabase_url="", supabase_key="", bulk_read_min_rows=0,
+            cache_max_bytes=0, cache_format="parquet",
+        )
+        with patch(f"{_M}._get_config", return_value=cfg), patch(f"{_M}._save_cache"):
+            yield srv
+
+
+class TestParseLeker:
+    def test_reads_client_leker(self):
+        leker = tc._build_leker("2025.01.01", "2025.01.31", "SK-1", page=3, limit=50)
+        limit, page, filters = parse_leker(leker)
+        assert (limit, page) == (50, 3)
+        assert [(f.field, f.op, f.value) for f in filters] == [
+            ("teljdat", ">=", "2025.01.01"),
+            ("teljdat", "<=", "2025.01.31"),
+            ("storno", "=", "0"),
+            ("cikksz", "=", "SK-1"),
+        ]
+
+
+class TestSyntheticData:
+    def test_deterministic(self, data):
+        again = SyntheticTharanis(skus=50, years=1, lines_per_day=12)
+        assert again.sales_xml(20, 0, []) == data.sales_xml(20, 0, [])
+
+    def test_scale(self, data):
+        assert len(data.sales["day"]) == 365 * 12
+
+    def test_unknown_entity_is_api_error(self, data):
+        with pytest.raises(ValueError, match="hiba 1"):
+            tc._extract_valasz(data.respond("nincs", "<leker></leker>"))
+
+
+class TestClientAgainstStandin:
+    def test_sales_pages_through_range(self, server, data):
+        df = tc.get_sales("2025.01.01", "2025.12.31", limit=200, force_refresh=True)
+        storno_lines = int(data.sales["storno"].sum())
+        assert len(df) == len(data.sales["day"]) - storno_lines
+        assert df["kelt"].min().strftime("%Y.%m.%d") == "2025.01.01"
+        # 4 shards of ≤92 days × 4 invoices/day (minus storno), 200 per page
+        assert len(tc._date_shards("2025.01.01", "2025.12.31")) == 4
+        assert server.requests_served == 4 * (92 * 4 // 200 + 1)
+
+    def test_sales_date_and_sku_filters(self, server):
+        df = tc.get_sales("2025.03.01", "2025.03.31", cikkszam="SK-00001", force_refresh=True)
+        assert not df.empty
+        assert set(df["Cikkszám"]) == {"SK-00001"}
+        assert df["kelt"].dt.month.eq(3).all()
+
+    def test_movements(self, server):
+        df = tc.get_stock_movements("2025.06.01", "2025.06.07", force_refresh=True)
+        assert not df.empty
+        assert set(df["Irány"]) <= {"B", "K"}
+        assert (df["Mennyiség"] > 0).all()
+
+    def test_inventory_pages_over_products(self, server):
+        df = tc.get_inventory(limit=20)
+        assert len(df) == 50
+        assert server.requests_served == 3
+
+    def test_latency_injected(self, data):
+        with StandinServer(data, latency_s=0.05) as srv:
+            cfg = tc._Config(srv.url, "7354", "ab", "", "", "", 0, 0, "parquet")
+            with patch(f"{_M}._get_config", return_value=cfg):
+                t0 = time.perf_counter()
+                asyncio.run(tc._post_soap("keszlet", tc._build_keszlet_leker(None, 0, 10)))
+                assert time.perf_counter() - t0 >= 0.05
@@ -0,0 +1,68 @@
+"""Tests for table_pager.py — server-side paging, sorting and filtering."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from table_pager import FrameTable, page_count
+
+
+@pytest.fixture()
+def table(sales_df: pd.DataFrame) -> FrameTable:
+    big = pd.concat([sales_df] * 40, ignore_index=True)
+    big = pd.DataFrame({
+        "kelt": pd.to_datetime(big["fulfillment_date"]),
+        "Cikkszám": big["sku"],
+        "Mennyiség": np.arange(len(big), dtype="float64"),
+    })
+    return FrameTable(big, ["kelt", "Cikkszám", "Mennyiség", "Nincs ilyen"])
+
+
+class TestPageCount:
+    def test_rounds_up(self):
+        assert page_count(101, 50) == 3
+
+    def test_empty_has_one_page(self):
+        assert page_count(0, 50) == 1
+
+
+class TestFrameTable:
+    def test_unknown_columns_dropped(self, table):
+        assert table.columns == ["kelt", "Cikkszám", "Mennyiség"]
+
+    def test_page_is_bounded_and_total_is_full(self, table):
+        rows, total = table.page(0, page_size=25)
+        assert len(rows) == 25
+        assert total == len(table)
+
+    def test_no_silent_truncation(self, table):
+        last = page_count(len(table), 25) - 1
+        rows, _ = table.page(last, page_size=25)
+        assert rows[-1][2] == len(table) - 1
+
+    def test_page_clamped_to_last(self, table):
+        assert table.page(10_000, page_size=25) == table.page(page_count(len(table), 25) - 1, page_size=25)
+
+    def test_dates_formatted(self, table):
+        rows, _ = table.page(0, page_size=1)
+        assert rows[0][0] == "2025.06.15"
+
+    def test_sort_descending(self, table):
+        rows, _ = table.page(0, page_size=3, sort_by="Mennyiség", descending=True)
+        assert [r[2] for r in rows] == [len(table) - 1, len(table) - 2, len(table) - 3]
+
+    def test_filter_case_insensitive(self, table):
+        rows, total = table.page(0, page_size=500, query="adidas")
+        assert total > 0
+        assert all(r[1] == "ADIDAS-UB-44" for r in rows)
+
+    def test_filter_then_sort(self, table):
+        rows, total = table.page(0, page_size=500, sort_by="Mennyiség", descending=True, query="adidas")
+        qty = [r[2] for r in rows]
+        assert len(rows) == total
+        assert qty == sorted(qty, reverse=True)
+
+    def test_missing_values_become_none(self):
+        df = pd.DataFrame({"a": [1.0, np.nan], "b": ["x", None]})
+        rows, _ = FrameTable(df).page()
+        assert rows == [[1.0, "x"], [None, None]]
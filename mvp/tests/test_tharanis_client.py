@@ -5,16 +5,23 @@ Three scenarios per function:
   2. Empty result:    Supabase returns [] → empty DataFrame, no crash
   3. Connection error: Supabase throws → function returns None (graceful)
 
-We mock _get_supabase and _supabase_select_all to isolate the Supabase
-layer from the real network. _is_stale and _trigger_sync_background are
-also patched to prevent side effects.
+The Supabase read helpers are coroutines; patch() replaces them with
+AsyncMocks. We mock _supabase_select_all (and _supabase_rpc / _supabase_count
+for the bulk path) to isolate the Supabase layer, and _rest refuses any
+request that slips through. _is_stale and _trigger_sync_background are also
+patched to prevent side effects.
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pandas as pd
 import pytest
 
+from tharanis_client import _rest as _real_rest
+
 # Module path prefix for patching
 _M = "tharanis_client"
 
@@ -23,8 +30,8 @@ _M = "tharanis_client"
 
 @pytest.fixture(autouse=True)
 def _enable_supabase():
-    """Ensure _USE_SUPABASE is True so the Supabase path is taken."""
-    with patch(f"{_M}._USE_SUPABASE", True):
+    """Ensure _use_supabase() is True so the Supabase path is taken."""
+    with patch(f"{_M}._use_supabase", return_value=True):
         yield
 
 
@@ -36,6 +43,22 @@ def mock_sb():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def _no_network():
+    """Fail any Supabase HTTP request that is not mocked more specifically."""
+    with patch(f"{_M}._rest", side_effect=ConnectionError("network disabled in tests")):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_range_cache():
+    """Give every test an empty in-memory range cache."""
+    from range_cache import RangeCache
+
+    with patch(f"{_M}._range_cache", RangeCache(max_bytes=1 << 30, max_age=60, id_col="id")):
+        yield
+
+
 @pytest.fixture(autouse=True)
 def _no_sync():
     """Prevent freshness checks and background sync triggers."""
@@ -51,7 +74,7 @@ SALES_COLUMNS = ["kelt", "Cikkszám", "Mennyiség", "Nettó ár",
 
 
 class TestSupabaseGetSales:
-    def test_cache_hit(self, mock_sb):
+    def test_cache_hit(self):
         rows = [
             {"fulfillment_date": "2025-06-15", "sku": "NIKE-42",
              "quantity": 2, "net_price": 25000, "vat_pct": 27,
@@ -62,7 +85,7 @@ class TestSupabaseGetSales:
         ]
         with patch(f"{_M}._supabase_select_all", return_value=rows):
             from tharanis_client import _supabase_get_sales
-            df = _supabase_get_sales("2025.06.01", "2025.06.30")
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
 
         assert isinstance(df, pd.DataFrame)
         assert len(df) == 2
@@ -70,34 +93,116 @@ class TestSupabaseGetSales:
         assert df["Cikkszám"].tolist() == ["NIKE-42", "ADIDAS-44"]
         assert pd.api.types.is_datetime64_any_dtype(df["kelt"])
 
-    def test_empty_result(self, mock_sb):
+    def test_empty_result(self):
         with patch(f"{_M}._supabase_select_all", return_value=[]):
             from tharanis_client import _supabase_get_sales
-            df = _supabase_get_sales("2025.06.01", "2025.06.30")
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
 
         assert isinstance(df, pd.DataFrame)
         assert df.empty
         assert list(df.columns) == SALES_COLUMNS
 
-    def test_connection_error(self, mock_sb):
+    def test_connection_error(self):
         with patch(f"{_M}._supabase_select_all", side_effect=Exception("connection refused")):
             from tharanis_client import _supabase_get_sales
-            result = _supabase_get_sales("2025.06.01", "2025.06.30")
+            result = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
 
         assert result is None
 
-    def test_sku_filter_passed(self, mock_sb):
+    def test_sku_filter_passed(self):
         """Verify that a cikkszam filter adds an eq filter tuple."""
         with patch(f"{_M}._supabase_select_all", return_value=[]) as mock_select:
             from tharanis_client import _supabase_get_sales
-            _supabase_get_sales("2025.06.01", "2025.06.30", cikkszam="NIKE-42")
+            asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30", cikkszam="NIKE-42"))
 
         _args, _kwargs = mock_select.call_args
-        filters = _args[3]  # 4th positional arg is the filters list
+        filters = _args[2]  # 3rd positional arg is the filters list
         eq_filters = [f for f in filters if f[0] == "eq"]
         assert any(args == ("sku", "NIKE-42") for _, args in eq_filters)
 
 
+    def test_numeric_strings_decode_to_float64(self):
+        """PostgREST NUMERIC values arrive as strings; columns must be float64."""
+        rows = [
+            {"fulfillment_date": "2025-06-15", "sku": "NIKE-42",
+             "quantity": "2.0000", "net_price": "25000.0000",
+             "gross_price": "31750.0000", "net_value": "50000.00",
+             "gross_value": "63500.00"},
+            {"fulfillment_date": "2025-06-16", "sku": "ADIDAS-44",
+             "quantity": "1.0000", "net_price": None,
+             "gross_price": "44450.0000", "net_value": "35000.00",
+             "gross_value": "44450.00"},
+        ]
+        with patch(f"{_M}._supabase_select_all", return_value=rows):
+            from tharanis_client import _supabase_get_sales
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        for col in SALES_COLUMNS[2:]:
+            assert df[col].dtype == "float64", col
+        assert df["Bruttó érték"].sum() == 63500.0 + 44450.0
+        assert pd.isna(df["Nettó ár"].iloc[1])
+
+    def test_empty_result_is_typed(self):
+        with patch(f"{_M}._supabase_select_all", return_value=[]):
+            from tharanis_client import _supabase_get_sales
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        assert pd.api.types.is_datetime64_any_dtype(df["kelt"])
+        assert df["Bruttó érték"].dtype == "float64"
+
+
+# ── Bulk CSV export path ─────────────────────────────────────────────────────
+
+
+class TestBulkRead:
+    CSV = (
+        "fulfillment_date,sku,quantity,net_price,gross_price,net_value,gross_value\n"
+        '2025-06-15,"NIKE-42",2.0000,25000.0000,31750.0000,50000.00,63500.00\n'
+        '2025-06-16,"NA",1.0000,35000.0000,44450.0000,35000.00,44450.00\n'
+    )
+
+    def test_large_read_uses_export_rpc(self):
+        with patch(f"{_M}._supabase_count", return_value=50_000), \
+             patch(f"{_M}._supabase_rpc", return_value=self.CSV) as mock_rpc, \
+             patch(f"{_M}._supabase_select_all") as mock_select:
+            from tharanis_client import _supabase_get_sales
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        mock_select.assert_not_called()
+        assert mock_rpc.call_args[0][0] == "export_sales_csv"
+        assert list(df.columns) == SALES_COLUMNS
+        assert df["Cikkszám"].tolist() == ["NIKE-42", "NA"]
+        assert df["Bruttó érték"].dtype == "float64"
+        assert pd.api.types.is_datetime64_any_dtype(df["kelt"])
+
+    def test_small_read_pages(self):
+        with patch(f"{_M}._supabase_count", return_value=10), \
+             patch(f"{_M}._supabase_rpc") as mock_rpc, \
+             patch(f"{_M}._supabase_select_all", return_value=[]) as mock_select:
+            from tharanis_client import _supabase_get_sales
+            asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        mock_select.assert_called_once()
+        mock_rpc.assert_not_called()
+
+    def test_export_failure_falls_back_to_paging(self):
+        with patch(f"{_M}._supabase_count", return_value=50_000), \
+             patch(f"{_M}._supabase_rpc", side_effect=Exception("statement timeout")), \
+             patch(f"{_M}._supabase_select_all", return_value=[]) as mock_select:
+            from tharanis_client import _supabase_get_sales
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        mock_select.assert_called_once()
+        assert df.empty
+
+    def test_header_only_export_is_empty(self):
+        from tharanis_client import _decode_csv
+        df = _decode_csv("warehouse_movements",
+                         "movement_date,sku,direction,movement_type,quantity\n")
+        assert df.empty
+        assert list(df.columns) == ["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség"]
+
+
 # ── Inventory ────────────────────────────────────────────────────────────────
 
 INVENTORY_COLUMNS = ["Cikkszám", "Készlet",
@@ -106,7 +211,7 @@ INVENTORY_COLUMNS = ["Cikkszám", "Készlet",
 
 
 class TestSupabaseGetInventory:
-    def test_cache_hit(self, mock_sb):
+    def test_cache_hit(self):
         rows = [
             {"sku": "NIKE-42", "total_available": 45,
              "warehouse_1": 20, "warehouse_2": 15, "warehouse_3": 10,
@@ -114,7 +219,7 @@ class TestSupabaseGetInventory:
         ]
         with patch(f"{_M}._supabase_select_all", return_value=rows):
             from tharanis_client import _supabase_get_inventory
-            df = _supabase_get_inventory()
+            df = asyncio.run(_supabase_get_inventory())
 
         assert isinstance(df, pd.DataFrame)
         assert len(df) == 1
@@ -122,19 +227,19 @@ class TestSupabaseGetInventory:
         assert df["Cikkszám"].iloc[0] == "NIKE-42"
         assert df["Készlet"].iloc[0] == 45
 
-    def test_empty_result(self, mock_sb):
+    def test_empty_result(self):
         with patch(f"{_M}._supabase_select_all", return_value=[]):
             from tharanis_client import _supabase_get_inventory
-            df = _supabase_get_inventory()
+            df = asyncio.run(_supabase_get_inventory())
 
         assert isinstance(df, pd.DataFrame)
         assert df.empty
         assert list(df.columns) == INVENTORY_COLUMNS
 
-    def test_connection_error(self, mock_sb):
+    def test_connection_error(self):
         with patch(f"{_M}._supabase_select_all", side_effect=Exception("timeout")):
             from tharanis_client import _supabase_get_inventory
-            result = _supabase_get_inventory()
+            result = asyncio.run(_supabase_get_inventory())
 
         assert result is None
 
@@ -145,7 +250,7 @@ MOVEMENTS_COLUMNS = ["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség
 
 
 class TestSupabaseGetMovements:
-    def test_cache_hit(self, mock_sb):
+    def test_cache_hit(self):
         rows = [
             {"movement_date": "2025-06-10", "sku": "NIKE-42",
              "direction": "I", "movement_type": "Beszállítás", "quantity": 50},
@@ -154,27 +259,29 @@ class TestSupabaseGetMovements:
         ]
         with patch(f"{_M}._supabase_select_all", return_value=rows):
             from tharanis_client import _supabase_get_movements
-            df = _supabase_get_movements("2025.06.01", "2025.06.30")
+            df = asyncio.run(_supabase_get_movements("2025.06.01", "2025.06.30"))
 
         assert isinstance(df, pd.DataFrame)
         assert len(df) == 2
         assert list(df.columns) == MOVEMENTS_COLUMNS
         assert df["Irány"].tolist() == ["I", "O"]
         assert pd.api.types.is_datetime64_any_dtype(df["kelt"])
+        assert isinstance(df["Irány"].dtype, pd.CategoricalDtype)
+        assert df["Mennyiség"].dtype == "float64"
 
-    def test_empty_result(self, mock_sb):
+    def test_empty_result(self):
         with patch(f"{_M}._supabase_select_all", return_value=[]):
             from tharanis_client import _supabase_get_movements
-            df = _supabase_get_movements("2025.06.01", "2025.06.30")
+            df = asyncio.run(_supabase_get_movements("2025.06.01", "2025.06.30"))
 
         assert isinstance(df, pd.DataFrame)
         assert df.empty
         assert list(df.columns) == MOVEMENTS_COLUMNS
 
-    def test_connection_error(self, mock_sb):
+    def test_connection_error(self):
         with patch(f"{_M}._supabase_select_all", side_effect=Exception("DNS failure")):
             from tharanis_client import _supabase_get_movements
-            result = _supabase_get_movements("2025.06.01", "2025.06.30")
+            result = asyncio.run(_supabase_get_movements("2025.06.01", "2025.06.30"))
 
         assert result is None
 
@@ -204,7 +311,7 @@ class TestCheckConnection:
         assert "hiba" in result["detail"].lower() or "connection" in result["detail"].lower()
 
     def test_soap_fallback_when_no_supabase(self):
-        with patch(f"{_M}._USE_SUPABASE", False):
+        with patch(f"{_M}._use_supabase", return_value=False):
             from tharanis_client import check_connection
             result = check_connection()
 
@@ -276,3 +383,478 @@ class TestGetMovementsPublic:
 
         assert len(df) == 1
         assert df["Irány"].iloc[0] == "I"
+
+
+
+class TestFreshCacheFallback:
+    def test_sku_query_filters_all_products_entry(self):
+        from disk_cache import RowFilter
+        from tharanis_client import _cache_path, _load_fresh_cache
+
+        all_file = _cache_path("kimeno_szamla", "2025.06.01", "2025.06.30", None)
+        fake = pd.DataFrame({"Cikkszám": ["NIKE-42"]})
+        with patch(f"{_M}._cache_is_fresh", side_effect=lambda p: p == all_file), \
+             patch(f"{_M}._load_cache", return_value=fake) as load:
+            df = _load_fresh_cache("kimeno_szamla", "2025.06.01", "2025.06.30", "NIKE-42")
+
+        assert df is fake
+        load.assert_called_once_with(all_file, RowFilter(cikkszam="NIKE-42"))
+
+    def test_nothing_fresh(self):
+        from tharanis_client import _load_fresh_cache
+
+        with patch(f"{_M}._cache_is_fresh", return_value=False):
+            assert _load_fresh_cache("kimeno_szamla", "2025.06.01", "2025.06.30", "X") is None
+
+    def test_disk_cache_created_once_under_contention(self):
+        import threading
+        import time
+
+        import tharanis_client as api
+
+        def slow_cache(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(api._get_disk_cache())
+
+        with patch(f"{_M}._disk_cache", None), \
+             patch(f"{_M}.DiskCache", side_effect=slow_cache) as ctor:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        ctor.assert_called_once()
+        assert len({id(c) for c in results}) == 1
+
+    def test_ainit_disk_cache_opens_and_scans_in_worker_thread(self):
+        import threading
+
+        import tharanis_client as api
+
+        threads = []
+        cache = MagicMock()
+        cache.stats.side_effect = lambda: threads.append(threading.get_ident())
+
+        with patch(f"{_M}._disk_cache", None), \
+             patch(f"{_M}._get_config", return_value=MagicMock()), \
+             patch(f"{_M}.DiskCache", return_value=cache):
+            asyncio.run(api.ainit_disk_cache())
+
+        cache.start_janitor.assert_called_once()
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_soap_fallback_touches_disk_cache_off_the_loop(self):
+        import threading
+
+        import tharanis_client as api
+
+        loop_thread = threading.get_ident()
+        callers = []
+        cache = MagicMock()
+
+        def get_disk_cache():
+            callers.append(threading.get_ident())
+            return cache
+
+        with patch(f"{_M}._use_supabase", return_value=False), \
+             patch(f"{_M}._get_disk_cache", side_effect=get_disk_cache), \
+             patch(f"{_M}._load_fresh_cache", return_value=_daily_sales("2025-06-01", "2025-06-07")):
+            asyncio.run(api._fetch_sales("2025.06.01", "2025.06.07", None, 200, False))
+
+        assert callers and loop_thread not in callers
+
+
+# ── Range cache ──────────────────────────────────────────────────────────────
+
+def _daily_sales(start: str, end: str, sku: str = "NIKE-42") -> pd.DataFrame:
+    kelt = pd.date_range(start, end, freq="D")
+    return pd.DataFrame({"kelt": kelt, "Cikkszám": sku, "Mennyiség": 1})
+
+
+class TestRangeCache:
+    @staticmethod
+    def _fake_fetch(calls: list[tuple[str, str]]):
+        async def fetch(start, end, cikkszam=None, check_fresh=True):
+            calls.append((start, end))
+            return _daily_sales(start.replace(".", "-"), end.replace(".", "-"))
+        return fetch
+
+    def test_sub_range_served_without_fetch(self):
+        from tharanis_client import get_sales
+
+        calls: list[tuple[str, str]] = []
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._fake_fetch(calls)):
+            get_sales("2025.01.01", "2025.06.30")
+            df = get_sales("2025.06.01", "2025.06.07")
+
+        assert calls == [("2025.01.01", "2025.06.30")]
+        assert df["kelt"].dt.day.tolist() == [1, 2, 3, 4, 5, 6, 7]
+
+    def test_partial_cover_fetches_gap_only(self):
+        from tharanis_client import get_sales
+
+        calls: list[tuple[str, str]] = []
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._fake_fetch(calls)):
+            get_sales("2025.06.24", "2025.06.30")
+            df = get_sales("2025.06.01", "2025.06.30")
+
+        assert calls[1:] == [("2025.06.01", "2025.06.23")]
+        assert len(df) == 30
+        assert df["kelt"].is_monotonic_increasing
+
+    def test_gap_freshness_checked_for_requested_range(self):
+        from tharanis_client import get_sales
+
+        with patch(f"{_M}._supabase_select_all", return_value=[]), \
+             patch(f"{_M}._supabase_get_sales",
+                   side_effect=lambda s, e, c=None, check_fresh=True: _daily_sales(
+                       s.replace(".", "-"), e.replace(".", "-"))) as read, \
+             patch(f"{_M}._is_stale", return_value=True) as is_stale, \
+             patch(f"{_M}._trigger_sync_background") as trigger:
+            get_sales("2025.06.24", "2025.06.30")
+            get_sales("2025.06.01", "2025.06.30")
+
+        assert read.call_args.args == ("2025.06.01", "2025.06.23", None, False)
+        is_stale.assert_called_once()
+        trigger.assert_called_once_with("kimeno_szamla", {
+            "start_date": "2025.06.01", "end_date": "2025.06.30", "cikkszam": None,
+        })
+
+    def test_product_query_served_from_all_products_range(self):
+        from tharanis_client import get_sales
+
+        calls: list[tuple[str, str]] = []
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._fake_fetch(calls)):
+            get_sales("2025.06.01", "2025.06.30")
+            df = get_sales("2025.06.10", "2025.06.11", cikkszam="NIKE-42")
+            other = get_sales("2025.06.10", "2025.06.11", cikkszam="ADIDAS-1")
+
+        assert len(calls) == 1
+        assert len(df) == 2
+        assert other.empty
+
+    def test_product_slice_counted_and_revalidates_all_products(self):
+        import metrics
+        import tharanis_client as api
+
+        lookups = metrics.REGISTRY.get("tharanis_cache_lookups_total")
+        calls: list[tuple[str, str]] = []
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._fake_fetch(calls)), \
+             patch(f"{_M}._RANGE_CACHE_REVALIDATE_SECONDS", -1), \
+             patch(f"{_M}._revalidate_background") as revalidate:
+            api.get_sales("2025.06.01", "2025.06.30")
+            before = lookups.value(cache="memory", result="hit")
+            api.get_sales("2025.06.10", "2025.06.11", cikkszam="NIKE-42")
+
+        assert lookups.value(cache="memory", result="hit") == before + 1
+        assert revalidate.call_args.args[:4] == ("kimeno_szamla", "2025.06.10", "2025.06.11", None)
+
+    def test_force_refresh_bypasses_cache(self):
+        from tharanis_client import get_sales
+
+        calls: list[tuple[str, str]] = []
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._fake_fetch(calls)):
+            get_sales("2025.06.01", "2025.06.30")
+            get_sales("2025.06.01", "2025.06.07", force_refresh=True)
+
+        assert len(calls) == 2
+
+
+# ── Stale-while-revalidate ───────────────────────────────────────────────────
+
+class TestStaleWhileRevalidate:
+    @staticmethod
+    def _versioned_fetch(version: list[int]):
+        async def fetch(start, end, cikkszam=None, check_fresh=True):
+            df = _daily_sales(start.replace(".", "-"), end.replace(".", "-"))
+            return df.assign(Mennyiség=version[0])
+        return fetch
+
+    def test_aged_hit_served_then_revalidated(self):
+        import tharanis_client as api
+
+        version = [1]
+
+        async def scenario():
+            await api.aget_sales("2025.06.01", "2025.06.30")
+            version[0] = 2
+            waiter = asyncio.create_task(
+                api.wait_for_revalidation("kimeno_szamla", "2025.06.10", "2025.06.12", timeout=5)
+            )
+            await asyncio.sleep(0)
+            served = await api.aget_sales("2025.06.01", "2025.06.30")
+            event = await waiter
+            fresh = await api.aget_sales("2025.06.01", "2025.06.30")
+            return served, event, fresh
+
+        with patch(f"{_M}._supabase_get_sales", side_effect=self._versioned_fetch(version)), \
+             patch(f"{_M}._RANGE_CACHE_REVALIDATE_SECONDS", -1):
+            served, event, fresh = asyncio.run(scenario())
+
+        assert served["Mennyiség"].unique().tolist() == [1]
+        assert event == api.Revalidation("kimeno_szamla", "2025.06.01", "2025.06.30", None)
+        assert fresh["Mennyiség"].unique().tolist() == [2]
+
+    def test_unchanged_rows_not_notified(self):
+        import tharanis_client as api
+
+        events: list = []
+
+        async def scenario():
+            await api.aget_sales("2025.06.01", "2025.06.30")
+            await api.aget_sales("2025.06.01", "2025.06.30")
+            await asyncio.gather(*api._revalidation_tasks)
+
+        unsubscribe = api.subscribe(events.append)
+        try:
+            with patch(f"{_M}._supabase_get_sales", side_effect=self._versioned_fetch([1])), \
+                 patch(f"{_M}._RANGE_CACHE_REVALIDATE_SECONDS", -1):
+                asyncio.run(scenario())
+        finally:
+            unsubscribe()
+
+        assert events == []
+
+    def test_completed_sync_rereads_and_notifies(self):
+        import tharanis_client as api
+
+        events: list = []
+        reread = AsyncMock(return_value=_daily_sales("2025-06-01", "2025-06-07"))
+        unsubscribe = api.subscribe(events.append)
+        try:
+            with patch(f"{_M}._rest", new=AsyncMock(return_value={})), \
+                 patch(f"{_M}._supabase_reread", new=reread):
+                asyncio.run(api._invoke_sync("kimeno_szamla", {
+                    "start_date": "2025.06.01", "end_date": "2025.06.07", "cikkszam": None,
+                }))
+        finally:
+            unsubscribe()
+
+        reread.assert_awaited_once_with("kimeno_szamla", "2025.06.01", "2025.06.07", None)
+        assert [e.entity for e in events] == ["kimeno_szamla"]
+
+    def test_expired_disk_cache_served_and_revalidated(self):
+        import tharanis_client as api
+
+        stale = _daily_sales("2025-06-01", "2025-06-07")
+        with patch(f"{_M}._use_supabase", return_value=False), \
+             patch(f"{_M}._load_fresh_cache", return_value=None), \
+             patch(f"{_M}._load_cache", return_value=stale), \
+             patch(f"{_M}._revalidate_background") as revalidate:
+            df = asyncio.run(api._fetch_sales("2025.06.01", "2025.06.07", None, 200, False))
+
+        assert df is stale
+        assert revalidate.call_args.args[:4] == ("kimeno_szamla", "2025.06.01", "2025.06.07", None)
+
+    def test_notification_before_wait_not_missed(self):
+        import tharanis_client as api
+
+        mark = api.revalidation_mark()
+        api._notify(api.Revalidation("kimeno_szamla", "2025.06.01", "2025.06.30", None))
+        event = asyncio.run(api.wait_for_revalidation(
+            "kimeno_szamla", "2025.06.10", "2025.06.12", timeout=1, after=mark
+        ))
+        assert event is not None and event.seq == mark + 1
+        assert asyncio.run(api.wait_for_revalidation(
+            "kimeno_szamla", "2025.06.10", "2025.06.12", timeout=0.01, after=event.seq
+        )) is None
+
+    def test_product_waiter_woken_by_all_products_event(self):
+        import tharanis_client as api
+
+        mark = api.revalidation_mark()
+        api._notify(api.Revalidation("kimeno_szamla", "2025.06.01", "2025.06.30", None))
+        assert asyncio.run(api.wait_for_revalidation(
+            "kimeno_szamla", "2025.06.10", "2025.06.12", "NIKE-42", timeout=1, after=mark
+        )) is not None
+
+    def test_wait_times_out(self):
+        import tharanis_client as api
+
+        assert asyncio.run(api.wait_for_revalidation(
+            "kimeno_szamla", "2025.06.01", "2025.06.07", timeout=0.01
+        )) is None
+
+
+# ── Delta merge after a sync ─────────────────────────────────────────────────
+
+def _sales_rows(day: str, synced_at: str, n: int = 1, first_id: int = 1) -> list[dict]:
+    return [
+        {"fulfillment_date": day, "sku": "NIKE-42", "quantity": 1, "net_price": 100,
+         "gross_price": 127, "net_value": 100, "gross_value": 127,
+         "id": first_id + i, "synced_at": synced_at}
+        for i in range(n)
+    ]
+
+
+class TestDeltaMerge:
+    def test_paged_read_records_watermark(self):
+        from tharanis_client import _supabase_get_sales
+
+        rows = _sales_rows("2025-06-01", "2025-06-02T10:00:00+00:00") \
+            + _sales_rows("2025-06-02", "2025-06-03T08:00:00.5+00:00")
+        with patch(f"{_M}._supabase_select_all", return_value=rows) as select:
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        assert select.call_args.args[1].endswith(", synced_at")
+        assert "synced_at" not in df.columns
+        assert df.attrs["synced_at"] == "2025-06-03T08:00:00.500000+00:00"
+
+    def test_bulk_csv_records_watermark(self):
+        from tharanis_client import _decode_csv
+
+        text = ("movement_date,sku,direction,movement_type,quantity,id,synced_at\n"
+                '2025-06-01,"A","B","x",1,7,2025-06-02T10:00:00+00:00\n')
+        df = _decode_csv("warehouse_movements", text)
+        assert list(df.columns) == ["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség", "id"]
+        assert df.attrs["synced_at"] == "2025-06-02T10:00:00+00:00"
+
+    def test_completed_sync_fetches_only_new_rows(self):
+        import tharanis_client as api
+
+        old = _sales_rows("2025-06-10", "2025-06-11T00:00:00+00:00", n=500)
+        # Within the overlap: one row already cached, one committed late
+        # with an older stamp, and three new ones
+        new = (old[-1:]
+               + _sales_rows("2025-06-12", "2025-06-10T23:50:00+00:00", first_id=501)
+               + _sales_rows("2025-06-20", "2025-06-21T00:00:00+00:00", n=3, first_id=502))
+        select = AsyncMock(side_effect=[old, new])
+        events: list = []
+        unsubscribe = api.subscribe(events.append)
+        try:
+            with patch(f"{_M}._supabase_select_all", new=select), \
+                 patch(f"{_M}._rest", new=AsyncMock(return_value={})):
+                first = api.get_sales("2025.01.01", "2025.06.30")
+                api._run(api._invoke_sync("kimeno_szamla", {
+                    "start_date": "2025.01.01", "end_date": "2025.06.30", "cikkszam": None,
+                }))
+                df = api.get_sales("2025.01.01", "2025.06.30")
+        finally:
+            unsubscribe()
+
+        delta_filters = select.call_args_list[1].args[2]
+        assert ("gt", ("synced_at", "2025-06-10T23:30:00+00:00")) in delta_filters
+        assert select.await_count == 2
+        assert "id" not in first.columns and "id" not in df.columns
+        assert len(df) == 504
+        assert df["kelt"].is_monotonic_increasing
+        assert [e.entity for e in events] == ["kimeno_szamla"]
+        assert api._range_cache.watermarks(
+            ("kimeno_szamla", None), date(2025, 1, 1), date(2025, 6, 30)
+        ) == [(date(2025, 1, 1), date(2025, 6, 30), "2025-06-21T00:00:00+00:00")]
+
+    def test_range_without_watermark_is_reread(self):
+        import tharanis_client as api
+
+        reread = AsyncMock(return_value=_daily_sales("2025-06-01", "2025-06-07"))
+        with patch(f"{_M}._supabase_get_sales", side_effect=lambda *a: _daily_sales("2025-06-01", "2025-06-07")), \
+             patch(f"{_M}._supabase_read_delta") as delta, \
+             patch(f"{_M}._rest", new=AsyncMock(return_value={})), \
+             patch(f"{_M}._supabase_reread", new=reread):
+            api.get_sales("2025.06.01", "2025.06.07")
+            api._run(api._invoke_sync("kimeno_szamla", {
+                "start_date": "2025.06.01", "end_date": "2025.06.07", "cikkszam": None,
+            }))
+
+        delta.assert_not_called()
+        reread.assert_awaited_once()
+
+
+# ── Async transport ──────────────────────────────────────────────────────────
+
+class TestAsyncTransport:
+    @staticmethod
+    def _postgrest(rows: list[dict], seen: list[httpx.Request]):
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            offset = int(request.url.params["offset"])
+            limit = int(request.url.params["limit"])
+            page = rows[offset:offset + limit]
+            headers = {"content-range": f"{offset}-{offset + len(page) - 1}/{len(rows)}"}
+            return httpx.Response(200, json=page, headers=headers)
+        return handler
+
+    def test_select_all_pages_concurrently_in_order(self):
+        from tharanis_client import _Config, _supabase_select_all
+
+        cfg = _Config(api_url="", ugyfelkod="", cegkod="", apikulcs="",
+                      supabase_url="https://sb.test", supabase_key="key",
+                      bulk_read_min_rows=0, cache_max_bytes=0, cache_format="parquet")
+        rows = [{"id": i} for i in range(2500)]
+        seen: list[httpx.Request] = []
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self._postgrest(rows, seen)))
+        with patch(f"{_M}._rest", new=_real_rest), \
+             patch(f"{_M}._get_config", return_value=cfg), \
+             patch(f"{_M}._http", return_value=client):
+            result = asyncio.run(_supabase_select_all("sales", "id", [("eq", ("sku", "A"))]))
+
+        assert result == rows
+        assert len(seen) == 3
+        assert seen[0].headers["prefer"] == "count=exact"
+        assert all(r.headers["apikey"] == "key" for r in seen)
+        assert seen[0].url.params["sku"] == "eq.A"
+        # Offset pages are only disjoint under a stable order
+        assert all(r.url.params["order"] == "id.asc" for r in seen)
+
+    def test_get_products_through_transport(self):
+        from tharanis_client import _Config, get_products
+
+        cfg = _Config(api_url="", ugyfelkod="", cegkod="", apikulcs="",
+                      supabase_url="https://sb.test", supabase_key="key",
+                      bulk_read_min_rows=0, cache_max_bytes=0, cache_format="parquet")
+        rows = [{"sku": "NIKE-42", "name": "Cipő"}, {"sku": "ADIDAS-1", "name": None}]
+        seen: list[httpx.Request] = []
+        handler = self._postgrest(rows, seen)
+        with patch(f"{_M}._rest", new=_real_rest), \
+             patch(f"{_M}._get_config", return_value=cfg), \
+             patch(f"{_M}._http", side_effect=lambda: httpx.AsyncClient(
+                 transport=httpx.MockTransport(handler))):
+            df = get_products()
+
+        assert seen[0].url.path == "/rest/v1/products"
+        assert list(df.columns) == ["Cikkszám", "Cikknév"]
+        assert df["Cikkszám"].tolist() == ["NIKE-42", "ADIDAS-1"]
+
+    def test_sales_read_and_freshness_check_overlap(self):
+        """The freshness check runs while the read is in flight, not after it."""
+        from tharanis_client import _supabase_get_sales
+
+        checked = asyncio.Event()
+
+        async def select(*_args):
+            await asyncio.wait_for(checked.wait(), timeout=1)
+            return []
+
+        async def is_stale(*_args):
+            checked.set()
+            return False
+
+        with patch(f"{_M}._supabase_select_all", side_effect=select), \
+             patch(f"{_M}._is_stale", side_effect=is_stale):
+            df = asyncio.run(_supabase_get_sales("2025.06.01", "2025.06.30"))
+
+        assert df is not None and df.empty
+
+    def test_date_shards_cover_range(self):
+        from tharanis_client import _date_shards
+
+        assert _date_shards("2025.01.01", "2025.01.10", days=4) == [
+            ("2025.01.01", "2025.01.04"),
+            ("2025.01.05", "2025.01.08"),
+            ("2025.01.09", "2025.01.10"),
+        ]
+        assert _date_shards("2025.01.01", "2025.01.01") == [("2025.01.01", "2025.01.01")]
+
+    def test_blocking_wrapper_runs_coroutine(self):
+        from tharanis_client import get_inventory_monitor
+
+        with patch(f"{_M}._supabase_rpc", return_value=[{"out_sku": "A"}]):
+            assert get_inventory_monitor() == [{"sku": "A"}]
@@ -0,0 +1,162 @@
+"""Tests for tracing.py — span trees, stage histograms, structured logs."""
+
+import json
+import logging
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import tracing
+from tracing import Histogram, span, traced
+
+
+@pytest.fixture()
+def enabled():
+    tracing.reset()
+    tracing.enable()
+    yield
+    tracing.enable(False)
+    tracing.reset()
+
+
+class TestDisabled:
+    def test_span_is_shared_noop(self):
+        tracing.enable(False)
+        with span("x") as sp:
+            sp.rows = 5
+        assert span("y") is sp
+        assert tracing.recent() == []
+
+    def test_traced_calls_through(self):
+        tracing.enable(False)
+        assert traced()(lambda: 42)() == 42
+        assert tracing.stage_stats() == {}
+
+
+class TestEnvironment:
+    def test_flag_read_after_dotenv(self, monkeypatch):
+        monkeypatch.delenv("THARANIS_TRACE", raising=False)
+        monkeypatch.setattr(tracing, "_enabled", None)
+
+        def load_dotenv():
+            monkeypatch.setenv("THARANIS_TRACE", "1")
+
+        with patch("dotenv.load_dotenv", load_dotenv):
+            assert tracing.is_enabled()
+        tracing.enable(False)
+
+    def test_enable_wins_over_environment(self, monkeypatch):
+        monkeypatch.setenv("THARANIS_TRACE", "1")
+        tracing.enable(False)
+        assert not tracing.is_enabled()
+
+
+class TestSpans:
+    def test_nesting_builds_tree(self, enabled):
+        with span("outer", entity="kimeno_szamla"):
+            with span("inner") as sp:
+                sp.rows = 3
+        (root,) = tracing.recent()
+        assert root["span"] == "outer"
+        assert root["attrs"] == {"entity": "kimeno_szamla"}
+        assert root["children"][0]["span"] == "inner"
+        assert root["children"][0]["rows"] == 3
+
+    def test_traced_measures_return_value(self, enabled):
+        traced("frame")(lambda: pd.DataFrame({"a": [1.0, 2.0]}))()
+        traced("text")(lambda: "abcd")()
+        roots = {r["span"]: r for r in tracing.recent()}
+        assert roots["frame"]["rows"] == 2 and roots["frame"]["bytes"] == 16
+        assert roots["text"]["bytes"] == 4
+
+    def test_error_recorded_and_raised(self, enabled):
+        with pytest.raises(ValueError):
+            with span("boom"):
+                raise ValueError
+        assert tracing.recent()[0]["error"] == "ValueError"
+
+    def test_recent_is_bounded_newest_first(self, enabled):
+        for i in range(tracing.MAX_RECENT + 5):
+            with span(f"s{i}"):
+                pass
+        recent = tracing.recent(n=tracing.MAX_RECENT * 2)
+        assert len(recent) == tracing.MAX_RECENT
+        assert recent[0]["span"] == f"s{tracing.MAX_RECENT + 4}"
+
+    def test_stage_stats(self, enabled):
+        for _ in range(3):
+            with span("stage"):
+                pass
+        stats = tracing.stage_stats()["stage"]
+        assert stats["count"] == 3
+        assert sum(stats["buckets"].values()) == 3
+
+    def test_structured_log_line(self, enabled, caplog):
+        with caplog.at_level(logging.INFO, logger="tracing"):
+            with span("outer"):
+                with span("inner") as sp:
+                    sp.bytes = 10
+        inner = json.loads(caplog.records[0].getMessage())
+        assert inner["span"] == "inner" and inner["parent"] == "outer" and inner["bytes"] == 10
+        outer = json.loads(caplog.records[1].getMessage())
+        assert outer["trace"] == inner["trace"] and "children" not in outer
+
+
+class TestHistogram:
+    def test_quantiles_are_bucket_bounds(self):
+        h = Histogram()
+        for ms in [0.5] * 90 + [40] * 10:
+            h.observe(ms)
+        assert h.quantile(0.5) == 1
+        assert h.quantile(0.95) == 40  # capped at the max seen
+
+    def test_empty(self):
+        assert Histogram().quantile(0.5) == 0.0
+
+
+class TestClientStages:
+    def test_soap_get_sales_tree(self, enabled):
+        import tharanis_client as tc
+        from soap_standin import StandinServer, SyntheticTharanis
+
+        with StandinServer(SyntheticTharanis(skus=20, years=0.1, lines_per_day=10)) as srv:
+            cfg = tc._Config(srv.url, "7354", "ab", "", "", "", 0, 0, "parquet")
+            with patch("tharanis_client._get_config", return_value=cfg), \
+                 patch("tharanis_client._save_cache"):
+                df = tc.get_sales("2025.12.01", "2025.12.31", force_refresh=True)
+
+        (root,) = tracing.recent()
+        assert root["span"] == "get_sales" and root["rows"] == len(df)
+        stages = [c["span"] for c in root["children"]]
+        assert {"soap.post", "soap.extract", "soap.parse", "to_datetime"} <= set(stages)
+        post = next(c for c in root["children"] if c["span"] == "soap.post")
+        assert post["bytes"] > 0
+
+
+class TestDetached:
+    def test_background_task_starts_own_trace(self, enabled):
+        import asyncio
+
+        async def background():
+            with span("revalidate"):
+                await asyncio.sleep(0)
+
+        async def request():
+            with span("get_sales"):
+                task = asyncio.get_running_loop().create_task(tracing.detached(background()))
+            await task
+
+        asyncio.run(request())
+        roots = {r["span"]: r for r in tracing.recent()}
+        assert set(roots) == {"get_sales", "revalidate"}
+        assert "children" not in roots["get_sales"]
+
+    def test_returns_result(self):
+        import asyncio
+
+        async def answer():
+            return 42
+
+        assert asyncio.run(tracing.detached(answer())) == 42
+
@@ -0,0 +1,158 @@
+"""Tests for warmup.py — preset loading order, bounded concurrency, summary reuse."""
+
+import asyncio
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import warmup
+from data_helpers import preset_ranges
+
+TODAY = date(2025, 3, 15)
+
+
+def _sales(start: str, end: str) -> pd.DataFrame:
+    kelt = pd.date_range(start.replace(".", "-"), end.replace(".", "-"), freq="D")
+    return pd.DataFrame({
+        "kelt": kelt, "Cikkszám": "A", "Mennyiség": 1.0, "Nettó ár": 100.0,
+        "Bruttó ár": 127.0, "Nettó érték": 100.0, "Bruttó érték": 127.0,
+    })
+
+
+@pytest.fixture(autouse=True)
+def _empty_summaries():
+    warmup.clear_summaries()
+    yield
+    warmup.clear_summaries()
+
+
+class _FakeClient:
+    """Records aget_* calls and how many ran at once."""
+
+    def __init__(self) -> None:
+        self.sales: list[tuple[str, str]] = []
+        self.movements: list[tuple[str, str]] = []
+        self.active = 0
+        self.peak = 0
+
+    async def _call(self, calls, start, end):
+        calls.append((start, end))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return _sales(start, end)
+
+    async def aget_sales(self, start, end):
+        return await self._call(self.sales, start, end)
+
+    async def aget_stock_movements(self, start, end):
+        return await self._call(self.movements, start, end)
+
+
+def _warm(fake: _FakeClient, concurrency: int = 2) -> warmup.WarmupReport:
+    with patch.object(warmup.api, "aget_sales", fake.aget_sales), \
+         patch.object(warmup.api, "aget_stock_movements", fake.aget_stock_movements):
+        return asyncio.run(warmup.warm(TODAY, concurrency=concurrency))
+
+
+class TestPresetRanges:
+    def test_ranges(self):
+        ranges = preset_ranges(TODAY)
+        assert ranges["7 nap"] == (date(2025, 3, 8), TODAY)
+        assert ranges["Idén"] == (date(2025, 1, 1), TODAY)
+        assert ranges["Tavaly"] == (date(2024, 1, 1), date(2024, 12, 31))
+
+
+class TestWarm:
+    def test_widest_ranges_loaded_first(self):
+        fake = _FakeClient()
+        report = _warm(fake)
+        wide = {("2025.01.01", "2025.03.15"), ("2024.01.01", "2024.12.31")}
+        assert set(fake.movements) == wide
+        assert set(fake.sales[:2]) == wide
+        assert report.ranges == 5
+        assert report.summaries == 5 * 4
+        assert report.failures == 0
+        assert report.seconds > 0
+
+    def test_concurrency_bounded(self):
+        fake = _FakeClient()
+        _warm(fake, concurrency=1)
+        assert fake.peak == 1
+
+    def test_failures_counted_not_raised(self):
+        fake = _FakeClient()
+
+        async def broken(start, end):
+            raise ConnectionError("down")
+
+        fake.aget_stock_movements = broken
+        assert _warm(fake).failures == 2
+
+    def test_summaries_reused_by_dashboard(self):
+        _warm(_FakeClient())
+        df = _sales("2025.03.08", "2025.03.15")
+        with patch.object(warmup, "summarize_sales") as summarize:
+            summary = warmup.sales_summary(df, "2025.03.08", "2025.03.15", "Havi")
+        summarize.assert_not_called()
+        assert summary.quantity == 8
+
+
+class TestRefreshIfSynced:
+    def test_new_sync_revalidates_without_clearing(self):
+        warmup.sales_summary(_sales("2025.03.15", "2025.03.15"), "2025.03.15", "2025.03.15", "Havi")
+        with patch.object(warmup.api, "get_last_sync_time", return_value="t2"), \
+             patch.object(warmup.api, "clear_range_cache") as clear, \
+             patch.object(warmup, "warm") as warm:
+            assert asyncio.run(warmup.refresh_if_synced("t1")) == "t2"
+        clear.assert_not_called()
+        warm.assert_awaited_once()
+        assert warm.call_args.kwargs["revalidate"] is True
+        assert len(warmup._summaries) == 1
+
+    def test_same_sync_does_nothing(self):
+        with patch.object(warmup.api, "get_last_sync_time", return_value="t1"), \
+             patch.object(warmup, "warm") as warm:
+            assert asyncio.run(warmup.refresh_if_synced("t1")) == "t1"
+        warm.assert_not_called()
+
+
+class TestRunForever:
+    @pytest.mark.parametrize("raw, expected", [("4", 4), ("", 2), ("fast", 2), ("0", 1)])
+    def test_concurrency_parsed_defensively(self, monkeypatch, raw, expected):
+        monkeypatch.setenv("SAMANSPORT_WARMUP_CONCURRENCY", raw)
+        assert warmup._env_concurrency() == expected
+
+    def test_disabled_from_dotenv(self, monkeypatch):
+        monkeypatch.delenv("SAMANSPORT_WARMUP", raising=False)
+
+        def load_dotenv():
+            monkeypatch.setenv("SAMANSPORT_WARMUP", "0")
+
+        with patch("dotenv.load_dotenv", load_dotenv), \
+             patch.object(warmup, "warm") as warm:
+            asyncio.run(warmup.run_forever())
+        warm.assert_not_called()
+
+
+class TestRevalidation:
+    def test_fresher_sales_drop_overlapping_summaries(self):
+        for start, end in [("2025.03.08", "2025.03.15"), ("2024.01.01", "2024.12.31")]:
+            warmup.sales_summary(_sales(start, end), start, end, "Havi")
+        warmup._on_revalidated(
+            warmup.api.Revalidation("kimeno_szamla", "2025.03.01", "2025.03.15", None)
+        )
+        assert list(warmup._summaries) == [("2024.01.01", "2024.12.31", "Havi")]
+
+    def test_product_and_movement_revalidations_ignored(self):
+        warmup.sales_summary(_sales("2025.03.08", "2025.03.15"), "2025.03.08", "2025.03.15", "Havi")
+        warmup._on_revalidated(
+            warmup.api.Revalidation("kimeno_szamla", "2025.03.01", "2025.03.15", "NIKE-42")
+        )
+        warmup._on_revalidated(
+            warmup.api.Revalidation("raktari_mozgas", "2025.03.01", "2025.03.15", None)
+        )
+        assert len(warmup._summaries) == 1
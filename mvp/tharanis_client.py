@@ -4,32 +4,54 @@ Tharanis API V3 Client — Supabase-backed with SOAP fallback.
 Primary reads come from Supabase (fast JSON, ~50ms).
 If data is stale, a background Edge Function syncs from the Tharanis SOAP API.
 Falls back to direct SOAP calls if Supabase is not configured.
+
+The read API is async (``aget_sales``, ``aget_stock_movements``,
+``aget_inventory``, ``aget_inventory_monitor``) so callers on an event loop
+can overlap requests; ``get_*`` are blocking wrappers for Streamlit and
+scripts.
+
+Sales and movement reads are stale-while-revalidate: cached rows are
+returned at once and refreshed in the background. When fresher rows land,
+``subscribe`` callbacks (and ``wait_for_revalidation`` waiters) are notified
+so the UI can update in place. After a sync, a range read from Supabase
+fetches only the rows synced since and merges them into the cached rows.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import re
+import io
 import html
 import json
 import hashlib
-import contextlib
 import threading
-from typing import Any, TYPE_CHECKING
-
-import requests
+import weakref
+from collections import deque
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from typing import Any, TYPE_CHECKING, TypeVar
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import datetime, timezone, timedelta
-from dotenv import load_dotenv
+from datetime import datetime, timezone
+
+import metrics
+from disk_cache import CacheStats, DiskCache, RowFilter
+from range_cache import RangeCache, combine
+from tracing import detached, span, traced
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    import httpx
     from supabase import Client as SupabaseClient
 
-load_dotenv()
+_T = TypeVar("_T")
 
 
 # ── Input validation ─────────────────────────────────────────────────────────
@@ -72,18 +94,79 @@ def _sanitize_sku(cikkszam: str | None) -> str | None:
         )
     return cikkszam
 
-# ── Tharanis SOAP credentials ────────────────────────────────────────────────
-_API_URL    = os.getenv("THARANIS_API_URL",   "https://login.tharanis.hu/apiv3.php")
-_UGYFELKOD  = os.getenv("THARANIS_UGYFELKOD", "7354")
-_CEGKOD     = os.getenv("THARANIS_CEGKOD",    "ab")
-_APIKULCS   = os.getenv("THARANIS_API_KEY",   "")
+# ── Configuration ────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _Config:
+    """Tharanis SOAP credentials and Supabase settings, read from the environment."""
+
+    api_url: str
+    ugyfelkod: str
+    cegkod: str
+    apikulcs: str
+    supabase_url: str
+    supabase_key: str
+    # Range reads expected to return at least this many rows use the bulk CSV
+    # export RPC instead of paging PostgREST in 1000-row chunks (0 disables).
+    bulk_read_min_rows: int
+    # SOAP fallback disk cache: byte budget and file format ("parquet" / "arrow")
+    cache_max_bytes: int
+    cache_format: str
+    # Shared async HTTP client pool size, and how many SOAP date shards of
+    # one request are fetched at the same time
+    http_max_connections: int = 10
+    soap_concurrency: int = 4
+    # In-memory range cache budget (sales and movements frames)
+    range_cache_max_bytes: int = 256 * 1024 * 1024
+    # Serve stale cached rows immediately and refresh them in the background
+    stale_while_revalidate: bool = True
+
+    @property
+    def use_supabase(self) -> bool:
+        return bool(self.supabase_url and self.supabase_key)
+
+
+_config: _Config | None = None
+_config_lock = threading.Lock()
+
+
+def _get_config() -> _Config:
+    """Lazy-load configuration (``.env`` + environment) on first use.
+
+    Importing this module does no file I/O; the ``.env`` lookup happens the
+    first time a request actually needs credentials.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                from dotenv import load_dotenv
+                load_dotenv()
+                _config = _Config(
+                    api_url=os.getenv("THARANIS_API_URL", "https://login.tharanis.hu/apiv3.php"),
+                    ugyfelkod=os.getenv("THARANIS_UGYFELKOD", "7354"),
+                    cegkod=os.getenv("THARANIS_CEGKOD", "ab"),
+                    apikulcs=os.getenv("THARANIS_API_KEY", ""),
+                    supabase_url=os.getenv("SUPABASE_URL", ""),
+                    supabase_key=os.getenv("SUPABASE_ANON_KEY", ""),
+                    bulk_read_min_rows=int(os.getenv("SUPABASE_BULK_READ_MIN_ROWS", "20000")),
+                    cache_max_bytes=int(float(os.getenv("THARANIS_CACHE_MAX_MB", "512")) * 1024 * 1024),
+                    cache_format=os.getenv("THARANIS_CACHE_FORMAT", "parquet").strip().lower(),
+                    http_max_connections=int(os.getenv("THARANIS_HTTP_MAX_CONNECTIONS", "10")),
+                    soap_concurrency=int(os.getenv("THARANIS_SOAP_CONCURRENCY", "4")),
+                    range_cache_max_bytes=int(
+                        float(os.getenv("THARANIS_RANGE_CACHE_MB", "256")) * 1024 * 1024
+                    ),
+                    stale_while_revalidate=os.getenv("THARANIS_STALE_WHILE_REVALIDATE", "1").strip() != "0",
+                )
+    return _config
 
-_HEADERS = {"Content-Type": "text/xml; charset=utf-8"}
 
-# ── Supabase config ──────────────────────────────────────────────────────────
-_SUPABASE_URL  = os.getenv("SUPABASE_URL", "")
-_SUPABASE_KEY  = os.getenv("SUPABASE_ANON_KEY", "")
-_USE_SUPABASE  = bool(_SUPABASE_URL and _SUPABASE_KEY)
+def _use_supabase() -> bool:
+    return _get_config().use_supabase
+
+
+_HEADERS = {"Content-Type": "text/xml; charset=utf-8"}
 
 _supabase_client: SupabaseClient | None = None
 
@@ -91,32 +174,165 @@ _supabase_client: SupabaseClient | None = None
 def _get_supabase() -> SupabaseClient | None:
     """Lazy-init Supabase client."""
     global _supabase_client
-    if _supabase_client is None and _USE_SUPABASE:
+    if _supabase_client is None and _use_supabase():
         from supabase import create_client
-        _supabase_client = create_client(_SUPABASE_URL, _SUPABASE_KEY)
+        cfg = _get_config()
+        _supabase_client = create_client(cfg.supabase_url, cfg.supabase_key)
     return _supabase_client
 
 
+# ── Metrics ──────────────────────────────────────────────────────────────────
+
+_POSTGREST_SECONDS = metrics.histogram(
+    "tharanis_postgrest_request_seconds",
+    "Supabase PostgREST round-trip time per request",
+    ("table", "kind"),
+)
+_SOAP_SECONDS = metrics.histogram(
+    "tharanis_soap_request_seconds", "Tharanis SOAP round-trip time per page", ("entity",)
+)
+_SOAP_ERRORS = metrics.counter(
+    "tharanis_soap_errors_total", "Failed Tharanis SOAP requests", ("entity",)
+)
+# Public: the Streamlit fetch helpers count their st.cache_data lookups here
+# too, as cache="st_sales" / "st_movements"
+CACHE_LOOKUPS = metrics.counter(
+    "tharanis_cache_lookups_total",
+    "Data cache lookups by cache (memory, disk, st_sales, st_movements) "
+    "and result (hit, partial, miss, stale)",
+    ("cache", "result"),
+)
+_SYNC_TRIGGERS = metrics.counter(
+    "tharanis_sync_triggers_total", "Background sync-entity invocations started", ("entity",)
+)
+_SYNC_FAILURES = metrics.counter(
+    "tharanis_sync_failures_total", "Background sync-entity invocations that raised", ("entity",)
+)
+_SYNC_ACTIVE = metrics.gauge(
+    "tharanis_sync_active", "Background sync-entity calls in flight"
+)
+_REVALIDATIONS = metrics.counter(
+    "tharanis_revalidations_total",
+    "Background revalidations by entity and outcome (changed, unchanged, failed)",
+    ("entity", "result"),
+)
+_DELTA_ROWS = metrics.counter(
+    "tharanis_delta_rows_total", "Rows synced since a cached range was read, merged into it",
+    ("entity",),
+)
+
+
+# ── Async HTTP transport ─────────────────────────────────────────────────────
+#
+# The read path is async end to end. Every request goes through one shared
+# httpx.AsyncClient per event loop. The client's connection limit bounds
+# concurrent requests to Supabase and Tharanis together. The Reflex handlers
+# await the ``aget_*`` functions on their own loop. The blocking ``get_*``
+# functions run the same coroutines on a private background loop (see _run).
+
+_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = \
+    weakref.WeakKeyDictionary()
+_http_lock = threading.Lock()
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _http() -> httpx.AsyncClient:
+    """The running loop's shared HTTP client (created on first use)."""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    with _http_lock:
+        client = _http_clients.get(loop)
+        if client is None:
+            n = _get_config().http_max_connections
+            client = _http_clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+            )
+    return client
+
+
+async def aclose() -> None:
+    """Close the running loop's shared HTTP client (e.g. on app shutdown)."""
+    with _http_lock:
+        client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _run(coro: Coroutine[Any, Any, _T]) -> _T:
+    """Run *coro* on the background I/O loop and block until it finishes."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tharanis-io", daemon=True).start()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        coro.close()
+        raise RuntimeError("Blocking tharanis_client call on its own I/O loop; await aget_* instead")
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
 # ── Supabase helpers ─────────────────────────────────────────────────────────
 
+_PAGE_SIZE = 1000
+
+
 def _compute_filter_hash(entity: str, **kwargs) -> str:
     raw = json.dumps({"entity": entity, **{k: v for k, v in kwargs.items() if v}}, sort_keys=True)
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-def _is_stale(supabase: SupabaseClient, entity: str, filter_hash: str) -> bool:
+def _filter_params(filters: list[tuple[str, tuple[str, str]]]) -> list[tuple[str, str]]:
+    """PostgREST query params for ``(operator, (column, value))`` filters."""
+    return [(column, f"{op}.{value}") for op, (column, value) in filters]
+
+
+async def _rest(method: str, path: str, *, params: list[tuple[str, str]] | None = None,
+                json_body: Any = None, headers: dict[str, str] | None = None,
+                service: str = "rest/v1") -> httpx.Response:
+    """One authenticated Supabase request; raises on HTTP errors."""
+    cfg = _get_config()
+    response = await _http().request(
+        method,
+        f"{cfg.supabase_url.rstrip('/')}/{service}/{path}",
+        params=params,
+        json=json_body,
+        headers={"apikey": cfg.supabase_key, "Authorization": f"Bearer {cfg.supabase_key}",
+                 **(headers or {})},
+    )
+    response.raise_for_status()
+    return response
+
+
+def _content_range_total(response: httpx.Response) -> int | None:
+    """Total row count from a ``Content-Range: 0-999/12345`` header."""
+    total = response.headers.get("content-range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+@traced("supabase.is_stale")
+async def _is_stale(entity: str, filter_hash: str) -> bool:
     """Check sync_metadata to see if data needs refreshing."""
     try:
-        result = supabase.table("sync_metadata") \
-            .select("last_synced_at, ttl_seconds, sync_status") \
-            .eq("entity", entity) \
-            .eq("filter_hash", filter_hash) \
-            .execute()
-
-        if not result.data:
+        with _POSTGREST_SECONDS.time(table="sync_metadata", kind="select"):
+            response = await _rest("GET", "sync_metadata", params=[
+                ("select", "last_synced_at,ttl_seconds,sync_status"),
+                ("entity", f"eq.{entity}"),
+                ("filter_hash", f"eq.{filter_hash}"),
+            ])
+        data = response.json()
+
+        if not data:
             return True  # Never synced
 
-        meta: dict[str, Any] = result.data[0]  # type: ignore[assignment]
+        meta: dict[str, Any] = data[0]
         if meta["sync_status"] == "running":
             return False  # Already syncing
 
@@ -131,53 +347,307 @@ def _is_stale(supabase: SupabaseClient, entity: str, filter_hash: str) -> bool:
         return True
 
 
-def _supabase_select_all(supabase: SupabaseClient, table: str, select: str, filters: list[tuple[str, tuple[str, str]]] | None = None) -> list[dict[str, Any]]:
-    """Paginated Supabase read to bypass the default 1000-row limit."""
-    all_rows: list[dict[str, Any]] = []
-    page_size: int = 1000
-    offset: int = 0
+@traced("supabase.select")
+async def _supabase_select_all(table: str, select: str,
+                               filters: list[tuple[str, tuple[str, str]]] | None = None) -> list[dict[str, Any]]:
+    """Paginated read to bypass the default 1000-row limit.
+
+    The first page also asks for the exact row count; the remaining pages
+    are then requested concurrently and concatenated in offset order.
+    Every page is ordered by the primary key: without an ORDER BY, Postgres
+    may return rows in a different order per query, so separate offset
+    pages could repeat or skip rows. New rows get higher ids and land on
+    the last page, not between pages already read.
+    """
+    params = [("select", select), *_filter_params(filters or []), ("order", f"{_ROW_ID}.asc")]
+
+    async def page(offset: int, count: bool = False) -> httpx.Response:
+        with _POSTGREST_SECONDS.time(table=table, kind="page"):
+            return await _rest(
+                "GET", table,
+                params=[*params, ("offset", str(offset)), ("limit", str(_PAGE_SIZE))],
+                headers={"Prefer": "count=exact"} if count else None,
+            )
+
     try:
+        first = await page(0, count=True)
+        rows: list[dict[str, Any]] = first.json() or []
+        if len(rows) < _PAGE_SIZE:
+            return rows
+        total = _content_range_total(first)
+        if total is not None:
+            rest = await asyncio.gather(*(page(o) for o in range(_PAGE_SIZE, total, _PAGE_SIZE)))
+            for response in rest:
+                rows.extend(response.json() or [])
+            return rows
+        # No count available: page sequentially until a short page
+        offset = _PAGE_SIZE
         while True:
-            query = supabase.table(table).select(select).range(offset, offset + page_size - 1)
-            if filters:
-                for method, args in filters:
-                    query = getattr(query, method)(*args)
-            result = query.execute()
-            rows: list[dict[str, Any]] = result.data or []  # type: ignore[assignment]
-            all_rows.extend(rows)
-            if len(rows) < page_size:
-                break
-            offset += page_size
+            batch = (await page(offset)).json() or []
+            rows.extend(batch)
+            if len(batch) < _PAGE_SIZE:
+                return rows
+            offset += _PAGE_SIZE
     except Exception:
         logger.exception("Supabase paginated read failed for table '%s'", table)
         raise
-    return all_rows
+
+
+_BULK_EXPORT_RPC = {
+    "sales_invoice_lines": "export_sales_csv",
+    "warehouse_movements": "export_movements_csv",
+}
+
+
+@traced("supabase.count")
+async def _supabase_count(table: str, filters: list[tuple[str, tuple[str, str]]]) -> int | None:
+    """Exact row count for a filtered read (HEAD request, no rows transferred)."""
+    try:
+        with _POSTGREST_SECONDS.time(table=table, kind="count"):
+            response = await _rest("HEAD", table, params=[("select", "id"), *_filter_params(filters)],
+                                   headers={"Prefer": "count=exact"})
+        return _content_range_total(response)
+    except Exception:
+        logger.debug("Row count failed for table '%s'", table, exc_info=True)
+        return None
+
+
+async def _supabase_rpc(fn: str, params: dict[str, Any], table: str = "rpc") -> Any:
+    """Call a PostgREST function and return its decoded JSON result."""
+    with _POSTGREST_SECONDS.time(table=table, kind="rpc"):
+        response = await _rest("POST", f"rpc/{fn}", json_body=params)
+    return response.json()
+
+
+@traced("supabase.bulk_read")
+async def _supabase_bulk_read(table: str, start_pg: str, end_pg: str,
+                              cikkszam: str | None) -> pd.DataFrame | None:
+    """Read a whole range in one response via the CSV export RPC. None on failure."""
+    try:
+        with span("supabase.rpc", rpc=_BULK_EXPORT_RPC[table]) as sp:
+            data = await _supabase_rpc(
+                _BULK_EXPORT_RPC[table],
+                {"p_start": start_pg, "p_end": end_pg, "p_sku": cikkszam},
+                table=table,
+            )
+            text = str(data or "")
+            sp.bytes = len(text)
+        return _decode_csv(table, text)
+    except Exception:
+        logger.warning("Bulk export failed for table '%s', falling back to paging", table, exc_info=True)
+        return None
+
+
+async def _supabase_read_range(table: str, filters: list[tuple[str, tuple[str, str]]],
+                               start_pg: str, end_pg: str, cikkszam: str | None) -> pd.DataFrame:
+    """Read a filtered date range, switching to the bulk export for large reads."""
+    min_rows = _get_config().bulk_read_min_rows
+    if min_rows and table in _BULK_EXPORT_RPC:
+        n_rows = await _supabase_count(table, filters)
+        if n_rows is not None and n_rows >= min_rows:
+            df = await _supabase_bulk_read(table, start_pg, end_pg, cikkszam)
+            if df is not None:
+                return df
+
+    rows = await _supabase_select_all(table, _range_select(table), filters)
+    if not rows:
+        return _empty_frame(table)
+    return _decode_range_rows(table, rows)
+
+
+# Strong references to in-flight sync tasks (the loop only keeps weak ones)
+_sync_tasks: set[asyncio.Task] = set()
+
+
+async def _invoke_sync(entity: str, filters: dict[str, str | None]) -> None:
+    _SYNC_ACTIVE.inc()
+    try:
+        if not _use_supabase():
+            return
+        await _rest("POST", "sync-entity", service="functions/v1",
+                    json_body={"entity": entity, "filters": filters})
+    except Exception:
+        _SYNC_FAILURES.inc(entity=entity)
+        logger.warning("Background sync trigger failed for '%s'", entity, exc_info=True)
+        return
+    finally:
+        _SYNC_ACTIVE.dec()
+
+    # The Edge Function returns once the sync is done: fetch what it added
+    # to the synced range (without another freshness check) and notify
+    # subscribers
+    start_date, end_date = filters.get("start_date"), filters.get("end_date")
+    if entity in _RANGE_TABLES and start_date and end_date and _get_config().stale_while_revalidate:
+        cikkszam = filters.get("cikkszam")
+        await _revalidate_synced(entity, start_date, end_date, cikkszam,
+                                 lambda s, e: _supabase_reread(entity, s, e, cikkszam))
 
 
 def _trigger_sync_background(entity: str, filters: dict[str, str | None]) -> None:
-    """Fire-and-forget: trigger the sync-entity Edge Function in a background thread."""
-    def _do_sync() -> None:
+    """Fire-and-forget: invoke the sync-entity Edge Function as a background task.
+
+    Must be called from a running event loop (the ``aget_*`` functions);
+    the caller does not wait for the sync to finish.
+    """
+    _SYNC_TRIGGERS.inc(entity=entity)
+    task = asyncio.get_running_loop().create_task(detached(_invoke_sync(entity, filters)))
+    _sync_tasks.add(task)
+    task.add_done_callback(_sync_tasks.discard)
+
+
+# ── Supabase read decoding ───────────────────────────────────────────────────
+
+# Schema registry: per table, (Supabase column, legacy column, dtype kind)
+# in output order. Kinds: "date" → datetime64, "float" → float64,
+# "category" → pandas Categorical, "str" → object.
+_TABLE_SCHEMAS: dict[str, list[tuple[str, str, str]]] = {
+    "sales_invoice_lines": [
+        ("fulfillment_date", "kelt",         "date"),
+        ("sku",              "Cikkszám",     "str"),
+        ("quantity",         "Mennyiség",    "float"),
+        ("net_price",        "Nettó ár",     "float"),
+        ("gross_price",      "Bruttó ár",    "float"),
+        ("net_value",        "Nettó érték",  "float"),
+        ("gross_value",      "Bruttó érték", "float"),
+    ],
+    "inventory_snapshot": [
+        ("sku",             "Cikkszám", "str"),
+        ("total_available", "Készlet",  "float"),
+        ("warehouse_1",     "Raktár 1", "float"),
+        ("warehouse_2",     "Raktár 2", "float"),
+        ("warehouse_3",     "Raktár 3", "float"),
+        ("warehouse_4",     "Raktár 4", "float"),
+        ("warehouse_5",     "Raktár 5", "float"),
+        ("warehouse_6",     "Raktár 6", "float"),
+    ],
+    "warehouse_movements": [
+        ("movement_date", "kelt",        "date"),
+        ("sku",           "Cikkszám",    "str"),
+        ("direction",     "Irány",       "category"),
+        ("movement_type", "Mozgástípus", "category"),
+        ("quantity",      "Mennyiség",   "float"),
+    ],
+    "products": [
+        ("sku",  "Cikkszám", "str"),
+        ("name", "Cikknév",  "str"),
+    ],
+}
+
+
+def _schema_select(table: str) -> str:
+    """PostgREST select list for *table*, in schema order."""
+    return ", ".join(src for src, _, _ in _TABLE_SCHEMAS[table])
+
+
+def _decode_column(values: list[Any], kind: str) -> Any:
+    """Convert one column of raw JSON values into a typed array."""
+    if kind == "float":
+        # NUMERIC arrives as JSON numbers or strings; None becomes NaN.
         try:
-            supabase = _get_supabase()
-            if supabase:
-                supabase.functions.invoke(
-                    "sync-entity",
-                    invoke_options={"body": {"entity": entity, "filters": filters}}
-                )
-        except Exception:
-            logger.warning("Background sync trigger failed for '%s'", entity, exc_info=True)
+            return np.asarray(values, dtype="float64")
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy("float64")
+    if kind == "date":
+        return pd.to_datetime(values, format="ISO8601", errors="coerce")
+    if kind == "category":
+        return pd.Categorical(values)
+    return np.asarray(values, dtype=object)
+
+
+@traced("decode.rows")
+def _decode_rows(table: str, rows: list[dict[str, Any]]) -> pd.DataFrame:
+    """Build a typed DataFrame with legacy column names straight from *rows*."""
+    return pd.DataFrame({
+        dst: _decode_column([row.get(src) for row in rows], kind)
+        for src, dst, kind in _TABLE_SCHEMAS[table]
+    })
+
+
+def _empty_frame(table: str) -> pd.DataFrame:
+    """Empty DataFrame with the legacy columns and dtypes of *table*."""
+    return _decode_rows(table, [])
+
+
+_CSV_DTYPES: dict[str, Any] = {"float": "float64", "category": "category", "str": object}
+
+
+@traced("decode.csv")
+def _decode_csv(table: str, text: str) -> pd.DataFrame:
+    """Parse a bulk CSV export (Supabase column header) with the pandas C reader."""
+    schema = _TABLE_SCHEMAS[table]
+    date_cols = [src for src, _, kind in schema if kind == "date"]
+    df = pd.read_csv(
+        io.StringIO(text),
+        engine="c",
+        dtype={src: _CSV_DTYPES[kind] for src, _, kind in schema if kind != "date"},
+        parse_dates=date_cols,
+        date_format="%Y-%m-%d",
+        keep_default_na=False,
+        na_values=[""],
+    )
+    if df.empty:
+        return _empty_frame(table)
+    # Exports from migration 009 on also carry id and synced_at (see _SYNCED_AT)
+    watermark = _max_synced_at(df[_SYNCED_AT]) if _SYNCED_AT in df.columns else None
+    df = df.rename(columns={src: dst for src, dst, _ in schema})
+    df = df[[dst for _, dst, _ in schema] + ([_ROW_ID] if _ROW_ID in df.columns else [])]
+    df.attrs[_SYNCED_AT] = watermark
+    return df
+
+
+# The range reads record the newest ``synced_at`` among their rows in
+# ``df.attrs["synced_at"]`` (None when unknown) and carry each row's ``id``
+# for the range cache, which keeps it out of the frames it returns.
+# sync-entity only ever inserts sales and movement rows, stamping each with
+# the time its batch was built, so the rows added to a range since it was
+# read have a later synced_at, except that overlapping syncs can commit out
+# of timestamp order. Delta reads therefore start _DELTA_OVERLAP before the
+# watermark, and the rows already cached are recognised by id (see
+# _merge_delta).
+_SYNCED_AT = "synced_at"
+_ROW_ID = "id"
+_DELTA_OVERLAP = timedelta(minutes=30)
 
-    thread = threading.Thread(target=_do_sync, daemon=True)
-    thread.start()
+
+def _range_select(table: str) -> str:
+    return f"{_schema_select(table)}, {_ROW_ID}, {_SYNCED_AT}"
+
+
+def _decode_range_rows(table: str, rows: list[dict[str, Any]]) -> pd.DataFrame:
+    """``_decode_rows`` plus the row ids (when selected) and the synced_at watermark."""
+    df = _decode_rows(table, rows)
+    if rows and _ROW_ID in rows[0]:
+        df[_ROW_ID] = pd.to_numeric(pd.Series([row.get(_ROW_ID) for row in rows]), errors="coerce")
+    df.attrs[_SYNCED_AT] = _max_synced_at([row.get(_SYNCED_AT) for row in rows])
+    return df
+
+
+def _without_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """*df* as callers see it: without the range-cache row ids."""
+    return df.drop(columns=_ROW_ID) if _ROW_ID in df.columns else df
+
+
+def _max_synced_at(values: Any) -> str | None:
+    """The newest of the ``synced_at`` timestamps in *values*, as ISO 8601."""
+    stamps = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce",
+                            format="ISO8601")
+    newest = stamps.max()
+    return None if pd.isna(newest) else newest.isoformat()
 
 
 # ── Supabase read functions ──────────────────────────────────────────────────
+#
+# The row read and the freshness check are independent, so they run
+# concurrently.
 
-def _supabase_get_sales(start_date: str, end_date: str,
-                         cikkszam: str | None = None) -> pd.DataFrame | None:
-    """Read sales data from Supabase. Returns None if Supabase is unavailable."""
-    supabase = _get_supabase()
-    if not supabase:
+async def _supabase_get_sales(start_date: str, end_date: str, cikkszam: str | None = None,
+                              check_fresh: bool = True) -> pd.DataFrame | None:
+    """Read sales data from Supabase. Returns None if Supabase is unavailable.
+
+    Without *check_fresh* the caller checks freshness itself (see
+    ``_sync_if_stale``).
+    """
+    if not _use_supabase():
         return None
 
     try:
@@ -192,35 +662,17 @@ def _supabase_get_sales(start_date: str, end_date: str,
         if cikkszam:
             filters.append(("eq", ("sku", cikkszam)))
 
-        rows = _supabase_select_all(
-            supabase, "sales_invoice_lines",
-            "fulfillment_date, sku, quantity, net_price, vat_pct, gross_price, net_value, gross_value",
-            filters
-        )
-
-        if not rows:
-            return pd.DataFrame(
-                columns=["kelt", "Cikkszám", "Mennyiség",
-                         "Nettó ár", "Bruttó ár", "Nettó érték", "Bruttó érték"]
-            )
-
-        df = pd.DataFrame(rows)
-        # Map Supabase columns to legacy Hungarian column names
-        df = df.rename(columns={
-            "fulfillment_date": "kelt",
-            "sku": "Cikkszám",
-            "quantity": "Mennyiség",
-            "net_price": "Nettó ár",
-            "gross_price": "Bruttó ár",
-            "net_value": "Nettó érték",
-            "gross_value": "Bruttó érték",
-        })
-        df = df[["kelt", "Cikkszám", "Mennyiség", "Nettó ár", "Bruttó ár", "Nettó érték", "Bruttó érték"]]
-        df["kelt"] = pd.to_datetime(df["kelt"], errors="coerce")
+        read = _supabase_read_range("sales_invoice_lines", filters, start_pg, end_pg, cikkszam)
+        if check_fresh:
+            fh = _compute_filter_hash("kimeno_szamla", start_date=start_date, end_date=end_date, cikkszam=cikkszam)
+            df, stale = await asyncio.gather(read, _is_stale("kimeno_szamla", fh))
+        else:
+            df, stale = await read, False
+        if df.empty:
+            return df
 
-        # Check freshness and trigger background refresh if stale
-        fh = _compute_filter_hash("kimeno_szamla", start_date=start_date, end_date=end_date, cikkszam=cikkszam)
-        if _is_stale(supabase, "kimeno_szamla", fh):
+        # Trigger a background refresh if stale
+        if stale:
             _trigger_sync_background("kimeno_szamla", {
                 "start_date": start_date, "end_date": end_date, "cikkszam": cikkszam
             })
@@ -231,10 +683,9 @@ def _supabase_get_sales(start_date: str, end_date: str,
         return None
 
 
-def _supabase_get_inventory(cikkszam: str | None = None) -> pd.DataFrame | None:
+async def _supabase_get_inventory(cikkszam: str | None = None) -> pd.DataFrame | None:
     """Read inventory data from Supabase."""
-    supabase = _get_supabase()
-    if not supabase:
+    if not _use_supabase():
         return None
 
     try:
@@ -242,34 +693,18 @@ def _supabase_get_inventory(cikkszam: str | None = None) -> pd.DataFrame | None:
         if cikkszam:
             filters.append(("eq", ("sku", cikkszam)))
 
-        rows = _supabase_select_all(
-            supabase, "inventory_snapshot",
-            "sku, total_available, warehouse_1, warehouse_2, warehouse_3, warehouse_4, warehouse_5, warehouse_6",
-            filters
+        fh = _compute_filter_hash("keszlet", cikkszam=cikkszam)
+        rows, stale = await asyncio.gather(
+            _supabase_select_all("inventory_snapshot", _schema_select("inventory_snapshot"), filters),
+            _is_stale("keszlet", fh),
         )
 
         if not rows:
-            return pd.DataFrame(
-                columns=["Cikkszám", "Készlet",
-                         "Raktár 1", "Raktár 2", "Raktár 3",
-                         "Raktár 4", "Raktár 5", "Raktár 6"]
-            )
+            return _empty_frame("inventory_snapshot")
 
-        df = pd.DataFrame(rows)
-        df = df.rename(columns={
-            "sku": "Cikkszám",
-            "total_available": "Készlet",
-            "warehouse_1": "Raktár 1",
-            "warehouse_2": "Raktár 2",
-            "warehouse_3": "Raktár 3",
-            "warehouse_4": "Raktár 4",
-            "warehouse_5": "Raktár 5",
-            "warehouse_6": "Raktár 6",
-        })
+        df = _decode_rows("inventory_snapshot", rows)
 
-        # Check freshness
-        fh = _compute_filter_hash("keszlet", cikkszam=cikkszam)
-        if _is_stale(supabase, "keszlet", fh):
+        if stale:
             _trigger_sync_background("keszlet", {"cikkszam": cikkszam} if cikkszam else {})
 
         return df
@@ -278,11 +713,10 @@ def _supabase_get_inventory(cikkszam: str | None = None) -> pd.DataFrame | None:
         return None
 
 
-def _supabase_get_movements(start_date: str, end_date: str,
-                             cikkszam: str | None = None) -> pd.DataFrame | None:
-    """Read warehouse movements from Supabase."""
-    supabase = _get_supabase()
-    if not supabase:
+async def _supabase_get_movements(start_date: str, end_date: str, cikkszam: str | None = None,
+                                  check_fresh: bool = True) -> pd.DataFrame | None:
+    """Read warehouse movements from Supabase (see ``_supabase_get_sales``)."""
+    if not _use_supabase():
         return None
 
     try:
@@ -296,31 +730,16 @@ def _supabase_get_movements(start_date: str, end_date: str,
         if cikkszam:
             filters.append(("eq", ("sku", cikkszam)))
 
-        rows = _supabase_select_all(
-            supabase, "warehouse_movements",
-            "movement_date, sku, direction, movement_type, quantity",
-            filters
-        )
-
-        if not rows:
-            return pd.DataFrame(
-                columns=["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség"]
-            )
-
-        df = pd.DataFrame(rows)
-        df = df.rename(columns={
-            "movement_date": "kelt",
-            "sku": "Cikkszám",
-            "direction": "Irány",
-            "movement_type": "Mozgástípus",
-            "quantity": "Mennyiség",
-        })
-        df = df[["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség"]]
-        df["kelt"] = pd.to_datetime(df["kelt"], errors="coerce")
+        read = _supabase_read_range("warehouse_movements", filters, start_pg, end_pg, cikkszam)
+        if check_fresh:
+            fh = _compute_filter_hash("raktari_mozgas", start_date=start_date, end_date=end_date, cikkszam=cikkszam)
+            df, stale = await asyncio.gather(read, _is_stale("raktari_mozgas", fh))
+        else:
+            df, stale = await read, False
+        if df.empty:
+            return df
 
-        # Check freshness
-        fh = _compute_filter_hash("raktari_mozgas", start_date=start_date, end_date=end_date, cikkszam=cikkszam)
-        if _is_stale(supabase, "raktari_mozgas", fh):
+        if stale:
             _trigger_sync_background("raktari_mozgas", {
                 "start_date": start_date, "end_date": end_date, "cikkszam": cikkszam
             })
@@ -331,6 +750,52 @@ def _supabase_get_movements(start_date: str, end_date: str,
         return None
 
 
+# Entity → (table, date column) of the date-ranged reads
+_RANGE_TABLES = {
+    "kimeno_szamla": ("sales_invoice_lines", "fulfillment_date"),
+    "raktari_mozgas": ("warehouse_movements", "movement_date"),
+}
+
+
+async def _supabase_reread(entity: str, start_date: str, end_date: str,
+                           cikkszam: str | None) -> pd.DataFrame:
+    """Read a just-synced range, skipping the freshness check and sync trigger."""
+    table, date_col = _RANGE_TABLES[entity]
+    start_pg = start_date.replace(".", "-")
+    end_pg = end_date.replace(".", "-")
+    filters = [("gte", (date_col, start_pg)), ("lte", (date_col, end_pg))]
+    if cikkszam:
+        filters.append(("eq", ("sku", cikkszam)))
+    return await _supabase_read_range(table, filters, start_pg, end_pg, cikkszam)
+
+
+async def _sync_if_stale(entity: str, start_date: str, end_date: str,
+                         cikkszam: str | None) -> None:
+    """Trigger a background sync of a range if sync_metadata marks it stale."""
+    if not _use_supabase():
+        return
+    fh = _compute_filter_hash(entity, start_date=start_date, end_date=end_date, cikkszam=cikkszam)
+    if await _is_stale(entity, fh):
+        _trigger_sync_background(entity, {
+            "start_date": start_date, "end_date": end_date, "cikkszam": cikkszam
+        })
+
+
+async def _supabase_read_delta(entity: str, start_date: str, end_date: str,
+                               cikkszam: str | None, after: str) -> pd.DataFrame:
+    """Rows of a range synced after *after* (no freshness check)."""
+    table, date_col = _RANGE_TABLES[entity]
+    filters = [
+        ("gte", (date_col, start_date.replace(".", "-"))),
+        ("lte", (date_col, end_date.replace(".", "-"))),
+        ("gt", (_SYNCED_AT, after)),
+    ]
+    if cikkszam:
+        filters.append(("eq", ("sku", cikkszam)))
+    rows = await _supabase_select_all(table, _range_select(table), filters)
+    return _decode_range_rows(table, rows)
+
+
 # ── Low-level SOAP helpers (fallback) ────────────────────────────────────────
 
 def _tag(xml: str, tag: str) -> str:
@@ -344,6 +809,7 @@ def _tag(xml: str, tag: str) -> str:
 
 
 def _build_envelope(entity: str, leker_xml: str) -> str:
+    cfg = _get_config()
     return f"""<?xml version="1.0" encoding="UTF-8"?>
 <SOAP-ENV:Envelope
   xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"
@@ -352,9 +818,9 @@ def _build_envelope(entity: str, leker_xml: str) -> str:
   xmlns:xsd="http://www.w3.org/2001/XMLSchema">
   <SOAP-ENV:Body>
     <ns1:leker>
-      <param0 xsi:type="xsd:string">{_UGYFELKOD}</param0>
-      <param1 xsi:type="xsd:string">{_CEGKOD}</param1>
-      <param2 xsi:type="xsd:string">{_APIKULCS}</param2>
+      <param0 xsi:type="xsd:string">{cfg.ugyfelkod}</param0>
+      <param1 xsi:type="xsd:string">{cfg.cegkod}</param1>
+      <param2 xsi:type="xsd:string">{cfg.apikulcs}</param2>
       <param3 xsi:type="xsd:string">{entity}</param3>
       <param4 xsi:type="xsd:string"><![CDATA[{leker_xml}]]></param4>
     </ns1:leker>
@@ -411,23 +877,27 @@ def _build_mozgas_leker(start_date: str, end_date: str, cikkszam: str | None,
     )
 
 
-def _post_soap(entity: str, leker_xml: str) -> str:
+@traced("soap.post")
+async def _post_soap(entity: str, leker_xml: str) -> str:
+    import httpx
+
     envelope = _build_envelope(entity, leker_xml)
     try:
-        r = requests.post(
-            _API_URL,
-            data=envelope.encode("utf-8"),
-            headers=_HEADERS,
-            verify=True,
-            timeout=120,
-        )
+        with _SOAP_SECONDS.time(entity=entity):
+            r = await _http().post(
+                _get_config().api_url,
+                content=envelope.encode("utf-8"),
+                headers=_HEADERS,
+            )
         r.raise_for_status()
         return r.text
-    except requests.RequestException:
+    except httpx.HTTPError:
+        _SOAP_ERRORS.inc(entity=entity)
         logger.exception("SOAP request failed for entity '%s'", entity)
         raise
 
 
+@traced("soap.extract")
 def _extract_valasz(soap_text: str) -> str:
     m = re.search(r"<return[^>]*>(.*?)</return>", soap_text, re.DOTALL)
     if not m:
@@ -442,6 +912,7 @@ def _extract_valasz(soap_text: str) -> str:
     return valasz_m.group(1).strip() if valasz_m else ""
 
 
+@traced("soap.parse")
 def _parse_tetelek(valasz_xml: str, cikkszam_filter: str | None = None) -> list[dict[str, Any]]:
     records = []
     for elem_m in re.finditer(r"<elem>(.*?)</elem>", valasz_xml, re.DOTALL):
@@ -480,6 +951,7 @@ def _parse_tetelek(valasz_xml: str, cikkszam_filter: str | None = None) -> list[
     return records
 
 
+@traced("soap.parse")
 def _parse_keszlet(valasz_xml: str) -> list[dict[str, Any]]:
     records = []
     for elem_m in re.finditer(r"<elem>(.*?)</elem>", valasz_xml, re.DOTALL):
@@ -502,6 +974,7 @@ def _parse_keszlet(valasz_xml: str) -> list[dict[str, Any]]:
     return records
 
 
+@traced("soap.parse")
 def _parse_mozgas(valasz_xml: str, cikkszam_filter: str | None = None) -> list[dict[str, Any]]:
     records = []
     for elem_m in re.finditer(r"<elem>(.*?)</elem>", valasz_xml, re.DOTALL):
@@ -535,13 +1008,402 @@ def _parse_mozgas(valasz_xml: str, cikkszam_filter: str | None = None) -> list[d
     return records
 
 
+# ── SOAP paging ──────────────────────────────────────────────────────────────
+
+# Date-ranged SOAP reads are split into shards of this many days, fetched
+# concurrently (up to _Config.soap_concurrency at a time)
+_SOAP_SHARD_DAYS = 92
+
+
+def _date_shards(start_date: str, end_date: str,
+                 days: int = _SOAP_SHARD_DAYS) -> list[tuple[str, str]]:
+    """Split an inclusive 'YYYY.MM.DD' range into consecutive sub-ranges."""
+    start = datetime.strptime(start_date, "%Y.%m.%d").date()
+    end = datetime.strptime(end_date, "%Y.%m.%d").date()
+    shards = []
+    while start <= end:
+        stop: date = min(start + timedelta(days=days - 1), end)
+        shards.append((start.strftime("%Y.%m.%d"), stop.strftime("%Y.%m.%d")))
+        start = stop + timedelta(days=1)
+    return shards
+
+
+async def _soap_pages(entity: str, build: Callable[[int], str],
+                      parse: Callable[[str], list[dict]], limit: int,
+                      count_raw_elems: bool = True) -> list[dict]:
+    """Page through one SOAP query until a short page.
+
+    A page is short when it has fewer than *limit* ``<elem>`` entries (or
+    parsed records, if *count_raw_elems* is false — the parser may drop
+    filtered rows, so raw entries are the reliable signal where available).
+    """
+    records: list[dict] = []
+    page = 0
+    while True:
+        valasz = _extract_valasz(await _post_soap(entity, build(page)))
+        if not valasz:
+            break
+        page_records = parse(valasz)
+        records.extend(page_records)
+        n = len(re.findall(r"<elem>", valasz)) if count_raw_elems else len(page_records)
+        if n < limit:
+            break
+        page += 1
+    return records
+
+
+async def _soap_range(entity: str, start_date: str, end_date: str,
+                      build: Callable[[str, str, int], str],
+                      parse: Callable[[str], list[dict]], limit: int) -> list[dict]:
+    """Fetch a date range as concurrent shards; records come back in shard order."""
+    semaphore = asyncio.Semaphore(max(1, _get_config().soap_concurrency))
+
+    async def shard(start: str, end: str) -> list[dict]:
+        async with semaphore:
+            return await _soap_pages(entity, lambda page: build(start, end, page), parse, limit)
+
+    parts = await asyncio.gather(*(shard(s, e) for s, e in _date_shards(start_date, end_date)))
+    return [record for part in parts for record in part]
+
+
+# ── In-memory range cache ────────────────────────────────────────────────────
+#
+# Sits in front of Supabase and SOAP for the date-ranged reads. A request
+# inside an already loaded range is answered by slicing that range; a
+# partially covered one fetches only the missing days.
+
+_RANGE_CACHE_MAX_AGE_SECONDS = 15 * 60
+
+_range_cache: RangeCache | None = None
+
+metrics.gauge("tharanis_range_cache_bytes", "Size of the in-memory range cache").set_function(
+    lambda: _range_cache.nbytes if _range_cache else 0
+)
+
+
+def _get_range_cache() -> RangeCache:
+    global _range_cache
+    if _range_cache is None:
+        _range_cache = RangeCache(_get_config().range_cache_max_bytes, _RANGE_CACHE_MAX_AGE_SECONDS,
+                                  id_col=_ROW_ID)
+    return _range_cache
+
+
+def clear_range_cache() -> None:
+    """Forget every loaded range, e.g. after a sync wrote new rows to Supabase."""
+    if _range_cache is not None:
+        _range_cache.clear()
+
+
+def _day(value: str) -> date:
+    return datetime.strptime(value, "%Y.%m.%d").date()
+
+
+async def _cached_range(entity: str, start_date: str, end_date: str, cikkszam: str | None,
+                        fetch: Callable[[str, str], Coroutine[Any, Any, pd.DataFrame]],
+                        force_refresh: bool) -> pd.DataFrame:
+    """Answer a range read from the range cache, calling *fetch* for the gaps only.
+
+    A product query is also answered from a cached all-products range that
+    covers it. Empty results are not cached, so an empty range is fetched
+    again next time. Gaps are fetched with ``check_fresh=False``; freshness
+    is checked once for the requested range instead, so an odd-sized gap
+    does not get a sync_metadata entry (and sync run) of its own.
+    """
+    cache = _get_range_cache()
+    key = (entity, cikkszam)
+    start, end = _day(start_date), _day(end_date)
+
+    if force_refresh:
+        df = await fetch(start_date, end_date)
+        if not df.empty:
+            cache.store(key, start, end, df, df.attrs.get(_SYNCED_AT))
+        return _without_ids(df)
+
+    hit, gaps = cache.lookup(key, start, end)
+    if hit is None and cikkszam:
+        all_hit, all_gaps = cache.lookup((entity, None), start, end)
+        if not all_gaps:
+            # Sliced from the all-products range, which is what gets
+            # revalidated (product waiters are notified of it too)
+            key, fetch = (entity, None), _all_products_fetch(entity)
+            hit, gaps = all_hit[all_hit["Cikkszám"] == cikkszam].reset_index(drop=True), []
+    if not gaps:
+        CACHE_LOOKUPS.inc(cache="memory", result="hit")
+        age = cache.age(key, start, end)
+        if (_get_config().stale_while_revalidate and age is not None
+                and age > _RANGE_CACHE_REVALIDATE_SECONDS):
+            _revalidate_background(entity, start_date, end_date, key[1], fetch)
+        return hit
+    CACHE_LOOKUPS.inc(cache="memory", result="miss" if hit is None else "partial")
+
+    if hit is None:
+        fetches = [fetch(start_date, end_date)]
+    else:
+        fetches = [
+            fetch(s.strftime("%Y.%m.%d"), e.strftime("%Y.%m.%d"), check_fresh=False)
+            for s, e in gaps
+        ]
+        fetches.append(_sync_if_stale(entity, start_date, end_date, cikkszam))
+    fetched = (await asyncio.gather(*fetches))[:len(gaps)]
+    for (s, e), df in zip(gaps, fetched):
+        if not df.empty:
+            cache.store(key, s, e, df, df.attrs.get(_SYNCED_AT))
+    if hit is None and len(fetched) == 1:
+        return _without_ids(fetched[0])
+    return combine([hit, *(_without_ids(df) for df in fetched)])
+
+
+def _all_products_fetch(entity: str) -> Callable[[str, str], Coroutine[Any, Any, pd.DataFrame]]:
+    fetch = _RANGE_FETCHERS[entity]
+    return lambda s, e: fetch(s, e, None, 200, False)
+
+
+# ── Stale-while-revalidate ───────────────────────────────────────────────────
+#
+# Three kinds of stale read are answered at once and refreshed afterwards:
+#   - a range-cache hit older than _RANGE_CACHE_REVALIDATE_SECONDS;
+#   - a Supabase read that sync_metadata marks stale (re-read once the
+#     sync-entity call it triggers returns, see _invoke_sync);
+#   - a SOAP fallback read served from an expired disk cache entry.
+# The refreshed rows replace the range in the range cache. If they differ
+# from what was cached, subscribers get a Revalidation for the range.
+
+_RANGE_CACHE_REVALIDATE_SECONDS = 5 * 60
+
+
+@dataclass(frozen=True)
+class Revalidation:
+    """Fresher rows for ``[start_date, end_date]`` are now in the range cache."""
+
+    entity: str
+    start_date: str
+    end_date: str
+    cikkszam: str | None
+    # Position in the order of notifications (see revalidation_mark)
+    seq: int = field(default=0, compare=False)
+
+    def overlaps(self, start_date: str, end_date: str) -> bool:
+        # 'YYYY.MM.DD' strings order like the dates they name
+        return self.start_date <= end_date and start_date <= self.end_date
+
+
+_subscribers: list[Callable[[Revalidation], None]] = []
+_subscribers_lock = threading.Lock()
+# The latest notifications, so a waiter that subscribes late still sees them
+_recent_revalidations: deque[Revalidation] = deque(maxlen=256)
+_revalidation_seq = 0
+
+# In-flight revalidations (deduplicated by range) and their tasks
+_revalidating: set[tuple[str, str, str, str | None]] = set()
+_revalidation_tasks: set[asyncio.Task] = set()
+_revalidating_lock = threading.Lock()
+
+
+def subscribe(callback: Callable[[Revalidation], None]) -> Callable[[], None]:
+    """Call *callback* after every revalidation that changed cached rows.
+
+    The callback runs on the thread that revalidated (possibly the blocking
+    wrappers' background loop), so it must be quick and thread-safe.
+    Returns a function that unsubscribes it.
+    """
+    with _subscribers_lock:
+        _subscribers.append(callback)
+
+    def unsubscribe() -> None:
+        with _subscribers_lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+
+    return unsubscribe
+
+
+def revalidation_mark() -> int:
+    """The ``seq`` of the latest notification, for ``wait_for_revalidation(after=...)``."""
+    with _subscribers_lock:
+        return _revalidation_seq
+
+
+def _notify(event: Revalidation) -> None:
+    global _revalidation_seq
+    with _subscribers_lock:
+        _revalidation_seq += 1
+        event = replace(event, seq=_revalidation_seq)
+        _recent_revalidations.append(event)
+        callbacks = list(_subscribers)
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception:
+            logger.exception("Revalidation subscriber failed")
+
+
+async def wait_for_revalidation(entity: str, start_date: str, end_date: str,
+                                cikkszam: str | None = None,
+                                timeout: float | None = None,
+                                after: int | None = None) -> Revalidation | None:
+    """Wait until fresher rows overlapping the range land; None on timeout.
+
+    A product's waiters are also woken by all-products revalidations.
+
+    With *after* (a ``revalidation_mark()`` or a previous event's ``seq``),
+    a matching notification sent since then returns at once, so one that
+    lands between a read and the wait is not missed.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[Revalidation] = loop.create_future()
+
+    def resolve(event: Revalidation) -> None:
+        if not future.done():
+            future.set_result(event)
+
+    def matches(event: Revalidation) -> bool:
+        return (event.entity == entity and event.cikkszam in (cikkszam, None)
+                and event.overlaps(start_date, end_date))
+
+    def on_event(event: Revalidation) -> None:
+        if matches(event):
+            loop.call_soon_threadsafe(resolve, event)
+
+    unsubscribe = subscribe(on_event)
+    if after is not None:
+        with _subscribers_lock:
+            missed = [e for e in _recent_revalidations if e.seq > after and matches(e)]
+        if missed:
+            resolve(missed[0])
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        unsubscribe()
+
+
+async def _revalidate(entity: str, start_date: str, end_date: str, cikkszam: str | None,
+                      fetch: Callable[[str, str], Coroutine[Any, Any, pd.DataFrame]]) -> bool:
+    """Fetch a range again, store it and notify subscribers if it changed."""
+    key = (entity, cikkszam)
+    start, end = _day(start_date), _day(end_date)
+    try:
+        df = await fetch(start_date, end_date)
+    except Exception:
+        _REVALIDATIONS.inc(entity=entity, result="failed")
+        logger.exception("Revalidation of %s %s..%s failed", entity, start_date, end_date)
+        return False
+    if df is None or df.empty:
+        return False
+
+    cache = _get_range_cache()
+    before, gaps = cache.lookup(key, start, end)
+    cache.store(key, start, end, df, df.attrs.get(_SYNCED_AT))
+    after, _ = cache.lookup(key, start, end)
+    if before is not None and not gaps and after is not None and before.equals(after):
+        _REVALIDATIONS.inc(entity=entity, result="unchanged")
+        return False
+    _REVALIDATIONS.inc(entity=entity, result="changed")
+    _notify(Revalidation(entity, start_date, end_date, cikkszam))
+    return True
+
+
+def _revalidate_background(entity: str, start_date: str, end_date: str, cikkszam: str | None,
+                           fetch: Callable[[str, str], Coroutine[Any, Any, pd.DataFrame]]) -> None:
+    """Start ``_revalidate`` on the running loop unless the range is already in flight."""
+    flight = (entity, start_date, end_date, cikkszam)
+    with _revalidating_lock:
+        if flight in _revalidating:
+            return
+        _revalidating.add(flight)
+
+    def done(task: asyncio.Task) -> None:
+        _revalidation_tasks.discard(task)
+        with _revalidating_lock:
+            _revalidating.discard(flight)
+
+    task = asyncio.get_running_loop().create_task(
+        detached(_revalidate(entity, start_date, end_date, cikkszam, fetch))
+    )
+    _revalidation_tasks.add(task)
+    task.add_done_callback(done)
+
+
+async def _merge_delta(entity: str, start_date: str, end_date: str,
+                       cikkszam: str | None) -> bool | None:
+    """Merge the rows synced since a cached range was read into the range cache.
+
+    Each cached part of the range is asked only for rows synced after its
+    watermark less ``_DELTA_OVERLAP``; rows already cached are skipped by
+    id. Returns whether any rows were added, or None when the range is not
+    fully cached with watermarks (e.g. it came from SOAP) and has to be
+    re-read instead.
+    """
+    cache = _get_range_cache()
+    key = (entity, cikkszam)
+    parts = cache.watermarks(key, _day(start_date), _day(end_date))
+    if not parts or any(w is None for _, _, w in parts):
+        return None
+    deltas = await asyncio.gather(*(
+        _supabase_read_delta(entity, a.strftime("%Y.%m.%d"), b.strftime("%Y.%m.%d"), cikkszam,
+                             (pd.Timestamp(w) - _DELTA_OVERLAP).isoformat())
+        for a, b, w in parts
+    ))
+    added = 0
+    for (a, b, w), df in zip(parts, deltas):
+        newest = df.attrs.get(_SYNCED_AT)
+        watermark = newest if newest and pd.Timestamp(newest) > pd.Timestamp(w) else w
+        merged = cache.merge(key, a, b, df, watermark)
+        if merged is None:
+            return None  # expired or evicted meanwhile
+        added += merged
+    _DELTA_ROWS.inc(added, entity=entity)
+    return added > 0
+
+
+async def _revalidate_synced(entity: str, start_date: str, end_date: str, cikkszam: str | None,
+                             fetch: Callable[[str, str], Coroutine[Any, Any, pd.DataFrame]]) -> bool:
+    """Bring a range up to date after a sync, merging only the new rows if possible.
+
+    Falls back to ``_revalidate`` (a full re-read with *fetch*) when the
+    range cannot be merged into. Returns whether the cached rows changed.
+    """
+    if _use_supabase():
+        try:
+            merged = await _merge_delta(entity, start_date, end_date, cikkszam)
+        except Exception:
+            logger.warning("Delta read of %s %s..%s failed, re-reading",
+                           entity, start_date, end_date, exc_info=True)
+            merged = None
+        if merged is not None:
+            _REVALIDATIONS.inc(entity=entity, result="changed" if merged else "unchanged")
+            if merged:
+                _notify(Revalidation(entity, start_date, end_date, cikkszam))
+            return merged
+    return await _revalidate(entity, start_date, end_date, cikkszam, fetch)
+
+
+async def arevalidate(entity: str, start_date: str, end_date: str,
+                      cikkszam: str | None = None) -> bool:
+    """Bring a sales or movements range in the range cache up to date.
+
+    A range read from Supabase only fetches the rows synced since; anything
+    else is re-read past the range cache. Subscribers are notified if the
+    rows changed; returns whether they did.
+    """
+    _validate_date_range(start_date, end_date)
+    cikkszam = _sanitize_sku(cikkszam)
+    fetch = _RANGE_FETCHERS[entity]
+    return await _revalidate_synced(entity, start_date, end_date, cikkszam,
+                                    lambda s, e: fetch(s, e, cikkszam, 200, False))
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
-def get_sales(start_date: str, end_date: str, cikkszam: str | None = None,
-              limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
+@traced("get_sales")
+async def aget_sales(start_date: str, end_date: str, cikkszam: str | None = None,
+                     limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
     """
     Fetch outgoing invoice line items (kimeno_szamla).
-    Reads from Supabase first (fast), falls back to direct SOAP if unavailable.
+    Served from the in-memory range cache where it covers the range; the
+    rest is read from Supabase first (fast), falling back to direct SOAP.
 
     Args:
         start_date:    'YYYY.MM.DD'
@@ -558,71 +1420,88 @@ def get_sales(start_date: str, end_date: str, cikkszam: str | None = None,
     """
     _validate_date_range(start_date, end_date)
     cikkszam = _sanitize_sku(cikkszam)
+    return await _cached_range(
+        "kimeno_szamla", start_date, end_date, cikkszam,
+        lambda start, end, check_fresh=True: _fetch_sales(
+            start, end, cikkszam, limit, force_refresh, check_fresh
+        ),
+        force_refresh,
+    )
 
+
+async def _fetch_sales(start_date: str, end_date: str, cikkszam: str | None,
+                       limit: int, force_refresh: bool, check_fresh: bool = True) -> pd.DataFrame:
     # Try Supabase first (unless force_refresh is set)
-    if _USE_SUPABASE and not force_refresh:
-        df = _supabase_get_sales(start_date, end_date, cikkszam)
+    if _use_supabase() and not force_refresh:
+        df = await _supabase_get_sales(start_date, end_date, cikkszam, check_fresh)
         if df is not None and not df.empty:
             return df
 
     # If force_refresh with Supabase, trigger sync then read
-    if _USE_SUPABASE and force_refresh:
+    if _use_supabase() and force_refresh:
         _trigger_sync_background("kimeno_szamla", {
             "start_date": start_date, "end_date": end_date, "cikkszam": cikkszam
         })
         # Still try to read current data from Supabase
-        df = _supabase_get_sales(start_date, end_date, cikkszam)
+        df = await _supabase_get_sales(start_date, end_date, cikkszam)
         if df is not None and not df.empty:
             return df
 
     # Fallback: direct SOAP call
-    cache_file = _cache_path("kimeno_szamla", start_date, end_date, cikkszam)
+    cache_file = await asyncio.to_thread(_cache_path, "kimeno_szamla", start_date, end_date, cikkszam)
 
-    if not force_refresh and _cache_is_fresh(cache_file):
-        cached = _load_cache(cache_file)
+    if not force_refresh:
+        cached = await asyncio.to_thread(
+            _load_fresh_cache, "kimeno_szamla", start_date, end_date, cikkszam
+        )
         if cached is not None:
             return cached
+        if _get_config().stale_while_revalidate:
+            stale = await asyncio.to_thread(_load_cache, cache_file)
+            if stale is not None:
+                CACHE_LOOKUPS.inc(cache="disk", result="stale")
+                _revalidate_background(
+                    "kimeno_szamla", start_date, end_date, cikkszam,
+                    lambda s, e: _fetch_sales(s, e, cikkszam, limit, force_refresh=True),
+                )
+                return stale
 
     try:
-        all_records: list[dict] = []
-        page = 0
-        while True:
-            leker_xml = _build_leker(start_date, end_date, cikkszam, page, limit)
-            raw = _post_soap("kimeno_szamla", leker_xml)
-            valasz = _extract_valasz(raw)
-            if not valasz:
-                break
-            raw_elem_count = len(re.findall(r"<elem>", valasz))
-            page_records = _parse_tetelek(valasz, cikkszam_filter=cikkszam)
-            all_records.extend(page_records)
-            if raw_elem_count < limit:
-                break
-            page += 1
+        all_records = await _soap_range(
+            "kimeno_szamla", start_date, end_date,
+            lambda start, end, page: _build_leker(start, end, cikkszam, page, limit),
+            lambda valasz: _parse_tetelek(valasz, cikkszam_filter=cikkszam),
+            limit,
+        )
 
         if not all_records:
-            return pd.DataFrame(
-                columns=["kelt", "Cikkszám", "Mennyiség",
-                         "Nettó ár", "Bruttó ár", "Nettó érték", "Bruttó érték"]
-            )
+            return _empty_frame("sales_invoice_lines")
 
         df = pd.DataFrame(all_records)
-        df["kelt"] = pd.to_datetime(df["kelt"], format="%Y.%m.%d", errors="coerce")
-        _save_cache(df, cache_file)
+        with span("to_datetime") as sp:
+            sp.rows = len(df)
+            df["kelt"] = pd.to_datetime(df["kelt"], format="%Y.%m.%d", errors="coerce")
+        await asyncio.to_thread(_save_cache, df, cache_file)
         return df
 
     except Exception:
         logger.exception("SOAP sales fetch failed (start=%s, end=%s)", start_date, end_date)
-        stale = _load_cache(cache_file)
+        stale = await asyncio.to_thread(_load_cache, cache_file)
         if stale is not None:
+            CACHE_LOOKUPS.inc(cache="disk", result="stale")
             logger.info("Serving stale cached sales data")
             return stale
-        return pd.DataFrame(
-            columns=["kelt", "Cikkszám", "Mennyiség",
-                     "Nettó ár", "Bruttó ár", "Nettó érték", "Bruttó érték"]
-        )
+        return _empty_frame("sales_invoice_lines")
 
 
-def get_inventory(cikkszam: str | None = None, limit: int = 200) -> pd.DataFrame:
+def get_sales(start_date: str, end_date: str, cikkszam: str | None = None,
+              limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
+    """Blocking form of ``aget_sales``."""
+    return _run(aget_sales(start_date, end_date, cikkszam, limit, force_refresh))
+
+
+@traced("get_inventory")
+async def aget_inventory(cikkszam: str | None = None, limit: int = 200) -> pd.DataFrame:
     """
     Fetch current inventory levels (keszlet).
     Reads from Supabase first, falls back to direct SOAP.
@@ -634,31 +1513,21 @@ def get_inventory(cikkszam: str | None = None, limit: int = 200) -> pd.DataFrame
     cikkszam = _sanitize_sku(cikkszam)
 
     # Try Supabase first
-    if _USE_SUPABASE:
-        df = _supabase_get_inventory(cikkszam)
+    if _use_supabase():
+        df = await _supabase_get_inventory(cikkszam)
         if df is not None:
             return df
 
     # Fallback: direct SOAP call
-    _empty_inv = pd.DataFrame(
-        columns=["Cikkszám", "Készlet",
-                 "Raktár 1", "Raktár 2", "Raktár 3",
-                 "Raktár 4", "Raktár 5", "Raktár 6"]
-    )
+    _empty_inv = _empty_frame("inventory_snapshot")
     try:
-        all_records: list[dict] = []
-        page = 0
-        while True:
-            leker_xml = _build_keszlet_leker(cikkszam, page, limit)
-            raw = _post_soap("keszlet", leker_xml)
-            valasz = _extract_valasz(raw)
-            if not valasz:
-                break
-            page_records = _parse_keszlet(valasz)
-            all_records.extend(page_records)
-            if len(page_records) < limit:
-                break
-            page += 1
+        all_records = await _soap_pages(
+            "keszlet",
+            lambda page: _build_keszlet_leker(cikkszam, page, limit),
+            _parse_keszlet,
+            limit,
+            count_raw_elems=False,
+        )
 
         if not all_records:
             return _empty_inv
@@ -669,11 +1538,18 @@ def get_inventory(cikkszam: str | None = None, limit: int = 200) -> pd.DataFrame
         return _empty_inv
 
 
-def get_stock_movements(start_date: str, end_date: str, cikkszam: str | None = None,
-                        limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
+def get_inventory(cikkszam: str | None = None, limit: int = 200) -> pd.DataFrame:
+    """Blocking form of ``aget_inventory``."""
+    return _run(aget_inventory(cikkszam, limit))
+
+
+@traced("get_stock_movements")
+async def aget_stock_movements(start_date: str, end_date: str, cikkszam: str | None = None,
+                               limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
     """
     Fetch warehouse movement history (raktari_mozgas).
-    Reads from Supabase first, falls back to direct SOAP.
+    Served from the in-memory range cache where it covers the range; the
+    rest is read from Supabase first, falling back to direct SOAP.
 
     Returns:
         DataFrame with columns:
@@ -682,70 +1558,93 @@ def get_stock_movements(start_date: str, end_date: str, cikkszam: str | None = N
     """
     _validate_date_range(start_date, end_date)
     cikkszam = _sanitize_sku(cikkszam)
+    return await _cached_range(
+        "raktari_mozgas", start_date, end_date, cikkszam,
+        lambda start, end, check_fresh=True: _fetch_movements(
+            start, end, cikkszam, limit, force_refresh, check_fresh
+        ),
+        force_refresh,
+    )
+
 
+async def _fetch_movements(start_date: str, end_date: str, cikkszam: str | None,
+                           limit: int, force_refresh: bool, check_fresh: bool = True) -> pd.DataFrame:
     # Try Supabase first
-    if _USE_SUPABASE and not force_refresh:
-        df = _supabase_get_movements(start_date, end_date, cikkszam)
+    if _use_supabase() and not force_refresh:
+        df = await _supabase_get_movements(start_date, end_date, cikkszam, check_fresh)
         if df is not None and not df.empty:
             return df
 
-    if _USE_SUPABASE and force_refresh:
+    if _use_supabase() and force_refresh:
         _trigger_sync_background("raktari_mozgas", {
             "start_date": start_date, "end_date": end_date, "cikkszam": cikkszam
         })
-        df = _supabase_get_movements(start_date, end_date, cikkszam)
+        df = await _supabase_get_movements(start_date, end_date, cikkszam)
         if df is not None and not df.empty:
             return df
 
     # Fallback: direct SOAP call
-    cache_file = _cache_path("raktari_mozgas", start_date, end_date, cikkszam)
+    cache_file = await asyncio.to_thread(_cache_path, "raktari_mozgas", start_date, end_date, cikkszam)
 
-    if not force_refresh and _cache_is_fresh(cache_file):
-        cached = _load_cache(cache_file)
+    if not force_refresh:
+        cached = await asyncio.to_thread(
+            _load_fresh_cache, "raktari_mozgas", start_date, end_date, cikkszam
+        )
         if cached is not None:
             return cached
+        if _get_config().stale_while_revalidate:
+            stale = await asyncio.to_thread(_load_cache, cache_file)
+            if stale is not None:
+                CACHE_LOOKUPS.inc(cache="disk", result="stale")
+                _revalidate_background(
+                    "raktari_mozgas", start_date, end_date, cikkszam,
+                    lambda s, e: _fetch_movements(s, e, cikkszam, limit, force_refresh=True),
+                )
+                return stale
 
     try:
-        all_records: list[dict] = []
-        page = 0
-        while True:
-            leker_xml = _build_mozgas_leker(start_date, end_date, cikkszam, page, limit)
-            raw = _post_soap("raktari_mozgas", leker_xml)
-            valasz = _extract_valasz(raw)
-            if not valasz:
-                break
-            raw_elem_count = len(re.findall(r"<elem>", valasz))
-            page_records = _parse_mozgas(valasz, cikkszam_filter=cikkszam)
-            all_records.extend(page_records)
-            if raw_elem_count < limit:
-                break
-            page += 1
+        all_records = await _soap_range(
+            "raktari_mozgas", start_date, end_date,
+            lambda start, end, page: _build_mozgas_leker(start, end, cikkszam, page, limit),
+            lambda valasz: _parse_mozgas(valasz, cikkszam_filter=cikkszam),
+            limit,
+        )
 
         if not all_records:
-            return pd.DataFrame(
-                columns=["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség"]
-            )
+            return _empty_frame("warehouse_movements")
 
         df = pd.DataFrame(all_records)
-        df["kelt"] = pd.to_datetime(df["kelt"], format="%Y.%m.%d", errors="coerce")
-        _save_cache(df, cache_file)
+        with span("to_datetime") as sp:
+            sp.rows = len(df)
+            df["kelt"] = pd.to_datetime(df["kelt"], format="%Y.%m.%d", errors="coerce")
+        await asyncio.to_thread(_save_cache, df, cache_file)
         return df
 
     except Exception:
         logger.exception("SOAP movements fetch failed (start=%s, end=%s)", start_date, end_date)
-        stale = _load_cache(cache_file)
+        stale = await asyncio.to_thread(_load_cache, cache_file)
         if stale is not None:
+            CACHE_LOOKUPS.inc(cache="disk", result="stale")
             logger.info("Serving stale cached movements data")
             return stale
-        return pd.DataFrame(
-            columns=["kelt", "Cikkszám", "Irány", "Mozgástípus", "Mennyiség"]
-        )
+        return _empty_frame("warehouse_movements")
+
+
+def get_stock_movements(start_date: str, end_date: str, cikkszam: str | None = None,
+                        limit: int = 200, force_refresh: bool = False) -> pd.DataFrame:
+    """Blocking form of ``aget_stock_movements``."""
+    return _run(aget_stock_movements(start_date, end_date, cikkszam, limit, force_refresh))
+
+
+# Fetchers behind the range cache, by entity (see arevalidate)
+_RANGE_FETCHERS = {"kimeno_szamla": _fetch_sales, "raktari_mozgas": _fetch_movements}
 
 
 _TENANT_UUID = "dd98e7b4-65df-43a4-bfd0-4f903a8c2f46"  # samansport
 
 
-def get_inventory_monitor(
+@traced("get_inventory_monitor")
+async def aget_inventory_monitor(
     lookback_years: int = 2,
     top_n: int = 100,
     lead_time: int = 3,
@@ -758,13 +1657,12 @@ def get_inventory_monitor(
     and service_level directly (handles z-score mapping internally).
     Column names in the response are prefixed with ``out_`` — we strip that.
     """
-    sb = _get_supabase()
-    if sb is None:
+    if not _use_supabase():
         logger.warning("Supabase not available for inventory monitor")
         return []
 
     try:
-        result = sb.rpc(
+        rows = await _supabase_rpc(
             "compute_inventory_monitor",
             {
                 "p_tenant_id": _TENANT_UUID,
@@ -773,8 +1671,7 @@ def get_inventory_monitor(
                 "p_service_level": service_level,
                 "p_lead_time_months": lead_time,
             },
-        ).execute()
-        rows = result.data or []
+        ) or []
         # Strip "out_" prefix from column names to match UI expectations
         return [
             {k.removeprefix("out_"): v for k, v in row.items()}
@@ -785,9 +1682,46 @@ def get_inventory_monitor(
         return []
 
 
+def get_inventory_monitor(
+    lookback_years: int = 2,
+    top_n: int = 100,
+    lead_time: int = 3,
+    service_level: float = 0.95,
+    tenant_id: str = "samansport",
+) -> list[dict]:
+    """Blocking form of ``aget_inventory_monitor``."""
+    return _run(aget_inventory_monitor(lookback_years, top_n, lead_time, service_level, tenant_id))
+
+
+@traced("get_products")
+async def aget_products() -> pd.DataFrame | None:
+    """Fetch the product master (cikk) from Supabase.
+
+    Returns:
+        DataFrame with columns Cikkszám (str), Cikknév (str), or None when
+        Supabase is not configured, unreachable, or the table is empty.
+    """
+    if not _use_supabase():
+        return None
+    try:
+        rows = await _supabase_select_all("products", _schema_select("products"))
+        if not rows:
+            return None
+        return _decode_rows("products", rows)
+    except Exception:
+        logger.exception("Supabase products read failed")
+        return None
+
+
+def get_products() -> pd.DataFrame | None:
+    """Blocking form of ``aget_products``."""
+    return _run(aget_products())
+
+
+@traced()
 def get_last_sync_time() -> str | None:
     """Return the most recent last_synced_at from sync_metadata, or None."""
-    if not _USE_SUPABASE:
+    if not _use_supabase():
         return None
     try:
         sb = _get_supabase()
@@ -807,9 +1741,10 @@ def get_last_sync_time() -> str | None:
     return None
 
 
+@traced()
 def check_connection() -> dict[str, Any]:
     """Test Supabase connectivity. Returns {'ok': bool, 'mode': str, 'detail': str}."""
-    if not _USE_SUPABASE:
+    if not _use_supabase():
         return {"ok": True, "mode": "SOAP", "detail": "Közvetlen SOAP mód (Supabase nincs konfigurálva)"}
     try:
         sb = _get_supabase()
@@ -826,53 +1761,86 @@ def check_connection() -> dict[str, Any]:
 # ── Disk cache (Parquet) — used as SOAP fallback only ─────────────────────
 
 _CACHE_DIR = Path(__file__).parent / ".cache"
+_CACHE_SWEEP_INTERVAL_SECONDS = 60 * 60
+
+_disk_cache: DiskCache | None = None
+_disk_cache_lock = threading.Lock()
+
+# Read at scrape time; an untouched cache reports 0 rather than being opened
+metrics.gauge("tharanis_disk_cache_bytes", "Size of the SOAP fallback disk cache").set_function(
+    lambda: _disk_cache.stats().bytes if _disk_cache else 0
+)
+metrics.gauge("tharanis_disk_cache_entries", "Entries in the SOAP fallback disk cache").set_function(
+    lambda: _disk_cache.stats().entries if _disk_cache else 0
+)
+
+
+def _get_disk_cache() -> DiskCache:
+    """Lazy-init the disk cache and start its janitor thread."""
+    global _disk_cache
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                cfg = _get_config()
+                cache = DiskCache(
+                    _CACHE_DIR, max_bytes=cfg.cache_max_bytes, max_age_days=7, fmt=cfg.cache_format
+                )
+                cache.start_janitor(_CACHE_SWEEP_INTERVAL_SECONDS)
+                _disk_cache = cache
+    return _disk_cache
+
+
+async def ainit_disk_cache() -> None:
+    """Open the disk cache and scan its index in a worker thread.
+
+    Registered as a Reflex lifespan task, so the first request does not pay
+    for the config load, directory scan and janitor start on the event loop.
+    """
+    await asyncio.to_thread(lambda: _get_disk_cache().stats())
 
 
 def _cache_path(entity: str, start_date: str, end_date: str,
                 cikkszam: str | None) -> Path:
     raw = f"{entity}|{start_date}|{end_date}|{cikkszam or 'ALL'}"
     key = hashlib.md5(raw.encode()).hexdigest()
-    return _CACHE_DIR / f"{entity}_{key}.parquet"
+    return _get_disk_cache().path(f"{entity}_{key}")
 
 
 def _cache_is_fresh(path: Path, max_age_hours: float = 24.0) -> bool:
-    if not path.exists():
-        return False
-    age = datetime.now(timezone.utc) - datetime.fromtimestamp(
-        path.stat().st_mtime, tz=timezone.utc
-    )
-    return age.total_seconds() < max_age_hours * 3600
+    age = _get_disk_cache().age_seconds(path)
+    return age is not None and age < max_age_hours * 3600
 
 
+@traced("cache.save")
 def _save_cache(df: pd.DataFrame, path: Path) -> None:
-    try:
-        path.parent.mkdir(exist_ok=True)
-        df.to_parquet(path, index=False)
-    except Exception:
-        logger.warning("Failed to save cache to %s", path, exc_info=True)
+    _get_disk_cache().save(df, path)
 
 
-def _load_cache(path: Path) -> pd.DataFrame | None:
-    try:
-        return pd.read_parquet(path)
-    except Exception:
-        with contextlib.suppress(OSError):
-            path.unlink()
-        return None
+@traced("cache.load")
+def _load_cache(path: Path, where: RowFilter | None = None) -> pd.DataFrame | None:
+    return _get_disk_cache().load(path, where=where)
 
 
-def _cleanup_stale_cache(max_age_days: int = 7) -> None:
-    if not _CACHE_DIR.exists():
-        return
-    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
-    for f in _CACHE_DIR.glob("*.parquet"):
-        mtime = datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
-            with contextlib.suppress(OSError):
-                f.unlink()
+def _load_fresh_cache(entity: str, start_date: str, end_date: str,
+                      cikkszam: str | None) -> pd.DataFrame | None:
+    """Fresh cached rows for a query, or None.
+
+    Falls back from the exact entry to the all-products entry for the same
+    range, filtered to *cikkszam* on load (pushed down into the file read).
+    """
+    cache_file = _cache_path(entity, start_date, end_date, cikkszam)
+    cached = _load_cache(cache_file) if _cache_is_fresh(cache_file) else None
+    if cached is None and cikkszam:
+        all_file = _cache_path(entity, start_date, end_date, None)
+        if _cache_is_fresh(all_file):
+            cached = _load_cache(all_file, RowFilter(cikkszam=cikkszam))
+    CACHE_LOOKUPS.inc(cache="disk", result="miss" if cached is None else "hit")
+    return cached
 
 
-_cleanup_stale_cache()
+def cache_stats() -> CacheStats:
+    """Hit/miss counters and current size of the SOAP fallback disk cache."""
+    return _get_disk_cache().stats()
 
 
 # ── Quick connection test ────────────────────────────────────────────────────
@@ -882,7 +1850,7 @@ if __name__ == "__main__":
 
     print("=" * 60)
     print("Tharanis V3 API -- connection test")
-    print(f"Supabase mode: {'ON' if _USE_SUPABASE else 'OFF (direct SOAP)'}")
+    print(f"Supabase mode: {'ON' if _use_supabase() else 'OFF (direct SOAP)'}")
     print("=" * 60)
 
     today = datetime.now()
@@ -5,8 +5,6 @@ Color palette, SVG icon library, sidebar navigation styles,
 Plotly layout defaults, Hungarian number formatting, and global CSS.
 """
 
-import streamlit as st
-
 # ── Color palette ─────────────────────────────────────────────────────────────
 C = {
     "blue":   "#4E5BA6",
@@ -164,6 +162,8 @@ def hu_thousands(n: float | int, decimals: int = 0) -> str:
 # ── Global CSS injection ─────────────────────────────────────────────────────
 
 def inject_css() -> None:
+    import streamlit as st  # only the Streamlit UI calls this; keep theme import-light
+
     _sb_w = SIDEBAR_WIDTH
     st.markdown(f"""
 <style>
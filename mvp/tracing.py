@@ -0,0 +1,288 @@
+"""
+Lightweight in-process span tracing.
+
+A span times one stage of a request and carries optional row and byte
+counts. Spans opened while another is active become its children, so a
+public call such as ``tharanis_client.get_sales`` is recorded as a tree
+(Supabase paging, freshness check, SOAP round-trips, parsing, cache I/O…).
+
+Disabled by default. Set ``THARANIS_TRACE=1`` in the environment or
+``.env`` (read on first use, like the client configuration) or call
+``enable()``; while disabled, ``span`` returns a shared no-op object and
+``traced`` wrappers just call through, so instrumented code pays one
+function call per stage.
+
+When enabled:
+
+- the last ``MAX_RECENT`` root spans (with their children) are kept for
+  ``recent()``;
+- every span name has a duration histogram, summarized by ``stage_stats()``;
+- each finished span is logged as one JSON line on the ``tracing`` logger.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable
+from typing import Any, TypeVar
+
+import pandas as pd
+
+logger = logging.getLogger("tracing")
+
+_T = TypeVar("_T")
+
+MAX_RECENT = 100
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# None until the first span asks; then THARANIS_TRACE decides unless enable() ran first
+_enabled: bool | None = None
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("tracing_span", default=None)
+_trace_ids = itertools.count(1)
+
+_lock = threading.Lock()
+_recent: deque[Span] = deque(maxlen=MAX_RECENT)
+_histograms: dict[str, Histogram] = {}
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def is_enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _enabled = os.getenv("THARANIS_TRACE", "").strip().lower() not in ("", "0", "false", "no")
+    return _enabled
+
+
+# ── Histogram ────────────────────────────────────────────────────────────────
+
+
+class Histogram:
+    """Fixed-bucket duration histogram (milliseconds)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the *q* quantile (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max, 3),
+            "buckets": dict(zip([*map(str, BUCKETS_MS), "inf"], self.counts)),
+        }
+
+
+# ── Spans ────────────────────────────────────────────────────────────────────
+
+
+class Span:
+    """One timed stage. Set ``rows`` / ``bytes`` (or ``attrs``) while it is open."""
+
+    __slots__ = ("name", "attrs", "rows", "bytes", "error", "trace_id", "parent",
+                 "children", "start", "duration_ms", "_token")
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.rows: int | None = None
+        self.bytes: int | None = None
+        self.error: str | None = None
+        self.children: list[Span] = []
+        self.duration_ms = 0.0
+
+    def __enter__(self) -> Span:
+        self.parent = _current.get()
+        self.trace_id = self.parent.trace_id if self.parent else next(_trace_ids)
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _finish(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"span": self.name, "ms": round(self.duration_ms, 3)}
+        if self.rows is not None:
+            out["rows"] = self.rows
+        if self.bytes is not None:
+            out["bytes"] = self.bytes
+        if self.error:
+            out["error"] = self.error
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict() for c in self.children]
+        return out
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled; attribute writes are dropped."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    """Context manager timing stage *name*; extra keyword args are recorded as attributes."""
+    if not is_enabled():
+        return _NOOP
+    return Span(name, attrs)
+
+
+async def detached(coro: Awaitable[_T]) -> _T:
+    """Await *coro* outside the caller's span tree.
+
+    Wrap background tasks in it (``create_task(detached(...))``): a task
+    copies the context it was created in, so its spans would otherwise
+    become children of a request span that has usually finished by then.
+    The task's own context is changed, not the caller's.
+    """
+    _current.set(None)
+    return await coro
+
+
+def _finish(sp: Span) -> None:
+    with _lock:
+        hist = _histograms.get(sp.name)
+        if hist is None:
+            hist = _histograms[sp.name] = Histogram()
+        hist.observe(sp.duration_ms)
+        if sp.parent is not None:
+            sp.parent.children.append(sp)
+        else:
+            _recent.append(sp)
+    if logger.isEnabledFor(logging.INFO):
+        record = {"trace": sp.trace_id, "parent": sp.parent.name if sp.parent else None}
+        record.update(sp.to_dict())
+        record.pop("children", None)
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def _measure(sp: Span, result: Any) -> None:
+    """Fill rows/bytes from a stage's return value when the stage did not."""
+    if isinstance(result, pd.DataFrame):
+        if sp.rows is None:
+            sp.rows = len(result)
+        if sp.bytes is None:
+            sp.bytes = int(result.memory_usage(index=False).sum())
+    elif isinstance(result, (list, tuple)):
+        if sp.rows is None:
+            sp.rows = len(result)
+    elif isinstance(result, (str, bytes)) and sp.bytes is None:
+        sp.bytes = len(result)
+
+
+def traced(name: str | None = None):
+    """Decorator: run the function inside ``span(name)`` (default: its ``__name__``).
+
+    Works on plain and ``async`` functions. Row and byte counts are taken
+    from the return value — DataFrame rows and memory, list length, or
+    string length.
+    """
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not is_enabled():
+                    return await fn(*args, **kwargs)
+                with Span(span_name, {}) as sp:
+                    result = await fn(*args, **kwargs)
+                    _measure(sp, result)
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+            with Span(span_name, {}) as sp:
+                result = fn(*args, **kwargs)
+                _measure(sp, result)
+                return result
+
+        return wrapper
+    return decorate
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+
+
+def recent(n: int = 20) -> list[dict[str, Any]]:
+    """The last *n* root spans, newest first, as nested dicts."""
+    with _lock:
+        roots = list(_recent)[-n:]
+    return [sp.to_dict() | {"trace": sp.trace_id} for sp in reversed(roots)]
+
+
+def stage_stats() -> dict[str, dict[str, Any]]:
+    """Per-span-name duration summary: count, mean, p50/p95 (bucket bounds), max."""
+    with _lock:
+        return {name: hist.summary() for name, hist in sorted(_histograms.items())}
+
+
+def reset() -> None:
+    """Forget recorded spans and histograms."""
+    with _lock:
+        _recent.clear()
+        _histograms.clear()
@@ -0,0 +1,234 @@
+"""
+Cache warm-up for the date-picker presets and dashboard periods.
+
+Without it, the first user after a deploy, and the first after cron-refresh
+has synced new data, pays the full cold load for every preset. ``warm()``
+does that work ahead of time:
+
+- loads sales and stock movements for every preset in
+  ``data_helpers.preset_ranges`` into tharanis_client's in-memory range
+  cache;
+- precomputes the dashboard summary (``kpi.summarize_sales``) for each
+  preset and every dashboard period.
+
+The widest ranges ("Idén", "Tavaly") are fetched first, so the narrower
+presets are sliced from them instead of fetched again. At most
+``concurrency`` loads or summaries run at once, and the time taken is
+logged and recorded in ``samansport_warmup_seconds``.
+
+``run_forever`` is registered as a Reflex lifespan task. It warms once at
+backend start, then polls ``sync_metadata`` and warms again whenever the
+newest ``last_synced_at`` changes. Post-sync warm-ups go through
+``tharanis_client.arevalidate``, which merges only the newly synced rows
+into the cached ranges, so pages showing an affected range are notified
+and update in place.
+
+Summaries are dropped when a revalidation brings fresher sales for their
+range, and recomputed from the merged rows by the next warm-up or page
+load; the others are kept.
+
+``SAMANSPORT_WARMUP=0`` disables it; ``SAMANSPORT_WARMUP_CONCURRENCY``
+sets the concurrency (default 2). Both are read from the environment or
+``.env`` when the task starts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+import metrics
+import tharanis_client as api
+from config import DASHBOARD_PERIODS
+from data_helpers import find_sku_col, preset_ranges
+from kpi import SalesSummary, summarize_sales
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL_SECONDS = 60
+_SUMMARY_TTL_SECONDS = 15 * 60
+_SUMMARY_MAX_ENTRIES = 256
+
+_WARMUP_SECONDS = metrics.histogram(
+    "samansport_warmup_seconds", "Cache warm-up duration", ("reason",),
+    buckets=(1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+_SUMMARY_LOOKUPS = metrics.counter(
+    "samansport_summary_cache_lookups_total", "Dashboard summary cache lookups", ("result",)
+)
+
+
+# ── Dashboard summaries ──────────────────────────────────────────────────────
+
+_summaries: dict[tuple[str, str, str], tuple[float, SalesSummary]] = {}
+_summaries_lock = threading.Lock()
+
+
+def sales_summary(df: pd.DataFrame, start_date: str, end_date: str, period: str) -> SalesSummary:
+    """Dashboard summary of *df*, the sales for ``[start_date, end_date]``.
+
+    Reuses a summary computed (or warmed) for the same range and period
+    within the last ``_SUMMARY_TTL_SECONDS``.
+    """
+    key = (start_date, end_date, period)
+    now = time.monotonic()
+    with _summaries_lock:
+        entry = _summaries.get(key)
+    if entry is not None and now - entry[0] < _SUMMARY_TTL_SECONDS:
+        _SUMMARY_LOOKUPS.inc(result="hit")
+        return entry[1]
+    _SUMMARY_LOOKUPS.inc(result="miss")
+    summary = summarize_sales(df, period, top_n=10, sku_col=find_sku_col(df))
+    with _summaries_lock:
+        _summaries.pop(key, None)
+        _summaries[key] = (now, summary)
+        while len(_summaries) > _SUMMARY_MAX_ENTRIES:
+            del _summaries[next(iter(_summaries))]
+    return summary
+
+
+def clear_summaries() -> None:
+    with _summaries_lock:
+        _summaries.clear()
+
+
+def _on_revalidated(event: api.Revalidation) -> None:
+    """Drop the summaries of ranges that just got fresher all-products sales."""
+    if event.entity != "kimeno_szamla" or event.cikkszam is not None:
+        return
+    with _summaries_lock:
+        for key in [k for k in _summaries if event.overlaps(k[0], k[1])]:
+            del _summaries[key]
+
+
+api.subscribe(_on_revalidated)
+
+
+# ── Warm-up ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class WarmupReport:
+    """What one warm-up did and how long it took."""
+
+    seconds: float = 0.0
+    ranges: int = 0
+    summaries: int = 0
+    failures: int = 0
+
+
+def _fmt(d: date) -> str:
+    return d.strftime("%Y.%m.%d")
+
+
+def _covering(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """The ranges not contained in another one of *ranges*."""
+    return [
+        r for r in ranges
+        if not any(o != r and o[0] <= r[0] and r[1] <= o[1] for o in ranges)
+    ]
+
+
+async def warm(today: date | None = None, concurrency: int = 2,
+               reason: str = "manual", revalidate: bool = False) -> WarmupReport:
+    """Load every preset range and precompute its dashboard summaries.
+
+    With *revalidate*, the widest ranges are re-read past the range cache
+    and subscribers are notified (see ``tharanis_client.arevalidate``).
+    """
+    report = WarmupReport()
+    t0 = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(fn: Callable[[], Awaitable]) -> object | None:
+        async with semaphore:
+            try:
+                return await fn()
+            except Exception:
+                logger.exception("Warm-up step failed")
+                report.failures += 1
+                return None
+
+    ranges = sorted(
+        set(preset_ranges(today or date.today()).values()),
+        key=lambda r: r[0] - r[1],  # widest first
+    )
+
+    # Fetch the covering ranges; the narrower presets are slices of them
+    if revalidate:
+        loads = (
+            lambda s, e: api.arevalidate("kimeno_szamla", s, e),
+            lambda s, e: api.arevalidate("raktari_mozgas", s, e),
+        )
+    else:
+        loads = (api.aget_sales, api.aget_stock_movements)
+    wide = _covering(ranges)
+    await asyncio.gather(*(
+        bounded(lambda s=s, e=e, load=load: load(_fmt(s), _fmt(e)))
+        for s, e in wide
+        for load in loads
+    ))
+    report.ranges = len(ranges)
+
+    async def summarize(start: date, end: date) -> None:
+        df = await bounded(lambda: api.aget_sales(_fmt(start), _fmt(end)))
+        if df is None or df.empty:
+            return
+        done = await asyncio.gather(*(
+            bounded(lambda p=p: asyncio.to_thread(sales_summary, df, _fmt(start), _fmt(end), p))
+            for p in DASHBOARD_PERIODS
+        ))
+        report.summaries += sum(s is not None for s in done)
+
+    await asyncio.gather(*(summarize(s, e) for s, e in ranges))
+
+    report.seconds = time.perf_counter() - t0
+    _WARMUP_SECONDS.observe(report.seconds, reason=reason)
+    logger.info(
+        "Cache warm-up (%s) took %.1fs: %d ranges, %d summaries, %d failures",
+        reason, report.seconds, report.ranges, report.summaries, report.failures,
+    )
+    return report
+
+
+async def refresh_if_synced(watermark: str | None, concurrency: int = 2) -> str | None:
+    """Bring the caches up to date if a sync finished since *watermark*.
+
+    Returns the newest ``last_synced_at`` (the next call's watermark).
+    """
+    latest = await asyncio.to_thread(api.get_last_sync_time)
+    if latest and latest != watermark:
+        await warm(concurrency=concurrency, reason="sync", revalidate=True)
+        return latest
+    return watermark
+
+
+def _env_concurrency(default: int = 2) -> int:
+    try:
+        return max(1, int(os.getenv("SAMANSPORT_WARMUP_CONCURRENCY", "") or default))
+    except ValueError:
+        return default
+
+
+async def run_forever(poll_interval: float = _POLL_INTERVAL_SECONDS) -> None:
+    """Warm at start, then after every completed sync (Reflex lifespan task)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    if os.getenv("SAMANSPORT_WARMUP", "1").strip() == "0":
+        return
+    concurrency = _env_concurrency()
+    watermark = await asyncio.to_thread(api.get_last_sync_time)
+    await warm(concurrency=concurrency, reason="start")
+    while True:
+        await asyncio.sleep(poll_interval)
+        try:
+            watermark = await refresh_if_synced(watermark, concurrency)
+        except Exception:
+            logger.exception("Post-sync warm-up failed")
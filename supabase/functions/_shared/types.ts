@@ -47,6 +47,7 @@ export interface SyncRequest {
     end_date?: string;
     cikkszam?: string;
   };
+  force?: boolean; // ignore stored page hashes and re-parse every page
 }
 
 export interface SyncMetadata {
@@ -60,9 +61,20 @@ export interface SyncMetadata {
   error_message: string | null;
   ttl_seconds: number;
   pages_fetched: number;
+  pages_skipped: number;
   records_synced: number;
 }
 
+export interface SyncPageHash {
+  id: number;
+  entity: string;
+  filter_hash: string;
+  page: number;
+  content_hash: string;
+  record_count: number;
+  updated_at: string;
+}
+
 export interface EntityConfig {
   entity: string;
   ttl_seconds: number;
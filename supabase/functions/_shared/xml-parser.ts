@@ -21,7 +21,7 @@ function tag(xml: string, tagName: string): string {
 }
 
 /** Compute SHA-256 hash of a string for deduplication. */
-async function hashString(input: string): Promise<string> {
+export async function hashString(input: string): Promise<string> {
   const data = new TextEncoder().encode(input);
   const hashBuffer = await crypto.subtle.digest("SHA-256", data);
   const hashArray = Array.from(new Uint8Array(hashBuffer));
@@ -4,13 +4,17 @@
  * Core sync orchestrator: checks freshness, claims debounce lock,
  * paginates through the Tharanis SOAP API, and upserts records into Supabase.
  *
- * Request body: { entity: string, filters?: { start_date?, end_date?, cikkszam? } }
+ * Each raw SOAP page is hashed and stored per (entity, filter, page) in
+ * sync_page_hashes. Pages whose hash is unchanged since the last sync are
+ * neither parsed nor upserted.
+ *
+ * Request body: { entity: string, filters?: { start_date?, end_date?, cikkszam? }, force?: boolean }
  */
 
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
 import { getSupabaseAdmin } from "../_shared/supabase-admin.ts";
 import { buildLekerXml, postSoap } from "../_shared/soap-client.ts";
-import { extractValasz, countElems, parseRecords } from "../_shared/xml-parser.ts";
+import { extractValasz, countElems, parseRecords, hashString } from "../_shared/xml-parser.ts";
 import { TABLES } from "../_shared/constants.ts";
 import type { SyncRequest } from "../_shared/types.ts";
 
@@ -28,6 +32,51 @@ async function computeFilterHash(entity: string, filters: Record<string, unknown
   return hashArray.map((b) => b.toString(16).padStart(2, "0")).join("");
 }
 
+/** Load the stored page hashes from the previous sync of this entity+filter. */
+async function loadPageHashes(
+  supabase: ReturnType<typeof getSupabaseAdmin>,
+  entity: string,
+  filterHash: string
+): Promise<Map<number, { content_hash: string; record_count: number }>> {
+  const { data, error } = await supabase
+    .from("sync_page_hashes")
+    .select("page, content_hash, record_count")
+    .eq("entity", entity)
+    .eq("filter_hash", filterHash);
+  if (error) throw new Error(`Page hash read error: ${error.message}`);
+
+  const hashes = new Map<number, { content_hash: string; record_count: number }>();
+  for (const row of data || []) {
+    hashes.set(row.page, { content_hash: row.content_hash, record_count: row.record_count });
+  }
+  return hashes;
+}
+
+/** Store the hash of a page that was just parsed and upserted. */
+async function savePageHash(
+  supabase: ReturnType<typeof getSupabaseAdmin>,
+  entity: string,
+  filterHash: string,
+  page: number,
+  contentHash: string,
+  recordCount: number
+): Promise<void> {
+  const { error } = await supabase
+    .from("sync_page_hashes")
+    .upsert(
+      {
+        entity,
+        filter_hash: filterHash,
+        page,
+        content_hash: contentHash,
+        record_count: recordCount,
+        updated_at: new Date().toISOString(),
+      },
+      { onConflict: "entity,filter_hash,page" }
+    );
+  if (error) throw new Error(`Page hash write error: ${error.message}`);
+}
+
 /** Upsert records into the appropriate Supabase table. */
 async function upsertRecords(
   supabase: ReturnType<typeof getSupabaseAdmin>,
@@ -85,7 +134,7 @@ serve(async (req: Request) => {
   }
 
   try {
-    const { entity, filters = {} } = (await req.json()) as SyncRequest;
+    const { entity, filters = {}, force = false } = (await req.json()) as SyncRequest;
 
     if (!entity) {
       return new Response(
@@ -134,9 +183,16 @@ serve(async (req: Request) => {
       );
     }
 
-    // 4. Paginate through SOAP API
+    // 4. Load page hashes from the previous sync (unless forced)
+    const previousHashes = force
+      ? new Map<number, { content_hash: string; record_count: number }>()
+      : await loadPageHashes(supabase, entity, filterHash);
+
+    // 5. Paginate through SOAP API
     let page = 0;
     let totalRecords = 0;
+    let upsertedRecords = 0;
+    let pagesSkipped = 0;
     let hasMore = true;
 
     while (hasMore) {
@@ -150,26 +206,56 @@ serve(async (req: Request) => {
       }
 
       const elemCount = countElems(valaszXml);
-      const records = await parseRecords(entity, valaszXml, filters?.cikkszam);
+      const contentHash = await hashString(valaszXml);
+      const previous = previousHashes.get(page);
+
+      if (previous && previous.content_hash === contentHash) {
+        // Unchanged since the last sync: skip parsing and upserting
+        totalRecords += previous.record_count;
+        pagesSkipped++;
+      } else {
+        const records = await parseRecords(entity, valaszXml, filters?.cikkszam);
 
-      // 5. Upsert into Supabase
-      await upsertRecords(supabase, entity, records as Array<Record<string, unknown>>);
+        // 6. Upsert into Supabase, then remember the page hash
+        await upsertRecords(supabase, entity, records as Array<Record<string, unknown>>);
+        await savePageHash(supabase, entity, filterHash, page, contentHash, records.length);
+
+        totalRecords += records.length;
+        upsertedRecords += records.length;
+      }
 
-      totalRecords += records.length;
       hasMore = elemCount >= pageSize;
       page++;
     }
 
-    // 6. Release lock with success
+    // Drop hashes of trailing pages that no longer exist
+    if ([...previousHashes.keys()].some((p) => p >= page)) {
+      await supabase
+        .from("sync_page_hashes")
+        .delete()
+        .eq("entity", entity)
+        .eq("filter_hash", filterHash)
+        .gte("page", page);
+    }
+
+    // 7. Release lock with success
     await supabase.rpc("release_sync_lock", {
       p_entity: entity,
       p_filter_hash: filterHash,
       p_records_synced: totalRecords,
       p_pages_fetched: page,
+      p_pages_skipped: pagesSkipped,
     });
 
     return new Response(
-      JSON.stringify({ status: "synced", records: totalRecords, pages: page }),
+      JSON.stringify({
+        status: "synced",
+        records: totalRecords,
+        records_upserted: upsertedRecords,
+        pages: page,
+        pages_skipped: pagesSkipped,
+        skip_ratio: page > 0 ? Math.round((pagesSkipped / page) * 1000) / 1000 : 0,
+      }),
       { headers: { ...CORS_HEADERS, "Content-Type": "application/json" } }
     );
   } catch (error) {
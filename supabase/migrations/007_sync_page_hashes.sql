@@ -0,0 +1,60 @@
+-- ============================================================
+-- SYNC PAGE HASHES — content-hash change detection per SOAP page
+-- sync-entity hashes each raw <valasz> page and skips parsing and
+-- upserting when the hash matches the one stored from the last sync.
+-- ============================================================
+CREATE TABLE IF NOT EXISTS sync_page_hashes (
+    id              BIGSERIAL PRIMARY KEY,
+    entity          TEXT NOT NULL,
+    filter_hash     TEXT NOT NULL,
+    page            INTEGER NOT NULL,
+    content_hash    TEXT NOT NULL,
+    record_count    INTEGER DEFAULT 0,
+    updated_at      TIMESTAMPTZ DEFAULT NOW(),
+
+    CONSTRAINT uq_sync_page UNIQUE (entity, filter_hash, page)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_page_entity_filter ON sync_page_hashes (entity, filter_hash);
+
+-- Skip counters from the most recent sync, reported next to pages_fetched
+ALTER TABLE sync_metadata ADD COLUMN IF NOT EXISTS pages_skipped INTEGER DEFAULT 0;
+
+-- ============================================================
+-- release_sync_lock: now also records pages_skipped
+-- ============================================================
+DROP FUNCTION IF EXISTS release_sync_lock(TEXT, TEXT, INTEGER, INTEGER, TEXT);
+
+CREATE OR REPLACE FUNCTION release_sync_lock(
+    p_entity TEXT,
+    p_filter_hash TEXT,
+    p_records_synced INTEGER,
+    p_pages_fetched INTEGER,
+    p_error TEXT DEFAULT NULL,
+    p_pages_skipped INTEGER DEFAULT 0
+) RETURNS VOID AS $$
+BEGIN
+    UPDATE sync_metadata
+    SET sync_status = CASE WHEN p_error IS NULL THEN 'idle' ELSE 'error' END,
+        last_synced_at = CASE WHEN p_error IS NULL THEN NOW() ELSE last_synced_at END,
+        sync_started_at = NULL,
+        records_synced = p_records_synced,
+        pages_fetched = p_pages_fetched,
+        pages_skipped = p_pages_skipped,
+        error_message = p_error
+    WHERE entity = p_entity
+      AND filter_hash = p_filter_hash;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- RLS: page hashes are internal to the sync pipeline
+-- ============================================================
+ALTER TABLE sync_page_hashes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY service_role_all_sync_page_hashes
+    ON sync_page_hashes
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
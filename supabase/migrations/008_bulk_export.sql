@@ -0,0 +1,65 @@
+-- ============================================================
+-- BULK EXPORT — one-response CSV reads for large date ranges
+-- The Python client calls these via RPC instead of paging
+-- PostgREST in 1000-row chunks once a read exceeds its row
+-- threshold. The header uses the table column names; the
+-- client maps them to legacy names via its schema registry.
+-- ============================================================
+
+-- RFC 4180 quoting for free-text fields (NULL stays NULL → empty field)
+CREATE OR REPLACE FUNCTION public.csv_quote(p_value TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT '"' || replace(p_value, '"', '""') || '"';
+$$;
+
+-- Sales invoice lines in [p_start, p_end], optionally for one SKU
+CREATE OR REPLACE FUNCTION public.export_sales_csv(
+    p_start DATE,
+    p_end DATE,
+    p_sku TEXT DEFAULT NULL
+)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'fulfillment_date,sku,quantity,net_price,gross_price,net_value,gross_value'
+        || E'\n'
+        || COALESCE(string_agg(
+               format('%s,%s,%s,%s,%s,%s,%s',
+                      s.fulfillment_date, public.csv_quote(s.sku), s.quantity,
+                      s.net_price, s.gross_price, s.net_value, s.gross_value),
+               E'\n' ORDER BY s.fulfillment_date, s.id),
+           '')
+    FROM sales_invoice_lines s
+    WHERE s.fulfillment_date BETWEEN p_start AND p_end
+      AND (p_sku IS NULL OR s.sku = p_sku);
+$$;
+
+-- Warehouse movements in [p_start, p_end], optionally for one SKU
+CREATE OR REPLACE FUNCTION public.export_movements_csv(
+    p_start DATE,
+    p_end DATE,
+    p_sku TEXT DEFAULT NULL
+)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'movement_date,sku,direction,movement_type,quantity'
+        || E'\n'
+        || COALESCE(string_agg(
+               format('%s,%s,%s,%s,%s',
+                      m.movement_date, public.csv_quote(m.sku), public.csv_quote(m.direction),
+                      public.csv_quote(m.movement_type), m.quantity),
+               E'\n' ORDER BY m.movement_date, m.id),
+           '')
+    FROM warehouse_movements m
+    WHERE m.movement_date BETWEEN p_start AND p_end
+      AND (p_sku IS NULL OR m.sku = p_sku);
+$$;
+
+GRANT EXECUTE ON FUNCTION public.export_sales_csv(DATE, DATE, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.export_movements_csv(DATE, DATE, TEXT) TO anon, authenticated;
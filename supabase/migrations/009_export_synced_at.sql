@@ -0,0 +1,68 @@
+-- ============================================================
+-- BULK EXPORT — add id and synced_at
+-- The Python client keeps the newest synced_at of each range it
+-- has read, and after a sync fetches only the rows synced since
+-- (sync-entity inserts sales and movement rows, never updates
+-- them). The CSV exports now end with those two columns so bulk
+-- reads record them too; older clients ignore them.
+--
+-- Ordering assumption: synced_at is stamped by the Edge Function
+-- when it builds a batch, not when the batch commits. Two
+-- overlapping syncs (e.g. "Idén" and "30 nap" triggered by
+-- different filter hashes) can therefore commit rows stamped
+-- *before* a watermark the client has already seen. The client
+-- re-reads a 30-minute window before its watermark and skips the
+-- rows it already holds by id, so a sync's commit may lag its
+-- stamps by up to that window. Anything later is picked up when
+-- the cached range expires and is read in full again.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.export_sales_csv(
+    p_start DATE,
+    p_end DATE,
+    p_sku TEXT DEFAULT NULL
+)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'fulfillment_date,sku,quantity,net_price,gross_price,net_value,gross_value,id,synced_at'
+        || E'\n'
+        || COALESCE(string_agg(
+               format('%s,%s,%s,%s,%s,%s,%s,%s,%s',
+                      s.fulfillment_date, public.csv_quote(s.sku), s.quantity,
+                      s.net_price, s.gross_price, s.net_value, s.gross_value,
+                      s.id, to_json(s.synced_at) #>> '{}'),
+               E'\n' ORDER BY s.fulfillment_date, s.id),
+           '')
+    FROM sales_invoice_lines s
+    WHERE s.fulfillment_date BETWEEN p_start AND p_end
+      AND (p_sku IS NULL OR s.sku = p_sku);
+$$;
+
+CREATE OR REPLACE FUNCTION public.export_movements_csv(
+    p_start DATE,
+    p_end DATE,
+    p_sku TEXT DEFAULT NULL
+)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'movement_date,sku,direction,movement_type,quantity,id,synced_at'
+        || E'\n'
+        || COALESCE(string_agg(
+               format('%s,%s,%s,%s,%s,%s,%s',
+                      m.movement_date, public.csv_quote(m.sku), public.csv_quote(m.direction),
+                      public.csv_quote(m.movement_type), m.quantity,
+                      m.id, to_json(m.synced_at) #>> '{}'),
+               E'\n' ORDER BY m.movement_date, m.id),
+           '')
+    FROM warehouse_movements m
+    WHERE m.movement_date BETWEEN p_start AND p_end
+      AND (p_sku IS NULL OR m.sku = p_sku);
+$$;
+
+-- Delta reads: synced_at > watermark selects a few rows of a wide date range
+CREATE INDEX IF NOT EXISTS idx_sales_synced ON sales_invoice_lines (synced_at);
+CREATE INDEX IF NOT EXISTS idx_movements_synced ON warehouse_movements (synced_at);